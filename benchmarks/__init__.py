@@ -0,0 +1,7 @@
+# encoding: utf-8
+""" micro benchmarks for the hot paths of HttpRunner.
+
+    run all benchmarks and compare with a baseline:
+
+        $ python -m benchmarks --output current.json --baseline baseline.json
+"""
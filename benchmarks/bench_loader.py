@@ -0,0 +1,160 @@
+# encoding: utf-8
+
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from benchmarks.runner import benchmark
+from httprunner.report import render_html_report
+from httprunner.testcase import TestcaseLoader
+from requests.structures import CaseInsensitiveDict
+
+TESTCASE_TEMPLATE = u"""
+- test:
+    name: get user {index}
+    variables:
+        - uid: {index}
+    request:
+        url: /api/users/$uid
+        method: GET
+        headers:
+            Content-Type: application/json
+            device_sn: $device_sn
+    extract:
+        - user_name: content.data.name
+    validate:
+        - eq: ["status_code", 200]
+        - eq: ["content.success", true]
+"""
+
+
+@benchmark("TestcaseLoader.load_test_file", sizes=[10, 100])
+def bench_load_test_file(size):
+    temp_dir = tempfile.mkdtemp()
+    file_path = os.path.join(temp_dir, "testset.yml")
+    with io.open(file_path, 'w', encoding='utf-8') as f:
+        f.write(u"- config:\n    name: benchmark\n    variables:\n        - device_sn: xyz\n")
+        for index in range(size):
+            f.write(TESTCASE_TEMPLATE.format(index=index))
+
+    try:
+        yield lambda: TestcaseLoader.load_test_file(file_path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+API_TEMPLATE = u"""
+- api:
+    def: bench_create_user($uid, $user_name, $user_password, $token)
+    request:
+        url: /api/users/$uid
+        method: POST
+        headers:
+            token: $token
+        json:
+            name: $user_name
+            password: $user_password
+    validate:
+        - eq: ["status_code", 201]
+        - eq: ["content.success", true]
+        - eq: ["content.msg", "user created successfully."]
+"""
+
+API_TESTCASE_TEMPLATE = u"""
+- test:
+    name: create user {index}
+    api: bench_create_user(uid_{uid}, user_{uid}, $password, $token)
+    validate:
+        - eq: ["status_code", 201]
+"""
+
+
+@benchmark("TestcaseLoader.load_test_file_with_api_references", sizes=[10, 100])
+def bench_load_test_file_with_api_references(size):
+    """ testcases reference one api with 10 distinct call args.
+    """
+    temp_dir = tempfile.mkdtemp()
+    api_folder = os.path.join(temp_dir, "tests", "api")
+    os.makedirs(api_folder)
+    api_file = os.path.join(api_folder, "user.yml")
+    with io.open(api_file, 'w', encoding='utf-8') as f:
+        f.write(API_TEMPLATE)
+
+    file_path = os.path.join(temp_dir, "testset.yml")
+    with io.open(file_path, 'w', encoding='utf-8') as f:
+        f.write(u"- config:\n    name: benchmark\n")
+        for index in range(size):
+            f.write(API_TESTCASE_TEMPLATE.format(index=index, uid=index % 10))
+
+    current_dir = os.getcwd()
+    os.chdir(temp_dir)
+    try:
+        TestcaseLoader.load_test_dependencies()
+        yield lambda: TestcaseLoader.load_test_file(file_path)
+    finally:
+        os.chdir(current_dir)
+        shutil.rmtree(temp_dir)
+        TestcaseLoader._unload_def_file(api_file)
+
+
+def gen_record(index, body_size=1024):
+    return {
+        "name": "get user {}".format(index),
+        "status": "success",
+        "attachment": "",
+        "meta_data": {
+            "url": "http://127.0.0.1:5000/api/users/{}".format(index),
+            "method": "POST",
+            "request_headers": CaseInsensitiveDict({"Content-Type": "application/json"}),
+            "request_body": {"name": "user_{}".format(index), "password": "123456"},
+            "status_code": 200,
+            "response_headers": CaseInsensitiveDict({"Content-Type": "text/html"}),
+            "response_body": b"<html><body>" + b"x" * body_size + b"</body></html>",
+            "response_time_ms": 12.5,
+            "elapsed_ms": 10.2,
+            "content_size": body_size + 26
+        }
+    }
+
+
+def render_report(size, body_size=1024, body_limit=None):
+    records = [gen_record(index, body_size) for index in range(size)]
+    summary = {
+        "success": True,
+        "stat": {
+            "testsRun": size, "successes": size, "failures": 0, "errors": 0,
+            "skipped": 0, "expectedFailures": 0, "unexpectedSuccesses": 0
+        },
+        "time": {"start_at": datetime.now(), "duration": 1.5},
+        "platform": {"httprunner_version": "", "python_version": "", "platform": ""},
+        "output": []
+    }
+
+    def render():
+        # bodies are stringified in place when rendering, thus records are copied for each run
+        summary["records"] = [
+            dict(record, meta_data=dict(record["meta_data"]))
+            for record in records
+        ]
+        render_html_report(summary, body_limit=body_limit)
+
+    current_dir = os.getcwd()
+    temp_dir = tempfile.mkdtemp()
+    os.chdir(temp_dir)
+    try:
+        yield render
+    finally:
+        os.chdir(current_dir)
+        shutil.rmtree(temp_dir)
+
+
+@benchmark("render_html_report", sizes=[10, 100])
+def bench_render_html_report(size):
+    return render_report(size)
+
+
+@benchmark("render_html_report_bounded_1MB_bodies", sizes=[10, 100])
+def bench_render_html_report_bounded(size):
+    return render_report(size, body_size=1024 * 1024, body_limit=1024)
@@ -0,0 +1,77 @@
+# encoding: utf-8
+
+from benchmarks.runner import benchmark
+from httprunner.testcase import (TestcaseParser, parse_function,
+                                 substitute_variables_with_mapping)
+
+
+def gen_request(size):
+    """ generate request with size of headers and json fields referencing variables and functions.
+    """
+    return {
+        "url": "http://127.0.0.1:5000/api/users/$uid/${add_two_nums(1, $uid)}",
+        "method": "POST",
+        "headers": {
+            "header_{}".format(index): "$var_{}".format(index)
+            for index in range(size)
+        },
+        "json": {
+            "field_{}".format(index): "prefix/$var_{}/${{add_two_nums({}, 1)}}".format(index, index)
+            for index in range(size)
+        }
+    }
+
+
+@benchmark("eval_content_with_bindings", sizes=[1, 10, 100])
+def bench_eval_content_with_bindings(size):
+    variables = {
+        "var_{}".format(index): "value_{}".format(index)
+        for index in range(size)
+    }
+    variables["uid"] = 1000
+    parser = TestcaseParser(
+        variables=variables,
+        functions={"add_two_nums": lambda a, b=1: a + b}
+    )
+    content = gen_request(size)
+    return lambda: parser.eval_content_with_bindings(content)
+
+
+@benchmark("eval_debugtalk_functions", sizes=[1, 10])
+def bench_eval_debugtalk_functions(size):
+    """ functions which are not bound are resolved in builtins and debugtalk.py
+    """
+    parser = TestcaseParser(
+        variables={"device_sn": "FwgRiO7CNA50DSU"},
+        file_path="tests/data/demo_testset_hardcode.yml"
+    )
+    content = [
+        "${gen_md5($device_sn)}/${len($device_sn)}"
+        for _ in range(size)
+    ]
+    return lambda: parser.eval_content_with_bindings(content)
+
+
+@benchmark("parse_function", sizes=[1, 10, 100])
+def bench_parse_function(size):
+    args = ["$var_{}".format(index) for index in range(size)]
+    kwargs = ["key_{}={}".format(index, index) for index in range(size)]
+    content = "func({})".format(", ".join(args + kwargs))
+    return lambda: parse_function(content)
+
+
+@benchmark("substitute_variables_with_mapping", sizes=[1, 10, 100])
+def bench_substitute_variables_with_mapping(size):
+    mapping = {
+        "$var_{}".format(index): "value_{}".format(index)
+        for index in range(size)
+    }
+    content = {
+        "name": "$var_0",
+        "request": gen_request(size),
+        "validate": [
+            {"eq": ["content.field_{}".format(index), "$var_{}".format(index)]}
+            for index in range(size)
+        ]
+    }
+    return lambda: substitute_variables_with_mapping(content, mapping)
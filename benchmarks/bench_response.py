@@ -0,0 +1,59 @@
+# encoding: utf-8
+
+import json
+
+from benchmarks.runner import benchmark
+from httprunner import response, utils
+from httprunner.context import Context
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+
+def gen_json_content(size):
+    return {
+        "success": True,
+        "items": [
+            {
+                "id": index,
+                "name": "item_{}".format(index),
+                "tags": ["tag_{}".format(tag) for tag in range(5)]
+            }
+            for index in range(size)
+        ],
+        "meta": {"total": size}
+    }
+
+
+@benchmark("query_json", sizes=[1, 10, 100])
+def bench_query_json(size):
+    json_content = gen_json_content(size)
+    queries = [
+        "items.{}.tags.4".format(index)
+        for index in range(size)
+    ]
+
+    def query_all():
+        for query in queries:
+            utils.query_json(json_content, query)
+
+    return query_all
+
+
+@benchmark("Context.validate", sizes=[1, 10, 100])
+def bench_context_validate(size):
+    resp = Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    resp.encoding = "utf-8"
+    resp._content = json.dumps(gen_json_content(size)).encode("utf-8")
+
+    context = Context()
+    context.bind_variables([{"expect_status_code": 200}])
+    validators = [{"eq": ["status_code", "$expect_status_code"]}]
+    validators.extend([
+        {"eq": ["content.items.{}.name".format(index), "item_{}".format(index)]}
+        for index in range(size)
+    ])
+
+    # response object caches parsed attributes, thus it is created for each validation
+    return lambda: context.validate(validators, response.ResponseObject(resp))
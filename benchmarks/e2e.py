@@ -0,0 +1,329 @@
+# encoding: utf-8
+""" end-to-end benchmark, which runs representative testsets against a local stub server,
+    and reports how much time HttpRunner itself costs for each request.
+
+        $ python -m benchmarks.e2e --iterations 20 --output e2e.json
+
+    each scenario is run in a separate process, thus peak RSS is measured independently.
+    stub server runs in another process, thus it does not compete with client for CPU.
+    client overhead is wall time minus time spent in handling requests on server,
+    which includes loopback network transmission.
+"""
+
+import argparse
+import copy
+import io
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+from httprunner.compat import json
+
+MODES = ["HttpRunner", "LocustTask"]
+
+
+def gen_crud_testset(base_url, uids):
+    """ login and CRUD testset, parameterized by uids if more than one uid is specified.
+    """
+    config = {
+        "name": "benchmark user CRUD",
+        "variables": [{"device_sn": "benchmark"}],
+        "request": {
+            "base_url": base_url,
+            "headers": {
+                "Content-Type": "application/json",
+                "device_sn": "$device_sn"
+            }
+        }
+    }
+    if len(uids) > 1:
+        config["parameters"] = [{"uid": uids}]
+    else:
+        config["variables"].append({"uid": uids[0]})
+
+    user_request = {
+        "url": "/api/users/$uid",
+        "headers": {"token": "$token"}
+    }
+
+    def gen_user_testcase(name, method, status_code, json_body=None):
+        request = dict(user_request, method=method)
+        if json_body:
+            request["json"] = json_body
+
+        return {
+            "name": name,
+            "request": request,
+            "validate": [
+                {"eq": ["status_code", status_code]},
+                {"eq": ["content.success", True]}
+            ]
+        }
+
+    get_user_testcase = gen_user_testcase("get user", "GET", 200)
+    get_user_testcase["extract"] = [{"user_name": "content.data.name"}]
+    get_user_testcase["validate"].append({"eq": ["$user_name", "user_$uid"]})
+
+    return {
+        "name": config["name"],
+        "config": config,
+        "testcases": [
+            {
+                "name": "get token",
+                "request": {
+                    "url": "/api/get-token",
+                    "method": "POST",
+                    "json": {"sign": "${gen_random_string(16)}"}
+                },
+                "extract": [{"token": "content.token"}],
+                "validate": [
+                    {"eq": ["status_code", 200]},
+                    {"len_eq": ["content.token", 16]}
+                ]
+            },
+            gen_user_testcase(
+                "create user", "POST", 201,
+                {"name": "user_$uid", "password": "123456"}
+            ),
+            get_user_testcase,
+            gen_user_testcase(
+                "update user", "PUT", 200,
+                {"name": "user_$uid", "password": "654321"}
+            ),
+            gen_user_testcase("delete user", "DELETE", 200)
+        ]
+    }
+
+
+def gen_static_testset(base_url):
+    """ testset without variables and functions, e.g. health checks and fixed-body requests.
+    """
+    def gen_static_testcase(name, method, status_code, json_body=None):
+        request = {
+            "url": "/api/users/2000",
+            "method": method,
+            "headers": {"token": "stubtoken0000001"}
+        }
+        if json_body:
+            request["json"] = json_body
+
+        return {
+            "name": name,
+            "request": request,
+            "validate": [
+                {"eq": ["status_code", status_code]},
+                {"eq": ["content.success", True]}
+            ]
+        }
+
+    return {
+        "name": "benchmark static requests",
+        "config": {
+            "name": "benchmark static requests",
+            "request": {
+                "base_url": base_url,
+                "headers": {"Content-Type": "application/json", "device_sn": "benchmark"}
+            }
+        },
+        "testcases": [
+            {
+                "name": "get token",
+                "request": {
+                    "url": "/api/get-token",
+                    "method": "POST",
+                    "json": {"sign": "f1219719911caae89ccc301679857ebfda115ca2"}
+                },
+                "validate": [{"eq": ["status_code", 200]}]
+            },
+            gen_static_testcase(
+                "create user", "POST", 201, {"name": "user_2000", "password": "123456"}),
+            gen_static_testcase("get user", "GET", 200),
+            gen_static_testcase("delete user", "DELETE", 200)
+        ]
+    }
+
+
+SCENARIOS = {
+    "crud": lambda base_url: [gen_crud_testset(base_url, [1000])],
+    "crud_parameterized": lambda base_url: [gen_crud_testset(base_url, list(range(1000, 1010)))],
+    "static": lambda base_url: [gen_static_testset(base_url)]
+}
+
+
+def get_peak_rss():
+    """ get peak RSS of current process in MB, None if not supported on current platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes on Linux
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max_rss / float(scale), 1)
+
+
+def run_http_runner(testsets, iterations, base_url):
+    from httprunner import HttpRunner
+
+    with io.open(os.devnull, "w") as devnull:
+        runner = HttpRunner(stream=devnull)
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            for _ in range(iterations):
+                runner.run(copy.deepcopy(testsets))
+                if not runner.summary["success"]:
+                    raise RuntimeError("testsets failed when running with HttpRunner.")
+        finally:
+            sys.stdout = stdout
+
+
+def run_locust_task(testsets, iterations, base_url):
+    from httprunner.client import HttpSession
+    from httprunner.task import LocustTask
+
+    # like locust, task is initialized once and run repeatedly with the same client
+    task = LocustTask(copy.deepcopy(testsets), HttpSession(base_url))
+    for _ in range(iterations):
+        task.run()
+
+
+def run_scenario(mode, scenario, base_url, iterations):
+    """ run scenario in current process.
+    @return (dict) benchmark result
+    """
+    run_function = run_http_runner if mode == "HttpRunner" else run_locust_task
+    testsets = SCENARIOS[scenario](base_url)
+
+    # warm up imports, connections and caches
+    run_function(testsets, 1, base_url)
+
+    requests.delete("{}/stats".format(base_url))
+    start_at = time.time()
+    run_function(testsets, iterations, base_url)
+    duration = time.time() - start_at
+    stats = requests.get("{}/stats".format(base_url)).json()
+
+    requests_count = stats["requests"]
+    return {
+        "mode": mode,
+        "scenario": scenario,
+        "iterations": iterations,
+        "requests": requests_count,
+        "duration": round(duration, 3),
+        "requests_per_second": round(requests_count / duration, 1),
+        "server_time_ms": round(stats["server_time"] * 1000 / requests_count, 3),
+        "overhead_ms": round((duration - stats["server_time"]) * 1000 / requests_count, 3),
+        "peak_rss_mb": get_peak_rss()
+    }
+
+
+def get_free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_stub_server(port, timeout=10):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_server", "--port", str(port)]
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.1).close()
+            return process
+        except socket.error:
+            time.sleep(0.05)
+
+    process.terminate()
+    raise RuntimeError("failed to start stub server on port {}.".format(port))
+
+
+def run_scenario_in_subprocess(mode, scenario, base_url, iterations):
+    output = subprocess.check_output([
+        sys.executable, "-m", "benchmarks.e2e",
+        "--child", mode, scenario, base_url,
+        "--iterations", str(iterations)
+    ])
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def print_result(result):
+    print("{:<12} {:<20} {:>6} requests  {:>8.1f} req/s  server {:>7.3f} ms  "
+          "overhead {:>7.3f} ms/request  peak RSS {} MB".format(
+              result["mode"],
+              result["scenario"],
+              result["requests"],
+              result["requests_per_second"],
+              result["server_time_ms"],
+              result["overhead_ms"],
+              result["peak_rss_mb"]
+          ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run HttpRunner end-to-end benchmark.")
+    parser.add_argument(
+        '--iterations', type=int, default=20,
+        help="times of running testsets in each scenario, default is 20.")
+    parser.add_argument(
+        '--mode', choices=MODES,
+        help="only run with specified mode.")
+    parser.add_argument(
+        '--scenario', choices=sorted(SCENARIOS),
+        help="only run specified scenario.")
+    parser.add_argument(
+        '--port', type=int,
+        help="port of stub server, a free port is used by default.")
+    parser.add_argument(
+        '--output',
+        help="save results to specified JSON file.")
+    parser.add_argument(
+        '--child', nargs=3, metavar=("MODE", "SCENARIO", "BASE_URL"),
+        help=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+
+    if args.child:
+        mode, scenario, base_url = args.child
+        print(json.dumps(run_scenario(mode, scenario, base_url, args.iterations)))
+        return 0
+
+    port = args.port or get_free_port()
+    server_process = start_stub_server(port)
+    base_url = "http://127.0.0.1:{}".format(port)
+
+    results = []
+    try:
+        for mode in MODES:
+            if args.mode and mode != args.mode:
+                continue
+
+            for scenario in sorted(SCENARIOS):
+                if args.scenario and scenario != args.scenario:
+                    continue
+
+                result = run_scenario_in_subprocess(mode, scenario, base_url, args.iterations)
+                print_result(result)
+                results.append(result)
+    finally:
+        server_process.terminate()
+        server_process.wait()
+
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(u"{}\n".format(json.dumps(results, indent=4, sort_keys=True)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# encoding: utf-8
+
+import argparse
+import gc
+import io
+import os
+import platform
+import random
+import timeit
+import types
+
+from httprunner.__about__ import __version__
+from httprunner.compat import json
+
+BENCHMARK_MODULES = [
+    "benchmarks.bench_parser",
+    "benchmarks.bench_response",
+    "benchmarks.bench_loader"
+]
+
+# registered benchmarks, each item is a (name, setup_function, sizes) tuple
+benchmarks_registry = []
+
+
+def benchmark(name, sizes):
+    """ register a benchmark, which is parameterized over payload sizes.
+        decorated function is called with size and should return the function to be timed,
+        or be a generator which yields the function to be timed and cleans up after yield.
+
+        @benchmark("parse_function", sizes=[1, 10])
+        def bench_parse_function(size):
+            content = "func({})".format(", ".join(["1"] * size))
+            return lambda: parse_function(content)
+    """
+    def decorator(setup_function):
+        benchmarks_registry.append((name, setup_function, sizes))
+        return setup_function
+
+    return decorator
+
+
+def load_benchmarks():
+    for module_name in BENCHMARK_MODULES:
+        __import__(module_name)
+
+    return benchmarks_registry
+
+
+def time_function(func, repeat=5, min_time=0.05):
+    """ time function like timeit, loops count is calibrated to make each round last min_time.
+    @return (dict) seconds per call
+        {"min": 0.0012, "median": 0.0013, "number": 64, "repeat": 5}
+    """
+    timer = timeit.default_timer
+
+    def run_loops(number):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start_at = timer()
+            for _ in range(number):
+                func()
+            return timer() - start_at
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    number = 1
+    while True:
+        elapsed = run_loops(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    timings = sorted(
+        run_loops(number) / number
+        for _ in range(repeat)
+    )
+    return {
+        "min": timings[0],
+        "median": timings[len(timings) // 2],
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def run_benchmarks(name_filter=None, repeat=5, min_time=0.05, quick=False):
+    """ run registered benchmarks.
+    @param (str) name_filter: only run benchmarks whose name contains name_filter
+    @param (bool) quick: only run with the smallest size, useful for smoke testing
+    @return (dict) results mapping, key is in format "name[size]"
+    """
+    results = {}
+    for name, setup_function, sizes in load_benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+
+        for size in (sizes[:1] if quick else sizes):
+            # payloads generated with random are reproducible
+            random.seed(0)
+            setup = setup_function(size)
+            if isinstance(setup, types.GeneratorType):
+                func = next(setup)
+            else:
+                func = setup
+
+            try:
+                key = "{}[{}]".format(name, size)
+                results[key] = time_function(func, repeat, min_time)
+                print_result(key, results[key])
+            finally:
+                if isinstance(setup, types.GeneratorType):
+                    setup.close()
+
+    return results
+
+
+def format_seconds(seconds):
+    for unit, scale in [("s", 1), ("ms", 1e3), ("us", 1e6)]:
+        if seconds * scale >= 1:
+            return "{:.2f} {}".format(seconds * scale, unit)
+
+    return "{:.0f} ns".format(seconds * 1e9)
+
+
+def print_result(key, result):
+    print("{:<50} min {:>10}  median {:>10}  ({} loops x {})".format(
+        key,
+        format_seconds(result["min"]),
+        format_seconds(result["median"]),
+        result["number"],
+        result["repeat"]
+    ))
+
+
+def compare_results(results, baseline_results, threshold=0.1):
+    """ compare results with baseline by minimum timings.
+    @param (float) threshold: ratio of slowdown which is treated as regression
+    @return (list) comparisons sorted by key, each item is a (key, ratio, is_regression) tuple,
+        ratio is current timing divided by baseline timing.
+    """
+    comparisons = []
+    for key in sorted(results):
+        if key not in baseline_results:
+            continue
+
+        ratio = results[key]["min"] / baseline_results[key]["min"]
+        comparisons.append((key, ratio, ratio > 1 + threshold))
+
+    return comparisons
+
+
+def dump_results(results, path):
+    content = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    with io.open(path, 'w', encoding='utf-8') as stream:
+        stream.write(u"{}\n".format(json.dumps(content, indent=4, sort_keys=True)))
+
+
+def load_results(path):
+    with io.open(path, encoding='utf-8') as stream:
+        return json.load(stream)["results"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run HttpRunner benchmarks.")
+    parser.add_argument(
+        '-k', '--filter', dest='name_filter',
+        help="only run benchmarks whose name contains the specified string.")
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help="rounds of timing for each benchmark, default is 5.")
+    parser.add_argument(
+        '--min-time', type=float, default=0.05,
+        help="minimum seconds of each round, loops count is calibrated by it, default is 0.05.")
+    parser.add_argument(
+        '--quick', action='store_true', default=False,
+        help="only run with the smallest payload size.")
+    parser.add_argument(
+        '--output',
+        help="save results to specified JSON file.")
+    parser.add_argument(
+        '--baseline',
+        help="compare results with the specified JSON file saved before.")
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help="slowdown ratio treated as regression, default is 0.1 (10%%).")
+
+    args = parser.parse_args(argv)
+    results = run_benchmarks(args.name_filter, args.repeat, args.min_time, args.quick)
+
+    if args.output:
+        dump_results(results, args.output)
+
+    if not args.baseline:
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print("baseline file not found: {}".format(args.baseline))
+        return 1
+
+    regressions = 0
+    print("\ncompared with baseline: {}".format(args.baseline))
+    for key, ratio, is_regression in compare_results(results, load_results(args.baseline), args.threshold):
+        regressions += is_regression
+        print("{:<50} {:>+8.1%}{}".format(key, ratio - 1, "  REGRESSION" if is_regression else ""))
+
+    return 1 if regressions else 0
@@ -0,0 +1,132 @@
+# encoding: utf-8
+""" a light stand-in of tests/api_server.py for end-to-end benchmarks.
+    users are stored in memory, and time spent in handling requests is accumulated,
+    which could be queried by GET /stats and cleared by DELETE /stats.
+
+        $ python -m benchmarks.stub_server --port 5001
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+user_path_regexp = re.compile(r"^/api/users/(\d+)$")
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, server_address):
+        HTTPServer.__init__(self, server_address, StubRequestHandler)
+        self.lock = threading.Lock()
+        self.users = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "server_time": 0.0}
+
+    def record(self, duration):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["server_time"] += duration
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid delayed ACK waiting on keep-alive connection
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status_code, content):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def handle_request(self):
+        start_at = time.time()
+        content = self.read_json()
+
+        if self.path == "/stats":
+            if self.command == "DELETE":
+                self.server.reset_stats()
+            self.send_json(200, self.server.stats)
+            return
+
+        if self.path == "/api/get-token":
+            status_code, result = 200, {"success": True, "token": "stubtoken0000001"}
+        else:
+            status_code, result = self.handle_user(content)
+
+        self.send_json(status_code, result)
+        self.server.record(time.time() - start_at)
+
+    def handle_user(self, content):
+        matched = user_path_regexp.match(self.path)
+        if not matched:
+            return 404, {"success": False, "msg": "not found"}
+
+        if self.headers.get("token") != "stubtoken0000001":
+            return 403, {"success": False, "msg": "Authorization failed!"}
+
+        uid = int(matched.group(1))
+        users = self.server.users
+        if self.command == "POST":
+            if uid in users:
+                return 500, {"success": False, "msg": "user already existed."}
+            users[uid] = content
+            return 201, {"success": True, "msg": "user created successfully."}
+
+        if uid not in users:
+            return 404, {"success": False, "msg": "user not existed."}
+
+        if self.command == "GET":
+            return 200, {"success": True, "data": users[uid]}
+        elif self.command == "PUT":
+            users[uid] = content
+            return 200, {"success": True, "data": content}
+        else:
+            del users[uid]
+            return 200, {"success": True, "data": uid}
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run stub server for end-to-end benchmarks.")
+    parser.add_argument('--port', type=int, default=5001)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,23 @@
 # encoding: utf-8
 
-from httprunner.task import HttpRunner
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """ defer importing the whole runner stack until HttpRunner is accessed,
+        thus command line entries like `hrun --version` start fast.
+    """
+    def __getattr__(self, name):
+        if name == "HttpRunner":
+            from httprunner.task import HttpRunner
+            return HttpRunner
+
+        raise AttributeError("module {!r} has no attribute {!r}".format(self.__name__, name))
+
+
+try:
+    sys.modules[__name__].__class__ = _LazyModule
+except TypeError:
+    # module class assignment is not supported before Python 3.5
+    from httprunner.task import HttpRunner
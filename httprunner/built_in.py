@@ -14,7 +14,6 @@ import time
 
 from httprunner.compat import basestring, builtin_str, integer_types, str
 from httprunner.exception import ParamsError
-from requests_toolbelt import MultipartEncoder
 
 
 """ built-in functions
@@ -39,6 +38,8 @@ def get_current_date(fmt="%Y-%m-%d"):
     return datetime.datetime.now().strftime(fmt)
 
 def multipart_encoder(field_name, file_path, file_type=None, file_headers=None):
+    from requests_toolbelt import MultipartEncoder
+
     if not os.path.isabs(file_path):
         file_path = os.path.join(os.getcwd(), file_path)
 
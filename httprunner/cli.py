@@ -1,18 +1,12 @@
 # encoding: utf-8
 
 import argparse
-import multiprocessing
 import os
 import sys
-import unittest
 
 from httprunner import logger
 from httprunner.__about__ import __description__, __version__
 from httprunner.compat import is_py2
-from httprunner.task import HttpRunner
-from httprunner.utils import (create_scaffold, get_python2_retire_msg,
-                              prettify_json_file, print_output,
-                              validate_json_file)
 
 
 def main_hrun():
@@ -34,6 +28,17 @@ def main_hrun():
     parser.add_argument(
         '--html-report-template',
         help="specify html report template path.")
+    parser.add_argument(
+        '--report-format', nargs='+', default=["html"], choices=["html", "junit", "json"],
+        help="Specify report formats, default is html. junit and json reports are written "
+             "while running, each testcase is written as soon as it finishes.")
+    parser.add_argument(
+        '--report-body-limit', type=int,
+        help="Truncate request/response bodies longer than specified size in html report, "
+             "full bodies and images are saved as files beside report and linked.")
+    parser.add_argument(
+        '--report-compress-bodies', action='store_true', default=False,
+        help="Gzip compress bodies saved beside html report, only effective with --report-body-limit.")
     parser.add_argument(
         '--log-level', default='INFO',
         help="Specify logging level, default is INFO.")
@@ -46,6 +51,62 @@ def main_hrun():
     parser.add_argument(
         '--failfast', action='store_true', default=False,
         help="Stop the test run on the first error or failure.")
+    parser.add_argument(
+        '--history-path',
+        help="Specify test history file path, durations of each run will be recorded in it.")
+    parser.add_argument(
+        '--shard-index', type=int,
+        help="Specify index of current shard, starts from 0.")
+    parser.add_argument(
+        '--shard-count', type=int,
+        help="Split testsets into specified count of shards, and only run the shard of --shard-index. "
+             "Shards are balanced by recorded durations if --history-path is specified.")
+    parser.add_argument(
+        '--shard-by-parameters', action='store_true', default=False,
+        help="Split config parameters combinations into shards instead of the whole testsets.")
+    parser.add_argument(
+        '--rate-limit', type=float,
+        help="Limit requests per second to each host, across all testsets and threads. "
+             "Overridden by rate_limit in testset config.")
+    parser.add_argument(
+        '--max-in-flight', type=int,
+        help="Limit concurrent requests to each host, across all testsets and threads. "
+             "Overridden by rate_limit in testset config.")
+    parser.add_argument(
+        '--duration',
+        help="Soak mode, run testsets repeatedly for specified duration, e.g. 3600, 30m, 2h, 1h30m. "
+             "Results are aggregated into counters and latency histograms of each testcase.")
+    parser.add_argument(
+        '--iterations', type=int,
+        help="Soak mode, run testsets repeatedly for specified iterations, "
+             "stop at whichever comes first if --duration is also specified.")
+    parser.add_argument(
+        '--watch', action='store_true', default=False,
+        help="Keep running, rerun affected testsets when testset, api, suite or debugtalk.py files change.")
+    parser.add_argument(
+        '--profile', action='store_true', default=False,
+        help="Print time spent in each phase, e.g. loading, hooks, request, validation, report.")
+    parser.add_argument(
+        '--profile-pstats',
+        help="Run with cProfile and dump stats to specified file path, implies --profile.")
+    parser.add_argument(
+        '--profile-collapsed',
+        help="Sample stacks and dump them in flamegraph collapsed format to specified file path, "
+             "implies --profile.")
+    parser.add_argument(
+        '--memory-watch', action='store_true', default=False,
+        help="Sample RSS and tracemalloc traced memory while running, and print memory growth "
+             "of top allocation sites and testcases after running.")
+    parser.add_argument(
+        '--memory-interval', type=float, default=10,
+        help="Seconds between memory samples, default is 10, implies --memory-watch.")
+    parser.add_argument(
+        '--memory-budget',
+        help="Stop the run with error when RSS exceeds specified size, e.g. 512MB, 2GB, "
+             "implies --memory-watch.")
+    parser.add_argument(
+        '--memory-report',
+        help="Dump memory samples and growth report to specified JSON file path, implies --memory-watch.")
     parser.add_argument(
         '--startproject',
         help="Specify new project name.")
@@ -57,15 +118,23 @@ def main_hrun():
         help="Prettify JSON testset format.")
 
     args = parser.parse_args()
-    logger.setup_logger(args.log_level, args.log_file)
-
-    if is_py2:
-        logger.log_warning(get_python2_retire_msg())
 
     if args.version:
         logger.color_print("{}".format(__version__), "GREEN")
         exit(0)
 
+    # heavy modules are imported after parsing arguments, which makes `hrun --version` fast
+    from httprunner import memwatch, profiler
+    from httprunner.task import HttpRunner
+    from httprunner.utils import (create_scaffold, get_python2_retire_msg,
+                                  prettify_json_file, print_output,
+                                  validate_json_file)
+
+    logger.setup_logger(args.log_level, args.log_file)
+
+    if is_py2:
+        logger.log_warning(get_python2_retire_msg())
+
     if args.validate:
         validate_json_file(args.validate)
         exit(0)
@@ -79,17 +148,79 @@ def main_hrun():
         create_scaffold(project_path)
         exit(0)
 
-    runner = HttpRunner(failfast=args.failfast, dot_env_path=args.dot_env_path).run(args.testset_paths)
+    if (args.shard_index is None) != (args.shard_count is None):
+        logger.log_error("--shard-index and --shard-count should be specified together.")
+        exit(1)
 
-    if not args.no_html_report:
-        runner.gen_html_report(
-            html_report_name=args.html_report_name,
-            html_report_template=args.html_report_template
-        )
+    kwargs = {
+        "failfast": args.failfast,
+        "dot_env_path": args.dot_env_path,
+        "history_path": args.history_path,
+        "shard_index": args.shard_index,
+        "shard_count": args.shard_count,
+        "shard_by_parameters": args.shard_by_parameters,
+        "report_formats": args.report_format,
+        "report_name": args.html_report_name,
+        "body_limit": args.report_body_limit,
+        "rate_limit": {
+            "rate": args.rate_limit,
+            "max_in_flight": args.max_in_flight
+        } if args.rate_limit or args.max_in_flight else None,
+        "duration": args.duration,
+        "iterations": args.iterations
+    }
+    runner = HttpRunner(**kwargs)
 
-    summary = runner.summary
-    print_output(summary["output"])
-    return 0 if summary["success"] else 1
+    def run_testsets(testset_paths):
+        runner.run(testset_paths)
+
+        if "html" in args.report_format and not args.no_html_report:
+            runner.gen_html_report(
+                html_report_name=args.html_report_name,
+                html_report_template=args.html_report_template,
+                body_limit=args.report_body_limit,
+                compress_bodies=args.report_compress_bodies
+            )
+        else:
+            # bodies are exported by streaming reports as soon as each testcase finishes
+            runner.remove_spooled_bodies()
+
+        summary = runner.summary
+        print_output(summary["output"])
+        if memwatch.budget_exceeded():
+            return 1
+
+        return 0 if summary["success"] else 1
+
+    profile = args.profile or args.profile_pstats or args.profile_collapsed
+    if profile:
+        profiler.enable(args.profile_pstats, args.profile_collapsed)
+
+    memory_watch = args.memory_watch or args.memory_budget or args.memory_report \
+        or args.memory_interval != parser.get_default("memory_interval")
+    if memory_watch:
+        memwatch.enable(args.memory_interval, args.memory_budget)
+
+    try:
+        if args.watch:
+            from httprunner.watch import watch
+            try:
+                watch(args.testset_paths, run_testsets)
+            except KeyboardInterrupt:
+                return 0
+
+        return run_testsets(args.testset_paths)
+    finally:
+        if profile:
+            profiler.disable()
+            profiler.print_stats()
+
+        if memory_watch:
+            memory_report = memwatch.disable().get_report()
+            memwatch.print_report(memory_report)
+            if args.memory_report:
+                memwatch.dump_report(memory_report, args.memory_report)
+                logger.log_info("Dumped memory report: {}".format(args.memory_report))
 
 def main_locust():
     """ Performance test with locust: parse command line options and run commands.
@@ -125,6 +256,8 @@ def main_locust():
     if "--processes" in sys.argv:
         """ locusts -f locustfile.py --processes 4
         """
+        import multiprocessing
+
         if "--no-web" in sys.argv:
             logger.log_error("conflict parameter args: --processes & --no-web. \nexit.")
             sys.exit(1)
@@ -5,15 +5,22 @@ import time
 
 import requests
 import urllib3
-from httprunner import logger
+from httprunner import logger, profiler
 from httprunner.exception import ParamsError
-from requests import Request, Response
+from httprunner.ratelimit import get_rate_limiter
+from httprunner.retry import CircuitOpenError, get_circuit_breaker, is_failure
+from httprunner.transport import UNIX_SCHEME, UnixHTTPAdapter
+from requests import PreparedRequest, Request, Response
+from requests.cookies import RequestsCookieJar, merge_cookies
 from requests.exceptions import (InvalidSchema, InvalidURL, MissingSchema,
                                  RequestException)
+from requests.sessions import merge_hooks, merge_setting
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_netrc_auth
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-absolute_http_url_regexp = re.compile(r"^https?://", re.I)
+absolute_http_url_regexp = re.compile(r"^(https?|http\+unix)://", re.I)
 
 
 class ApiResponse(Response):
@@ -24,6 +31,19 @@ class ApiResponse(Response):
         Response.raise_for_status(self)
 
 
+class StaticRequest(object):
+    """ request prepared once and sent repeatedly, e.g. requests of testcases without variables
+        and functions. URL, headers and body are final, cookies are merged each time it is sent,
+        as session cookies may change between requests.
+    """
+    __slots__ = ("prepared", "cookies", "send_kwargs")
+
+    def __init__(self, prepared, cookies, send_kwargs):
+        self.prepared = prepared
+        self.cookies = cookies
+        self.send_kwargs = send_kwargs
+
+
 class HttpSession(requests.Session):
     """
     Class for performing HTTP requests and holding (session-) cookies between requests (in order
@@ -36,10 +56,24 @@ class HttpSession(requests.Session):
     can now take a *url* argument that's only the path part of the URL, in which case the host
     part of the URL will be prepended with the HttpSession.base_url which is normally inherited
     from a HttpRunner class' host property.
+
+    Services listening on unix domain sockets can be requested with http+unix:// URLs, the socket
+    path is percent-encoded in the host, e.g. http+unix://%2Ftmp%2Fapi.sock/api/users
     """
     def __init__(self, base_url=None, *args, **kwargs):
         super(HttpSession, self).__init__(*args, **kwargs)
         self.base_url = base_url if base_url else ""
+        self.mount("{}://".format(UNIX_SCHEME), UnixHTTPAdapter())
+
+    def fork(self):
+        """ create a session sharing cookies, headers and connection pools with current session,
+            requests can be sent concurrently in forked sessions with separate meta data.
+        """
+        session = HttpSession(self.base_url)
+        for attr in self.__attrs__:
+            setattr(session, attr, getattr(self, attr))
+
+        return session
 
     def _build_url(self, path):
         """ prepend url with hostname unless it's already an absolute URL """
@@ -50,6 +84,50 @@ class HttpSession(requests.Session):
         else:
             raise ParamsError("base url missed!")
 
+    def prepare_static_request(self, method, url, timeout=120, allow_redirects=True, proxies=None,
+                               stream=None, verify=None, cert=None, cookies=None, **kwargs):
+        """ prepare request the same way as requests.Session.request, except cookies.
+            the prepared request could be sent with request(method, url, static_request=...)
+        @param kwargs: arguments of requests.Request, e.g. headers, params, data, json
+        @return StaticRequest
+        """
+        url = self._build_url(url)
+        request = Request(method=method.upper(), url=url, **kwargs)
+        auth = request.auth
+        if self.trust_env and not auth and not self.auth:
+            auth = get_netrc_auth(request.url)
+
+        prepared = PreparedRequest()
+        prepared.prepare(
+            method=request.method,
+            url=request.url,
+            files=request.files,
+            data=request.data,
+            json=request.json,
+            headers=merge_setting(request.headers, self.headers, dict_class=CaseInsensitiveDict),
+            params=merge_setting(request.params, self.params),
+            auth=merge_setting(auth, self.auth),
+            hooks=merge_hooks(request.hooks, self.hooks)
+        )
+        send_kwargs = {
+            "timeout": timeout,
+            "allow_redirects": allow_redirects
+        }
+        send_kwargs.update(
+            self.merge_environment_settings(prepared.url, proxies or {}, stream, verify, cert)
+        )
+        return StaticRequest(prepared, cookies, send_kwargs)
+
+    def _send_static_request(self, static_request):
+        """ send copy of prepared request with current session cookies.
+        """
+        prepared = static_request.prepared.copy()
+        prepared.prepare_cookies(
+            merge_cookies(merge_cookies(RequestsCookieJar(), self.cookies), static_request.cookies)
+        )
+        return self.send(prepared, **static_request.send_kwargs)
+
+    @profiler.timed("request")
     def request(self, method, url, name=None, **kwargs):
         """
         Constructs and sends a :py:class:`requests.Request`.
@@ -88,6 +166,15 @@ class HttpSession(requests.Session):
             if ``True``, the SSL cert will be verified. A CA_BUNDLE path can also be provided.
         :param cert: (optional)
             if String, path to ssl client cert file (.pem). If Tuple, ('cert', 'key') pair.
+        :param retry: (optional)
+            RetryPolicy, retry failed request with backoff.
+        :param circuit_breaker: (optional)
+            True or dict of CircuitBreaker arguments, fail fast when target host is down.
+        :param rate_limit: (optional)
+            dict of RateLimiter arguments, limit request rate and in-flight requests of target host.
+        :param static_request: (optional)
+            StaticRequest created by prepare_static_request, which is sent instead of preparing
+            request from other arguments.
         """
         # store detail data of request and response
         self.meta_data = {}
@@ -99,11 +186,23 @@ class HttpSession(requests.Session):
         self.meta_data["method"] = method
 
         kwargs.setdefault("timeout", 120)
+        retry_policy = kwargs.pop("retry", None)
+        circuit_breaker_config = kwargs.pop("circuit_breaker", None)
+        rate_limit_config = kwargs.pop("rate_limit", None)
+        rate_limiter = get_rate_limiter(url, name, rate_limit_config) if rate_limit_config else None
 
         self.meta_data["request_time"] = time.time()
-        response = self._send_request_safe_mode(method, url, **kwargs)
-        # record the consumed time
-        self.meta_data["response_time_ms"] = round((time.time() - self.meta_data["request_time"]) * 1000, 2)
+        if retry_policy or circuit_breaker_config or rate_limiter:
+            response = self._send_request_with_retry(
+                method, url, retry_policy, circuit_breaker_config, rate_limiter, **kwargs)
+        else:
+            response = self._send_request_safe_mode(method, url, **kwargs)
+        # record the consumed time, including all retries but excluding waiting for rate limiter
+        self.meta_data["response_time_ms"] = round(
+            (time.time() - self.meta_data["request_time"]) * 1000
+            - self.meta_data.get("rate_limit_wait_ms", 0),
+            2
+        )
         self.meta_data["elapsed_ms"] = response.elapsed.microseconds / 1000.0
 
         self.meta_data["url"] = (response.history and response.history[0] or response)\
@@ -127,7 +226,9 @@ class HttpSession(requests.Session):
 
         # get the length of the content, but if the argument stream is set to True, we take
         # the size from the content-length header, in order to not trigger fetching of the body
-        if kwargs.get("stream", False):
+        static_request = kwargs.get("static_request")
+        stream = static_request.send_kwargs["stream"] if static_request else kwargs.get("stream")
+        if stream:
             self.meta_data["content_size"] = int(self.meta_data["response_headers"].get("content-length") or 0)
         else:
             self.meta_data["content_size"] = len(response.content or "")
@@ -147,6 +248,86 @@ class HttpSession(requests.Session):
 
         return response
 
+    def _send_request_with_retry(self, method, url, retry_policy, circuit_breaker_config,
+                                 rate_limiter=None, **kwargs):
+        """ send request with retry policy, circuit breaker and rate limiter,
+            failed attempts and time waited for rate limiter are recorded in meta data.
+            {
+                "rate_limit_wait_ms": 10.2,
+                "retries": 1,
+                "attempts": [
+                    {"status_code": 503, "error": None, "response_time_ms": 12.3, "backoff_ms": 250.1}
+                ]
+            }
+        """
+        circuit_breaker = get_circuit_breaker(url, circuit_breaker_config) \
+            if circuit_breaker_config else None
+        attempts = []
+        retries = 0
+        self.meta_data["retries"] = 0
+        self.meta_data["attempts"] = attempts
+
+        while True:
+            start_at = time.time()
+            if circuit_breaker and not circuit_breaker.allow_request():
+                error = CircuitOpenError("circuit of {} is open, request is not sent.".format(url))
+                return self._build_error_response(method, url, error)
+
+            try:
+                response = self._send_request_limited(method, url, rate_limiter, **kwargs)
+            except BaseException:
+                # e.g. invalid url, otherwise circuit stays open if it is the half-open trial
+                if circuit_breaker:
+                    circuit_breaker.record_failure()
+                raise
+
+            if circuit_breaker:
+                if is_failure(response):
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()
+
+            if not (retry_policy and retry_policy.should_retry(method, response, retries)):
+                return response
+
+            retries += 1
+            backoff = retry_policy.get_backoff(retries)
+            error = getattr(response, "error", None)
+            attempts.append({
+                "status_code": response.status_code,
+                "error": str(error) if error is not None else None,
+                "response_time_ms": round((time.time() - start_at) * 1000, 2),
+                "backoff_ms": round(backoff * 1000, 2)
+            })
+            self.meta_data["retries"] = retries
+            logger.log_warning(
+                "retry {} of {} {} after {:.3f}s, last attempt: {}".format(
+                    retries, method, url, backoff, error or response.status_code
+                )
+            )
+            time.sleep(backoff)
+
+    def _send_request_limited(self, method, url, rate_limiter, **kwargs):
+        """ wait for rate limiter before sending request, each retry is limited as well.
+        """
+        if rate_limiter is None:
+            return self._send_request_safe_mode(method, url, **kwargs)
+
+        wait = rate_limiter.acquire()
+        self.meta_data["rate_limit_wait_ms"] = round(
+            self.meta_data.get("rate_limit_wait_ms", 0) + wait * 1000, 2)
+        try:
+            return self._send_request_safe_mode(method, url, **kwargs)
+        finally:
+            rate_limiter.release()
+
+    def _build_error_response(self, method, url, error):
+        resp = ApiResponse()
+        resp.error = error
+        resp.status_code = 0  # with this status_code, content returns None
+        resp.request = Request(method, url).prepare()
+        return resp
+
     def _send_request_safe_mode(self, method, url, **kwargs):
         """
         Send a HTTP request, and catch any exception that might occur due to connection problems.
@@ -157,12 +338,12 @@ class HttpSession(requests.Session):
             msg += "> {method} {url}\n".format(method=method, url=url)
             msg += "> kwargs: {kwargs}".format(kwargs=kwargs)
             logger.log_debug(msg)
+            static_request = kwargs.pop("static_request", None)
+            if static_request is not None:
+                return self._send_static_request(static_request)
+
             return requests.Session.request(self, method, url, **kwargs)
         except (MissingSchema, InvalidSchema, InvalidURL):
             raise
         except RequestException as ex:
-            resp = ApiResponse()
-            resp.error = ex
-            resp.status_code = 0  # with this status_code, content returns None
-            resp.request = Request(method, url).prepare()
-            return resp
+            return self._build_error_response(method, url, ex)
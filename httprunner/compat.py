@@ -41,6 +41,8 @@ if is_py2:
     basestring = basestring
     numeric_types = (int, long, float)
     integer_types = (int, long)
+    intern = intern
+    import __builtin__ as builtins
 
 elif is_py3:
     from collections import OrderedDict
@@ -51,3 +53,5 @@ elif is_py3:
     basestring = (str, bytes)
     numeric_types = (int, float)
     integer_types = (int,)
+    from sys import intern
+    import builtins
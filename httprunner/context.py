@@ -4,9 +4,130 @@ import copy
 import os
 import re
 import sys
+import threading
 
-from httprunner import exception, testcase, utils
-from httprunner.compat import OrderedDict
+from httprunner import exception, memoize, profiler, testcase, utils
+from httprunner.compat import OrderedDict, basestring
+
+
+def is_lazy_content(content):
+    """ check if content references variables or functions, which is evaluated lazily.
+    """
+    if isinstance(content, basestring):
+        return "$" in content
+    elif isinstance(content, (list, tuple)):
+        return any(is_lazy_content(item) for item in content)
+    elif isinstance(content, dict):
+        return any(
+            is_lazy_content(key) or is_lazy_content(value)
+            for key, value in content.items()
+        )
+
+    return False
+
+
+class LazyVariable(object):
+    """ variable evaluated on first reference, the evaluated value is memoized.
+        deep copy of lazy variable shares evaluation with the original one,
+        and memoizes its own deep copy of the evaluated value, which is the same as
+        deep copying testset variables evaluated eagerly for each testcase.
+    """
+    __slots__ = ("content", "parser", "source", "evaluated", "value", "lock")
+
+    def __init__(self, content=None, parser=None, source=None):
+        self.content = content
+        self.parser = parser
+        self.source = source
+        self.evaluated = False
+        self.value = None
+        # copies are only referenced by one testcase, while original ones may be shared by threads
+        self.lock = threading.RLock() if source is None else None
+
+    def resolve(self):
+        if self.evaluated:
+            return self.value
+
+        if self.source is not None:
+            self.value = copy.deepcopy(self.source.resolve())
+            self.evaluated = True
+            return self.value
+
+        with self.lock:
+            if not self.evaluated:
+                self.value = self.parser.eval_content_with_bindings(self.content)
+                self.evaluated = True
+                # release references to scope, which is no longer needed
+                self.parser = None
+
+        return self.value
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return LazyVariable(source=self)
+
+
+class VariablesMapping(OrderedDict):
+    """ variables mapping, lazy variables are resolved when accessed by key or iterated over values.
+    """
+    def __getitem__(self, key):
+        value = OrderedDict.__getitem__(self, key)
+        if isinstance(value, LazyVariable):
+            return value.resolve()
+
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+
+        return default
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def raw_items(self):
+        """ items without resolving lazy variables.
+        """
+        return OrderedDict.items(self)
+
+    def __copy__(self):
+        return VariablesMapping(self.raw_items())
+
+    def __deepcopy__(self, memo):
+        mapping = VariablesMapping()
+        memo[id(self)] = mapping
+        for key, value in self.raw_items():
+            OrderedDict.__setitem__(mapping, key, copy.deepcopy(value, memo))
+
+        return mapping
+
+
+class VariableScope(object):
+    """ variables visible to a lazy variable: variables defined before it in the same block,
+        and variables bound before the block.
+    """
+    def __init__(self, block, positions, position, parent):
+        self.block = block
+        self.positions = positions
+        self.position = position
+        self.parent = parent
+
+    def _in_block(self, name):
+        return self.positions.get(name, self.position) < self.position
+
+    def __contains__(self, name):
+        return self._in_block(name) or name in self.parent
+
+    def __getitem__(self, name):
+        if self._in_block(name):
+            return self.block[name]
+
+        return self.parent[name]
 
 
 class Context(object):
@@ -14,8 +135,8 @@ class Context(object):
         context has two levels, testset and testcase.
     """
     def __init__(self):
-        self.testset_shared_variables_mapping = OrderedDict()
-        self.testcase_variables_mapping = OrderedDict()
+        self.testset_shared_variables_mapping = VariablesMapping()
+        self.testcase_variables_mapping = VariablesMapping()
         self.testcase_parser = testcase.TestcaseParser()
         self.init_context()
 
@@ -27,7 +148,10 @@ class Context(object):
         if level == "testset":
             self.testset_functions_config = {}
             self.testset_request_config = {}
-            self.testset_shared_variables_mapping = OrderedDict()
+            # request templates of testcases, computed with testset request config
+            # testcase_request => (request_template, is_static)
+            self.request_templates = memoize.IdentityCache()
+            self.testset_shared_variables_mapping = VariablesMapping()
 
         # testcase config shall inherit from testset configs,
         # but can not change testset configs, that's why we use copy.deepcopy here.
@@ -40,9 +164,23 @@ class Context(object):
         if level == "testset":
             self.import_module_items(["httprunner.built_in"], "testset")
 
+    def fork(self):
+        """ create a context inheriting testset level configs and variables of current context,
+            testcases can run concurrently in forked contexts without affecting each other.
+        """
+        context = copy.copy(self)
+        context.testset_shared_variables_mapping = copy.copy(self.testset_shared_variables_mapping)
+        context.testcase_parser = testcase.TestcaseParser(
+            file_path=self.testcase_parser.file_path,
+            pure_functions=self.testcase_parser.pure_functions
+        )
+        context.init_context("testcase")
+        return context
+
     def config_context(self, config_dict, level):
         if level == "testset":
             self.testcase_parser.file_path = config_dict.get("path", None)
+            self.testcase_parser.pure_functions = set(config_dict.get("pure_functions", []))
 
         requires = config_dict.get('requires', [])
         self.import_requires(requires)
@@ -107,12 +245,36 @@ class Context(object):
                 "json": {'name': 'user', 'password': '123456'},
                 "md5": "${gen_md5($TOKEN, $json, $random)}"
             })
+
+        variables referencing other variables or functions are evaluated lazily on first reference,
+        with variables defined before them in the same block and variables bound before the block,
+        thus unreferenced variables cost nothing.
         """
         if isinstance(variables, list):
             variables = utils.convert_to_order_dict(variables)
 
-        for variable_name, value in variables.items():
-            variable_eval_value = self.eval_content(value)
+        block = VariablesMapping()
+        positions = {}
+        parent = None
+
+        for position, (variable_name, value) in enumerate(variables.items()):
+            if is_lazy_content(value):
+                if parent is None:
+                    # variables bound before the block, later bindings are invisible to the block
+                    parent = copy.copy(self.testcase_variables_mapping)
+
+                parser = testcase.TestcaseParser(
+                    variables=VariableScope(block, positions, position, parent),
+                    functions=self.testcase_functions_config,
+                    file_path=self.testcase_parser.file_path,
+                    pure_functions=self.testcase_parser.pure_functions
+                )
+                variable_eval_value = LazyVariable(value, parser)
+            else:
+                variable_eval_value = self.eval_content(value)
+
+            OrderedDict.__setitem__(block, variable_name, variable_eval_value)
+            positions.setdefault(variable_name, position)
 
             if level == "testset":
                 self.testset_shared_variables_mapping[variable_name] = variable_eval_value
@@ -162,17 +324,56 @@ class Context(object):
                 request_dict
             )
             self.testset_request_config.update(request_dict)
+            testcase_request_config = utils.deep_update_dict(
+                copy.deepcopy(self.testset_request_config),
+                request_dict
+            )
+        else:
+            testcase_request_config = self.get_request_template(request_dict)
 
-        testcase_request_config = utils.deep_update_dict(
-            copy.deepcopy(self.testset_request_config),
-            request_dict
-        )
         parsed_request = self.eval_content(
             testcase_request_config
         )
 
         return parsed_request
 
+    def get_request_template(self, request_dict):
+        """ get request template of testcase, which is testset request config updated with
+            testcase request, keys in request and request headers are converted to lowercase.
+            template does not depend on variables, thus it is computed once for each testcase
+            request, and only evaluated when the testcase runs.
+        @param request_dict: testcase request mapping
+        @return (dict) request template, which should not be modified
+        """
+        if not request_dict:
+            return copy.deepcopy(self.testset_request_config)
+
+        return self._get_request_template_entry(request_dict)[0]
+
+    def _get_request_template_entry(self, request_dict):
+        """ get cached (request_template, is_static) of testcase request, compute it on first get.
+        """
+        entry = self.request_templates.get(request_dict)
+        if entry is None:
+            request_config = utils.lower_config_dict_key({"request": request_dict})["request"]
+            request_template = utils.deep_update_dict(
+                copy.deepcopy(self.testset_request_config),
+                request_config
+            )
+            entry = (request_template, not is_lazy_content(request_template))
+            self.request_templates.set(request_dict, entry)
+
+        return entry
+
+    def is_static_request(self, request_dict):
+        """ check if testcase request references no variables or functions,
+            i.e. it is evaluated to the same request each time the testcase runs.
+        """
+        if not request_dict:
+            return False
+
+        return self._get_request_template_entry(request_dict)[1]
+
     def eval_check_item(self, validator, resp_obj):
         """ evaluate check item in validator
         @param (dict) validator
@@ -243,6 +444,7 @@ class Context(object):
             ])
             raise exception.ValidationError(err_msg)
 
+    @profiler.timed("validate")
     def validate(self, validators, resp_obj):
         """ check validators with the context variable mapping.
         @param (list) validators
@@ -47,3 +47,6 @@ class SuiteNotFound(NotFoundError):
 
 class TestcaseNotFound(NotFoundError):
     pass
+
+class MemoryBudgetExceeded(MyBaseError):
+    pass
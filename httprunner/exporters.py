@@ -0,0 +1,205 @@
+# encoding: utf-8
+""" streaming report writers, each test record is written as soon as the test finishes,
+    thus results of finished tests survive even if the run crashes.
+"""
+
+import io
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+from httprunner import logger
+from httprunner.compat import json
+from httprunner.report import get_report_path, get_result_stat
+
+# characters which are not allowed in XML 1.0
+illegal_xml_chars_regexp = re.compile(u"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class ReportWriter(object):
+    """ base class of streaming report writers.
+    """
+    extension = ""
+    description = ""
+
+    def __init__(self, report_name=None):
+        self.report_name = report_name
+        self.path = None
+        self.file = None
+
+    def start(self, start_at):
+        """ open report file named by start time, in the same folder with html report.
+        @param (datetime) start_at
+        """
+        self.path = get_report_path(start_at, self.report_name, self.extension)
+        self.file = io.open(self.path, 'wb+')
+        self.start_at = start_at
+
+    def write(self, record, duration):
+        """ write test record.
+        @param (dict) record: test record of HtmlTestResult
+        @param (float) duration: seconds of running the test
+        """
+        raise NotImplementedError
+
+    def close(self, result):
+        """ finish report with the final result.
+        @param (unittest.TestResult) result
+        """
+        self.file.close()
+        self.file = None
+        logger.log_info("Generated {}: {}".format(self.description, self.path))
+
+    def _write_text(self, text):
+        self.file.write(text.encode("utf-8"))
+
+
+class JsonLinesWriter(ReportWriter):
+    """ write each test record as a line of compact JSON, and a summary line at last.
+        {"type": "testcase", "name": "get token", "status": "success", "duration": 0.012, ...}
+        {"type": "summary", "success": true, "stat": {"testsRun": 1, ...}, "duration": 0.02}
+    """
+    extension = ".jsonl"
+    description = "JSON lines report"
+
+    def _write_line(self, content):
+        self._write_text(u"{}\n".format(json.dumps(content, ensure_ascii=False, separators=(",", ":"))))
+        self.file.flush()
+
+    def write(self, record, duration):
+        meta_data = record["meta_data"] or {}
+        self._write_line({
+            "type": "testcase",
+            "testset": record.get("testset", ""),
+            "name": record["name"],
+            "status": record["status"],
+            "duration": round(duration, 4),
+            "method": meta_data.get("method"),
+            "url": meta_data.get("url"),
+            "status_code": meta_data.get("status_code"),
+            "response_time_ms": meta_data.get("response_time_ms"),
+            "retries": meta_data.get("retries", 0),
+            "attachment": record["attachment"]
+        })
+
+    def close(self, result):
+        self._write_line({
+            "type": "summary",
+            "success": result.wasSuccessful(),
+            "stat": get_result_stat(result),
+            "duration": round(result.duration, 4)
+        })
+        super(JsonLinesWriter, self).close(result)
+
+
+class JUnitXmlWriter(ReportWriter):
+    """ write test records in JUnit XML format.
+        closing tags are rewritten after each record, thus the file is always well-formed XML;
+        counts of testsuite are filled in when the run finishes.
+    """
+    extension = ".xml"
+    description = "JUnit XML report"
+    footer = u"</testsuite>\n</testsuites>\n"
+
+    def start(self, start_at):
+        super(JUnitXmlWriter, self).start(start_at)
+        self._write_text(self._get_header())
+        self.records_start = self.records_end = self.file.tell()
+        self._write_footer()
+
+    def _get_header(self, result=None):
+        attributes = [
+            ("name", "HttpRunner"),
+            ("timestamp", self.start_at.strftime('%Y-%m-%dT%H:%M:%S'))
+        ]
+        if result is not None:
+            stat = get_result_stat(result)
+            attributes.extend([
+                ("tests", stat["testsRun"]),
+                ("failures", stat["failures"] + stat["unexpectedSuccesses"]),
+                ("errors", stat["errors"]),
+                ("skipped", stat["skipped"]),
+                ("time", "{:.3f}".format(result.duration))
+            ])
+
+        return u'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n<testsuite {}>\n'.format(
+            u" ".join(u"{}={}".format(key, quoteattr(str(value))) for key, value in attributes)
+        )
+
+    def _write_footer(self):
+        self._write_text(self.footer)
+        self.file.truncate()
+        self.file.flush()
+
+    def write(self, record, duration):
+        attachment = clean_xml_text(record["attachment"] or "")
+        message = attachment.strip().splitlines()[-1] if attachment.strip() else ""
+
+        lines = [u'<testcase classname={} name={} time="{:.3f}">'.format(
+            quoteattr(record.get("testset", "")),
+            quoteattr(clean_xml_text(record["name"] or "")),
+            duration
+        )]
+        status = record["status"]
+        if status in ["failure", "error"]:
+            lines.append(u"<{tag} message={message}>{content}</{tag}>".format(
+                tag=status,
+                message=quoteattr(message),
+                content=escape(attachment)
+            ))
+        elif status == "UnexpectedSuccess":
+            lines.append(u'<failure message="unexpected success"></failure>')
+        elif status == "skipped":
+            lines.append(u"<skipped message={}></skipped>".format(quoteattr(attachment)))
+
+        meta_data = record["meta_data"] or {}
+        if meta_data.get("url"):
+            lines.append(u"<system-out>{}</system-out>".format(escape(clean_xml_text(
+                u"{} {} {} {} ms".format(
+                    meta_data.get("method"),
+                    meta_data.get("url"),
+                    meta_data.get("status_code"),
+                    meta_data.get("response_time_ms")
+                )
+            ))))
+
+        lines.append(u"</testcase>\n")
+
+        self.file.seek(self.records_end)
+        self._write_text(u"\n".join(lines))
+        self.records_end = self.file.tell()
+        self._write_footer()
+
+    def close(self, result):
+        # header with counts is longer than the initial one, records are shifted after it
+        self.file.seek(self.records_start)
+        records_content = self.file.read(self.records_end - self.records_start)
+        self.file.seek(0)
+        self._write_text(self._get_header(result))
+        self.file.write(records_content)
+        self._write_footer()
+        super(JUnitXmlWriter, self).close(result)
+
+
+report_writers_mapping = {
+    "junit": JUnitXmlWriter,
+    "json": JsonLinesWriter
+}
+
+
+def create_writers(report_formats, report_name=None):
+    """ create streaming report writers by formats.
+    @param (list) report_formats: e.g. ["junit", "json"], "html" is ignored
+        as html report is rendered after the run.
+    """
+    return [
+        report_writers_mapping[report_format](report_name)
+        for report_format in report_formats
+        if report_format != "html"
+    ]
+
+
+def clean_xml_text(text):
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", "replace")
+
+    return illegal_xml_chars_regexp.sub(u"", text)
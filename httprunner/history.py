@@ -0,0 +1,185 @@
+# encoding: utf-8
+
+import io
+import os
+
+from httprunner import logger
+from httprunner.compat import json
+
+
+def get_testset_key(testset):
+    """ get stable key of testset, which is used to identify testset across runs and machines.
+    @param (dict) testset
+        {
+            "name": "desc1",
+            "config": {"path": "/home/user/project/tests/testcases/smoketest.yml"},
+            "testcases": []
+        }
+    @return (str) testset file path relative to current working directory,
+        or testset name if testset is not loaded from file.
+        e.g. "tests/testcases/smoketest.yml"
+    """
+    path = testset.get("config", {}).get("path")
+    if not path:
+        return testset.get("name", "")
+
+    if os.path.isabs(path):
+        path = os.path.relpath(path, os.getcwd())
+
+    return path.replace(os.sep, "/")
+
+
+# weight of the latest run when updating failure rate, earlier runs decay exponentially
+FAILURE_RATE_DECAY = 0.5
+
+
+def _update_failure_rate(failure_rate, failed):
+    return round(
+        (1 - FAILURE_RATE_DECAY) * failure_rate + FAILURE_RATE_DECAY * (1 if failed else 0),
+        4
+    )
+
+
+class TestHistory(object):
+    """ durations and failures recorded from previous runs, persisted in a small JSON file.
+        history file content is in format below:
+        {
+            "testsets": {
+                "tests/testcases/smoketest.yml": {
+                    "duration": 12.5,
+                    "combinations": 2,
+                    "runs": 10,
+                    "failures": 1,
+                    "failure_rate": 0.125,
+                    "testcases": {
+                        "get token": {
+                            "duration": 0.12,
+                            "runs": 20,
+                            "failures": 1,
+                            "failure_rate": 0.0625
+                        }
+                    }
+                }
+            }
+        }
+        duration of testcase is the average duration of one run,
+        failure_rate is decayed over runs, thus recent and flaky failures rank higher.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.testsets = {}
+        self.load()
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            logger.log_debug("history file not exist: {}".format(self.path))
+            return
+
+        with io.open(self.path, encoding='utf-8') as stream:
+            try:
+                content = json.load(stream)
+            except ValueError:
+                logger.log_warning("history file format invalid, ignore: {}".format(self.path))
+                return
+
+        self.testsets = content.get("testsets", {})
+
+    def dump(self):
+        dir_path = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(dir_path):
+            os.makedirs(dir_path)
+
+        content = json.dumps({"testsets": self.testsets}, indent=4, sort_keys=True)
+        with io.open(self.path, 'w', encoding='utf-8') as stream:
+            stream.write(u"{}\n".format(content))
+
+        logger.log_debug("history saved: {}".format(self.path))
+
+    def get_testset_duration(self, testset_key):
+        """ get expected duration of running the whole testset, None if not recorded.
+        """
+        record = self.testsets.get(testset_key)
+        if not record:
+            return None
+
+        return record["duration"]
+
+    def get_combination_duration(self, testset_key):
+        """ get expected duration of running one config parameters combination of testset.
+        """
+        record = self.testsets.get(testset_key)
+        if not record:
+            return None
+
+        return record["duration"] / max(record.get("combinations", 1), 1)
+
+    def get_testset_failure_rate(self, testset_key):
+        record = self.testsets.get(testset_key)
+        if not record:
+            return 0
+
+        return record.get("failure_rate", 0)
+
+    def record_testset(self, testset_key, duration, combinations=1, testcases_stat=None):
+        """ record duration and failures of running testset with the specified
+            config parameters combinations.
+            testset may be partially run when sharding by parameters,
+            thus duration is saved after scaling to the largest known combinations count.
+        @param (dict) testcases_stat: stat of each testcase in current run
+            {
+                "get token": {"runs": 3, "failures": 1, "duration": 0.36}
+            }
+        """
+        record = self.testsets.get(testset_key, {})
+        testcases_stat = testcases_stat or {}
+        combinations = max(combinations, 1)
+        total_combinations = max(combinations, record.get("combinations", 1))
+        failed = any(stat["failures"] for stat in testcases_stat.values())
+
+        testcases_record = record.get("testcases", {})
+        for name, stat in testcases_stat.items():
+            if not stat["runs"]:
+                continue
+
+            testcase_record = testcases_record.get(name, {})
+            testcases_record[name] = {
+                "duration": round(stat["duration"] / stat["runs"], 4),
+                "runs": testcase_record.get("runs", 0) + stat["runs"],
+                "failures": testcase_record.get("failures", 0) + stat["failures"],
+                "failure_rate": _update_failure_rate(
+                    testcase_record.get("failure_rate", 0),
+                    stat["failures"]
+                )
+            }
+
+        self.testsets[testset_key] = {
+            "duration": round(duration / combinations * total_combinations, 3),
+            "combinations": total_combinations,
+            "runs": record.get("runs", 0) + 1,
+            "failures": record.get("failures", 0) + (1 if failed else 0),
+            "failure_rate": _update_failure_rate(record.get("failure_rate", 0), failed),
+            "testcases": testcases_record
+        }
+
+    def sort_testsets_by_duration(self, testsets):
+        """ sort testsets in longest-expected-first order, which minimizes makespan
+            when testsets are distributed to parallel workers.
+            testsets never run before are put first, as their durations are unknown.
+        """
+        def get_sort_key(testset):
+            duration = self.get_testset_duration(get_testset_key(testset))
+            return (duration is not None, -(duration or 0))
+
+        return sorted(testsets, key=get_sort_key)
+
+    def sort_testsets_by_failure_rate(self, testsets):
+        """ sort testsets with historically failing or flaky ones first,
+            which gets faster feedback in failfast mode.
+            testsets with the same failure rate are sorted by duration, shortest first.
+        """
+        def get_sort_key(testset):
+            testset_key = get_testset_key(testset)
+            duration = self.get_testset_duration(testset_key) or 0
+            return (-self.get_testset_failure_rate(testset_key), duration)
+
+        return sorted(testsets, key=get_sort_key)
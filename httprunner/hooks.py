@@ -0,0 +1,89 @@
+# encoding: utf-8
+""" setup and teardown hooks of testsets and testcases.
+    hook actions are compiled once into pipelines, thus running hooks repeatedly, e.g. in locust
+    iterations or testcases with times, only evaluates variables in hook arguments.
+"""
+
+from httprunner import exception, logger, testcase
+from httprunner.built_in import setup_hook_prepare_kwargs
+from httprunner.context import is_lazy_content
+
+# hooks called before/after hooks of each testcase, with request/response
+registered_hooks = {
+    "setup": [setup_hook_prepare_kwargs],
+    "teardown": []
+}
+
+
+def register_hook(hook_type, func):
+    """ register python callable as hook of all testcases.
+    @param (str) hook_type: "setup" or "teardown"
+    @param (callable) func: setup hooks are called with request kwargs before testcase setup hooks,
+        teardown hooks are called with response object after testcase teardown hooks.
+    """
+    if hook_type not in registered_hooks:
+        raise exception.ParamsError("hook type should only be setup or teardown: {}".format(hook_type))
+
+    registered_hooks[hook_type].append(func)
+
+
+def unregister_hook(hook_type, func):
+    if func in registered_hooks.get(hook_type, []):
+        registered_hooks[hook_type].remove(func)
+
+
+class HookAction(object):
+    """ compiled hook action, action could be:
+        - python callable, which is called with hook arguments
+        - single function call, e.g. "${setup_hook_add_kwargs($request)}", function is looked up
+          in context and called with evaluated arguments
+        - any other content, which is evaluated in context
+    """
+    __slots__ = ("action", "func", "func_name", "args", "kwargs", "lazy_args")
+
+    def __init__(self, action):
+        self.action = action
+        self.func = action if callable(action) else None
+        self.func_name = None
+        self.args = []
+        self.kwargs = {}
+        self.lazy_args = False
+
+        functions = testcase.extract_functions(action) if self.func is None else []
+        if len(functions) == 1 and action == "${" + functions[0] + "}":
+            function_meta = testcase.parse_function(functions[0])
+            self.func_name = function_meta["func_name"]
+            self.args = function_meta["args"]
+            self.kwargs = function_meta["kwargs"]
+            self.lazy_args = is_lazy_content(self.args) or is_lazy_content(self.kwargs)
+
+    def __call__(self, context, *hook_args):
+        logger.log_debug("call hook: {}".format(self.action))
+        if self.func is not None:
+            return self.func(*hook_args)
+
+        if self.func_name is None or self.func_name in ["parameterize", "P"]:
+            return context.eval_content(self.action)
+
+        func = context.testcase_parser.get_bind_function(self.func_name)
+        if self.lazy_args:
+            args = context.eval_content(self.args)
+            kwargs = context.eval_content(self.kwargs)
+        else:
+            args, kwargs = self.args, self.kwargs
+
+        return func(*args, **kwargs)
+
+
+class HookPipeline(object):
+    """ hook actions compiled in order.
+    """
+    def __init__(self, actions):
+        self.actions = [HookAction(action) for action in actions or []]
+
+    def __len__(self):
+        return len(self.actions)
+
+    def run(self, context, *hook_args):
+        for action in self.actions:
+            action(context, *hook_args)
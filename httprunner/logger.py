@@ -4,7 +4,6 @@ import logging
 import sys
 
 from colorama import Back, Fore, Style, init
-from colorlog import ColoredFormatter
 
 init(autoreset=True)
 
@@ -18,6 +17,8 @@ log_colors_config = {
 
 def setup_logger(log_level, log_file=None):
     """setup root logger with ColoredFormatter."""
+    from colorlog import ColoredFormatter
+
     level = getattr(logging, log_level.upper(), None)
     if not level:
         color_print("Invalid log level: %s" % log_level, "RED")
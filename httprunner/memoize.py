@@ -0,0 +1,147 @@
+# encoding: utf-8
+""" memoization of pure functions called in testcases, e.g. ${get_sign($device_sn, $app_version)}.
+    a function is pure if its result only depends on its arguments, which could be declared by
+    decorating it with @pure in debugtalk.py, or listing it in pure_functions of testset config.
+    compiled forms of testcase blocks are cached by identity, e.g. request templates.
+"""
+
+import copy
+import threading
+
+from httprunner.compat import OrderedDict, basestring, numeric_types
+
+# results of these types are immutable, which could be returned from cache without copying
+immutable_types = (basestring, numeric_types, bool, type(None), frozenset)
+
+
+def pure(func):
+    """ decorator, mark function as pure, thus its results are cached by arguments.
+
+    e.g. in debugtalk.py
+        from httprunner.memoize import pure
+
+        @pure
+        def get_sign(*args):
+            ...
+    """
+    func.__httprunner_pure__ = True
+    return func
+
+
+def is_pure(func):
+    return getattr(func, "__httprunner_pure__", False)
+
+
+class FunctionCache(object):
+    """ bounded LRU cache of function results, keyed by function and arguments.
+        it is shared by all testsets and threads in current process.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def call(self, func, args, kwargs):
+        """ get result of func(*args, **kwargs) from cache, or call func and cache the result.
+            if arguments are unhashable, e.g. list or dict, func is called without caching.
+            arguments of different types are cached separately, e.g. 1, 1.0 and True.
+        """
+        try:
+            kwargs_items = tuple(sorted(kwargs.items()))
+            key = (
+                func,
+                tuple(args),
+                kwargs_items,
+                tuple(type(arg) for arg in args),
+                tuple(type(value) for _, value in kwargs_items)
+            )
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if key in self.results:
+                self.hits += 1
+                result = self.results.pop(key)
+                # move to the end as most recently used
+                self.results[key] = result
+                return self._copy(result)
+
+            self.misses += 1
+
+        result = func(*args, **kwargs)
+
+        with self._lock:
+            self.results[key] = result
+            while len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+
+        return self._copy(result)
+
+    @staticmethod
+    def _copy(result):
+        """ copy mutable result, thus callers could not modify cached result.
+        """
+        if isinstance(result, immutable_types):
+            return result
+
+        return copy.deepcopy(result)
+
+    def clear(self):
+        with self._lock:
+            self.results.clear()
+            self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        """ get cache stats.
+        @return (dict)
+            {"hits": 900, "misses": 100, "size": 100, "maxsize": 1024}
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.results),
+            "maxsize": self.maxsize
+        }
+
+
+class IdentityCache(object):
+    """ bounded LRU cache of values computed from objects, keyed by identity of object,
+        e.g. compiled form of testcase block, which is unhashable dict or list.
+        object is referenced by its entry, thus its id could not be reused by other objects
+        until the entry is evicted.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, obj, default=None):
+        key = id(obj)
+        with self._lock:
+            if key not in self.entries:
+                return default
+
+            entry = self.entries.pop(key)
+            # move to the end as most recently used
+            self.entries[key] = entry
+            return entry[1]
+
+    def set(self, obj, value):
+        with self._lock:
+            self.entries.pop(id(obj), None)
+            self.entries[id(obj)] = (obj, value)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+function_cache = FunctionCache()
@@ -0,0 +1,314 @@
+# encoding: utf-8
+""" memory growth guardrails of long runs.
+    when enabled, RSS and memory traced by tracemalloc are sampled at intervals, memory retained
+    by each testcase is accumulated, and top allocation sites by growth are reported at last.
+    if memory budget is specified, the run is stopped with MemoryBudgetExceeded when RSS exceeds it.
+"""
+
+import collections
+import io
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from httprunner import exception, logger
+from httprunner.compat import basestring, json, numeric_types
+
+try:
+    import tracemalloc
+except ImportError:
+    # not available before Python 3.4
+    tracemalloc = None
+
+MB = 1024 * 1024
+size_regexp = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMG]?)B?$", re.I)
+size_units = {"": MB, "K": 1024, "M": MB, "G": 1024 * MB}
+
+_monitor = None
+
+
+def parse_size(size):
+    """ parse memory size to bytes.
+    @param size: size with units, e.g. "512MB", "2G", "800K"; plain numbers are in MB.
+    @return (int) bytes
+    """
+    if isinstance(size, numeric_types) and not isinstance(size, bool):
+        value, unit = size, ""
+    else:
+        matched = size_regexp.match(size.strip()) if isinstance(size, basestring) else None
+        if not matched:
+            raise exception.ParamsError("Invalid memory size: {}".format(size))
+
+        value, unit = matched.groups()
+
+    size_bytes = int(float(value) * size_units[unit.upper()])
+    if size_bytes <= 0:
+        raise exception.ParamsError("Invalid memory size: {}".format(size))
+
+    return size_bytes
+
+
+def get_rss():
+    """ get resident set size of current process in bytes.
+        peak RSS is returned if current RSS is not available, e.g. on macOS.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes on Linux
+    return max_rss if os.uname()[0] == "Darwin" else max_rss * 1024
+
+
+def to_mb(size):
+    return round(size / float(MB), 2) if size is not None else None
+
+
+class MemoryMonitor(object):
+    """ sample memory in a background thread, and account memory retained by each testcase.
+    """
+    def __init__(self, interval=10, budget=None, top=10, nframes=1):
+        """
+        @param (float) interval: seconds between samples
+        @param budget: RSS limit, bytes or size with units, e.g. "2GB"
+        @param (int) top: count of allocation sites and testcases in report
+        @param (int) nframes: frames of allocation tracebacks traced by tracemalloc
+        """
+        self.interval = interval
+        self.budget = parse_size(budget) if budget is not None else None
+        self.top = top
+        self.nframes = nframes
+        # samples of long runs are bounded, older ones are dropped
+        self.samples = collections.deque(maxlen=10000)
+        # {(testset_key, testcase_name): {"runs": 10, "growth": 1024}}
+        self.steps = {}
+        self.current_step = None
+        self.peak_rss = 0
+        self.exceeded_rss = None
+        self.start_at = None
+        self.baseline = None
+        self.snapshot = None
+        self._started_tracing = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def tracing(self):
+        return tracemalloc is not None and tracemalloc.is_tracing()
+
+    def start(self):
+        self.start_at = time.time()
+        if tracemalloc is None:
+            logger.log_warning("tracemalloc is not available, only RSS is sampled.")
+        elif not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+            self._started_tracing = True
+
+        if self.tracing:
+            self.baseline = self._take_snapshot()
+
+        self.sample()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.sample()
+        if self.tracing:
+            self.snapshot = self._take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+        ])
+
+    def sample(self):
+        rss = get_rss()
+        sample = {
+            "offset": round(time.time() - self.start_at, 1),
+            "rss_mb": to_mb(rss),
+            "traced_mb": to_mb(tracemalloc.get_traced_memory()[0]) if self.tracing else None,
+            "step": self.current_step
+        }
+        self.samples.append(sample)
+
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+            if self.budget and rss > self.budget and self.exceeded_rss is None:
+                self.exceeded_rss = rss
+                logger.log_error(self.get_budget_error())
+
+        return sample
+
+    @property
+    def budget_exceeded(self):
+        return self.exceeded_rss is not None
+
+    def get_budget_error(self):
+        testset_key, name = self.current_step or ("", "")
+        return "memory budget exceeded: RSS {} MB > budget {} MB, when running {} in {}".format(
+            to_mb(self.exceeded_rss), to_mb(self.budget), name, testset_key)
+
+    @contextmanager
+    def track_step(self, testset_key, name):
+        """ account memory retained by running the testcase, i.e. traced memory growth.
+            it is approximate if testcases are run concurrently.
+        """
+        if self.budget_exceeded:
+            raise exception.MemoryBudgetExceeded(self.get_budget_error())
+
+        key = self.current_step = (testset_key, name)
+        traced_before = tracemalloc.get_traced_memory()[0] if self.tracing else None
+        try:
+            yield
+        finally:
+            step = self.steps.setdefault(key, {"runs": 0, "growth": 0})
+            step["runs"] += 1
+            if traced_before is not None and self.tracing:
+                step["growth"] += tracemalloc.get_traced_memory()[0] - traced_before
+
+    def get_top_sites(self):
+        """ get top allocation sites by growth since monitor started.
+        """
+        if self.baseline is None:
+            return []
+
+        snapshot = self.snapshot or self._take_snapshot()
+        stats = snapshot.compare_to(self.baseline, "traceback" if self.nframes > 1 else "lineno")
+        top_sites = []
+        for stat in stats[:self.top]:
+            # most recent frame first
+            frames = list(stat.traceback)
+            if sys.version_info >= (3, 7):
+                frames.reverse()
+
+            top_sites.append({
+                "site": "{}:{}".format(frames[0].filename, frames[0].lineno),
+                "traceback": ["{}:{}".format(frame.filename, frame.lineno) for frame in frames],
+                "growth_kb": round(stat.size_diff / 1024.0, 1),
+                "count": stat.count_diff
+            })
+
+        return top_sites
+
+    def get_report(self):
+        """ get memory report.
+        @return (dict)
+            {
+                "interval": 10,
+                "budget_mb": 2048,
+                "budget_exceeded": False,
+                "peak_rss_mb": 120.5,
+                "samples": [{"offset": 10.0, "rss_mb": 80.2, "traced_mb": 12.1, "step": ["testset", "get token"]}],
+                "top_sites": [{"site": "httprunner/report.py:446", "traceback": [...], "growth_kb": 2048.0, "count": 1000}],
+                "top_steps": [{"testset": "testset", "name": "get token", "runs": 1000, "growth_kb": 512.0}]
+            }
+        """
+        top_steps = sorted(self.steps.items(), key=lambda item: -item[1]["growth"])[:self.top]
+        return {
+            "interval": self.interval,
+            "budget_mb": to_mb(self.budget),
+            "budget_exceeded": self.budget_exceeded,
+            "peak_rss_mb": to_mb(self.peak_rss),
+            "samples": list(self.samples),
+            "top_sites": self.get_top_sites(),
+            "top_steps": [
+                {
+                    "testset": testset_key,
+                    "name": name,
+                    "runs": step["runs"],
+                    "growth_kb": round(step["growth"] / 1024.0, 1)
+                }
+                for (testset_key, name), step in top_steps
+                if self.baseline is not None
+            ]
+        }
+
+
+def enable(interval=10, budget=None, top=10, nframes=1):
+    """ start monitoring memory.
+    """
+    global _monitor
+    _monitor = MemoryMonitor(interval, budget, top, nframes)
+    _monitor.start()
+    return _monitor
+
+
+def disable():
+    """ stop monitoring memory.
+    @return MemoryMonitor, or None if not enabled
+    """
+    global _monitor
+    monitor, _monitor = _monitor, None
+    if monitor:
+        monitor.stop()
+
+    return monitor
+
+
+def get_monitor():
+    return _monitor
+
+
+@contextmanager
+def track_step(testset_key, name):
+    """ account memory retained by the testcase if memory is monitored, otherwise do nothing.
+    """
+    if _monitor is None:
+        yield
+    else:
+        with _monitor.track_step(testset_key, name):
+            yield
+
+
+def budget_exceeded():
+    return _monitor is not None and _monitor.budget_exceeded
+
+
+def dump_report(report, path):
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(report, indent=4, ensure_ascii=False))
+
+
+def print_report(report):
+    logger.color_print("\n================== Memory ==================", "GREEN")
+    samples = report["samples"]
+    if samples:
+        print("RSS: {} MB at start, {} MB at end, {} MB at peak{}".format(
+            samples[0]["rss_mb"],
+            samples[-1]["rss_mb"],
+            report["peak_rss_mb"],
+            ", budget {} MB".format(report["budget_mb"]) if report["budget_mb"] else ""
+        ))
+
+    if report["top_sites"]:
+        print("\ntop allocation sites by growth:")
+        for site in report["top_sites"]:
+            print("{:>12.1f} KB {:>8} blocks  {}".format(site["growth_kb"], site["count"], site["site"]))
+
+    if report["top_steps"]:
+        print("\ntop testcases by retained memory:")
+        for step in report["top_steps"]:
+            print("{:>12.1f} KB {:>8} runs  {} ({})".format(
+                step["growth_kb"], step["runs"], step["name"], step["testset"]))
@@ -0,0 +1,192 @@
+# encoding: utf-8
+""" lightweight profiling of hrun phases.
+    functions decorated with timed() are timed only when profiling is enabled,
+    otherwise the overhead is a single flag check.
+"""
+
+import functools
+import io
+import os
+import sys
+import threading
+import time
+
+from httprunner import logger
+
+_enabled = False
+_timings = {}
+_cprofile = None
+_sampler = None
+
+
+def timed(phase):
+    """ decorator, record duration of each call into phase when profiling is enabled.
+        durations are inclusive, nested phases are also counted in outer phases.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            start_at = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _timings.setdefault(phase, []).append(time.time() - start_at)
+
+        return wrapper
+
+    return decorator
+
+
+class StackSampler(object):
+    """ sample stacks of all threads periodically, aggregated in collapsed format,
+        which could be rendered by flamegraph.pl or speedscope.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = {}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        current_thread_id = threading.current_thread().ident
+        while not self._stopped.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == current_thread_id:
+                    continue
+
+                stack = self.get_stack(frame)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+            time.sleep(self.interval)
+
+    @staticmethod
+    def get_stack(frame):
+        """ get collapsed stack of frame, outermost first.
+            e.g. "main_hrun (cli.py:21);run (task.py:392)"
+        """
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append("{} ({}:{})".format(
+                code.co_name,
+                os.path.basename(code.co_filename),
+                code.co_firstlineno
+            ).replace(";", ":"))
+            frame = frame.f_back
+
+        return ";".join(reversed(names))
+
+    def dump(self, path):
+        with io.open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(u"{} {}\n".format(stack, count))
+
+
+def enable(pstats_path=None, collapsed_path=None):
+    """ start profiling.
+    @param (str) pstats_path: if specified, run with cProfile and dump stats to the path,
+        which could be loaded by pstats, snakeviz, etc.
+    @param (str) collapsed_path: if specified, sample stacks and dump them
+        to the path in flamegraph collapsed format.
+    """
+    global _enabled, _cprofile, _sampler
+    _enabled = True
+
+    if pstats_path:
+        import cProfile
+        _cprofile = (cProfile.Profile(), pstats_path)
+        _cprofile[0].enable()
+
+    if collapsed_path:
+        _sampler = (StackSampler(), collapsed_path)
+        _sampler[0].start()
+
+
+def disable():
+    """ stop profiling, and dump cProfile stats and collapsed stacks if specified when enabled.
+    """
+    global _enabled, _cprofile, _sampler
+    _enabled = False
+
+    if _sampler:
+        sampler, collapsed_path = _sampler
+        sampler.stop()
+        sampler.dump(collapsed_path)
+        logger.log_info("Dumped collapsed stacks: {}".format(collapsed_path))
+        _sampler = None
+
+    if _cprofile:
+        profile, pstats_path = _cprofile
+        profile.disable()
+        profile.dump_stats(pstats_path)
+        logger.log_info("Dumped cProfile stats: {}".format(pstats_path))
+        _cprofile = None
+
+
+def reset():
+    _timings.clear()
+
+
+def get_percentile(sorted_values, percent):
+    """ get percentile of sorted values with nearest-rank method.
+    """
+    index = max(int(round(percent / 100.0 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def get_stats():
+    """ get aggregated timings of each phase, in seconds.
+    @return (dict)
+        {
+            "request": {
+                "count": 10, "total": 1.2, "mean": 0.12,
+                "p50": 0.1, "p90": 0.2, "p99": 0.3, "max": 0.3
+            }
+        }
+    """
+    stats = {}
+    for phase, durations in list(_timings.items()):
+        durations = sorted(durations)
+        total = sum(durations)
+        stats[phase] = {
+            "count": len(durations),
+            "total": total,
+            "mean": total / len(durations),
+            "p50": get_percentile(durations, 50),
+            "p90": get_percentile(durations, 90),
+            "p99": get_percentile(durations, 99),
+            "max": durations[-1]
+        }
+
+    return stats
+
+
+def print_stats():
+    stats = get_stats()
+    if not stats:
+        return
+
+    columns = ["count", "total(s)", "mean(ms)", "p50(ms)", "p90(ms)", "p99(ms)", "max(ms)"]
+    lines = ["{:<20}".format("phase") + "".join("{:>10}".format(column) for column in columns)]
+    for phase, stat in sorted(stats.items(), key=lambda item: -item[1]["total"]):
+        values = ["{:>10}".format(stat["count"]), "{:>10.3f}".format(stat["total"])]
+        values.extend(
+            "{:>10.2f}".format(stat[key] * 1000)
+            for key in ["mean", "p50", "p90", "p99", "max"]
+        )
+        lines.append("{:<20}".format(phase) + "".join(values))
+
+    logger.color_print("\n================== Profile (inclusive) ==================", "GREEN")
+    print("\n".join(lines))
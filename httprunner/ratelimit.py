@@ -0,0 +1,120 @@
+# encoding: utf-8
+""" rate limiting and concurrency caps of requests to each host.
+    limiters are shared by all runners and threads in current process,
+    thus testsets run concurrently are limited together.
+"""
+
+import threading
+import time
+
+from httprunner import exception
+from requests.compat import urlparse
+
+# monotonic clock is not available in Python 2
+clock = getattr(time, "monotonic", time.time)
+
+
+class TokenBucket(object):
+    """ token bucket of rate tokens per second, at most burst tokens are accumulated.
+        tokens are reserved in order, callers wait until their reserved tokens are refilled.
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, self.rate))
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """ take one token.
+        @return (float) seconds to wait before the token is available
+        """
+        with self._lock:
+            now = clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """ take one token, wait if no token available.
+        @return (float) seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+class RateLimiter(object):
+    """ limit requests per second and max in-flight requests.
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None, per_group=False):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.per_group = per_group
+
+    def acquire(self):
+        """ wait for an in-flight slot and a token, release() must be called after request.
+        @return (float) seconds waited
+        """
+        start_at = clock()
+        if self.in_flight is not None:
+            self.in_flight.acquire()
+
+        if self.bucket is not None:
+            self.bucket.acquire()
+
+        return clock() - start_at
+
+    def release(self):
+        if self.in_flight is not None:
+            self.in_flight.release()
+
+
+# rate limiters of each (host, group, config), shared by all sessions in current process
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+
+def reset():
+    """ remove all rate limiters, e.g. between test runs.
+    """
+    with rate_limiters_lock:
+        rate_limiters.clear()
+
+
+def get_rate_limiter(url, group, rate_limit_config):
+    """ get rate limiter of url host and group, create it if not exists.
+        if per_group is not enabled, requests of all groups to the host share one limiter.
+        requests limited by different configs do not share limiters,
+        thus rate limit in testset config overrides the one specified by command line.
+    @param (str) url: absolute request url
+    @param (str) group: request group name, could be None
+    @param (dict) rate_limit_config: arguments of RateLimiter
+        e.g. {"rate": 10, "burst": 10, "max_in_flight": 4, "per_group": False}
+    """
+    if not isinstance(rate_limit_config, dict):
+        raise exception.ParamsError("Invalid rate_limit config: {}".format(rate_limit_config))
+
+    host = urlparse(url).netloc
+    try:
+        config_key = tuple(sorted(rate_limit_config.items()))
+        key = (host, group if rate_limit_config.get("per_group") else None, config_key)
+        hash(key)
+    except TypeError:
+        raise exception.ParamsError("Invalid rate_limit config: {}".format(rate_limit_config))
+
+    with rate_limiters_lock:
+        if key not in rate_limiters:
+            try:
+                rate_limiters[key] = RateLimiter(**rate_limit_config)
+            except TypeError as ex:
+                raise exception.ParamsError(
+                    "Invalid rate_limit config: {}, {}".format(rate_limit_config, ex))
+
+        return rate_limiters[key]
@@ -1,18 +1,24 @@
 # encoding: utf-8
 
+import atexit
+import gzip
+import hashlib
 import io
+import logging
+import mimetypes
 import os
 import platform
+import shutil
+import tempfile
 import time
 import unittest
 from base64 import b64encode
 from collections import Iterable, OrderedDict
 from datetime import datetime
 
-from httprunner import logger
+from httprunner import logger, profiler
 from httprunner.__about__ import __version__
-from httprunner.compat import basestring, bytes, json, numeric_types
-from jinja2 import Template, escape
+from httprunner.compat import basestring, bytes, intern, json, numeric_types
 from requests.structures import CaseInsensitiveDict
 
 
@@ -26,19 +32,27 @@ def get_platform():
         "platform": platform.platform()
     }
 
+def get_result_stat(result):
+    """ get counts of test result, results which only keep the latest failures,
+        e.g. SoakResult, count all of them in counts.
+    """
+    stat = {
+        'testsRun': result.testsRun,
+        'failures': len(result.failures),
+        'errors': len(result.errors),
+        'skipped': len(result.skipped),
+        'expectedFailures': len(result.expectedFailures),
+        'unexpectedSuccesses': len(result.unexpectedSuccesses)
+    }
+    stat.update(getattr(result, "counts", {}))
+    return stat
+
 def get_summary(result):
     """ get summary from test result
     """
     summary = {
         "success": result.wasSuccessful(),
-        "stat": {
-            'testsRun': result.testsRun,
-            'failures': len(result.failures),
-            'errors': len(result.errors),
-            'skipped': len(result.skipped),
-            'expectedFailures': len(result.expectedFailures),
-            'unexpectedSuccesses': len(result.unexpectedSuccesses)
-        },
+        "stat": get_result_stat(result),
         "platform": get_platform()
     }
     summary["stat"]["successes"] = summary["stat"]["testsRun"] \
@@ -48,21 +62,73 @@ def get_summary(result):
         - summary["stat"]["expectedFailures"] \
         - summary["stat"]["unexpectedSuccesses"]
 
-    if getattr(result, "records", None):
+    if hasattr(result, "records"):
         summary["time"] = {
             'start_at': datetime.fromtimestamp(result.start_at),
             'duration': result.duration
         }
-        summary["records"] = result.records
+        summary["records"] = list(result.records)
     else:
         summary["records"] = []
 
     return summary
 
-def render_html_report(summary, html_report_name=None, html_report_template=None):
+def get_report_path(start_at, report_name=None, extension=".html"):
+    """ get report file path, and make sure report folder exists.
+    @param (datetime) start_at: start time of test run
+    @param (str) report_name: if specified, report is saved in a sub folder with the name
+    @param (str) extension: report file extension, e.g. ".html", ".xml"
+    @return (str) report file path
+        e.g. reports/2018-06-01-12-30-00.html
+             reports/smoketest/smoketest-2018-06-01-12-30-00.xml
+    """
+    report_dir_path = os.path.join(os.getcwd(), "reports")
+    start_datetime = start_at.strftime('%Y-%m-%d-%H-%M-%S')
+    if report_name:
+        report_dir_path = os.path.join(report_dir_path, report_name)
+        file_name = "{}-{}{}".format(report_name, start_datetime, extension)
+    else:
+        file_name = "{}{}".format(start_datetime, extension)
+
+    if not os.path.isdir(report_dir_path):
+        os.makedirs(report_dir_path)
+
+    return os.path.join(report_dir_path, file_name)
+
+
+# jinja2 environments of each template folder, which keep compiled templates in memory
+template_environments = {}
+
+
+def get_template(template_path):
+    """ get compiled jinja2 template, compiled templates are cached in memory,
+        and bytecode is cached in file system across processes.
+        template is recompiled automatically if template file is modified.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    template_dir_path, template_name = os.path.split(os.path.abspath(template_path))
+    environment = template_environments.get(template_dir_path)
+    if environment is None:
+        environment = Environment(
+            loader=FileSystemLoader(template_dir_path),
+            bytecode_cache=FileSystemBytecodeCache(),
+            auto_reload=True
+        )
+        template_environments[template_dir_path] = environment
+
+    return environment.get_template(template_name)
+
+
+@profiler.timed("render_html_report")
+def render_html_report(summary, html_report_name=None, html_report_template=None,
+                       body_limit=None, compress_bodies=False):
     """ render html report with specified report name and template
         if html_report_name is not specified, use current datetime
         if html_report_template is not specified, use default report template
+        if body_limit is specified, bodies longer than body_limit are truncated in report,
+            full bodies and images are saved in bodies folder beside report and linked from report.
+        if compress_bodies is True, bodies saved in bodies folder are gzip compressed.
     """
     if not html_report_template:
         html_report_template = os.path.join(
@@ -75,66 +141,328 @@ def render_html_report(summary, html_report_name=None, html_report_template=None
         logger.log_info("render with html report template: {}".format(html_report_template))
 
     logger.log_info("Start to render Html report ...")
-    logger.log_debug("render data: {}".format(summary))
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        # formatting summary costs as much as the size of all bodies
+        logger.log_debug("render data: {}".format(summary))
 
-    report_dir_path = os.path.join(os.getcwd(), "reports")
-    start_datetime = summary["time"]["start_at"].strftime('%Y-%m-%d-%H-%M-%S')
-    if html_report_name:
-        summary["html_report_name"] = html_report_name
-        report_dir_path = os.path.join(report_dir_path, html_report_name)
-        html_report_name += "-{}.html".format(start_datetime)
-    else:
-        summary["html_report_name"] = ""
-        html_report_name = "{}.html".format(start_datetime)
+    summary["html_report_name"] = html_report_name or ""
+    report_path = get_report_path(summary["time"]["start_at"], html_report_name, ".html")
+    report_dir_path = os.path.dirname(report_path)
 
-    if not os.path.isdir(report_dir_path):
-        os.makedirs(report_dir_path)
+    if body_limit is not None:
+        body_store = BodyStore(os.path.join(report_dir_path, "bodies"), compress_bodies)
+    else:
+        body_store = None
 
     for record in summary.get("records"):
         meta_data = record['meta_data']
-        stringify_body(meta_data, 'request')
-        stringify_body(meta_data, 'response')
+        stringify_body(meta_data, 'request', body_limit, body_store)
+        stringify_body(meta_data, 'response', body_limit, body_store)
 
-    with io.open(html_report_template, "r", encoding='utf-8') as fp_r:
-        template_content = fp_r.read()
-        report_path = os.path.join(report_dir_path, html_report_name)
-        with io.open(report_path, 'w', encoding='utf-8') as fp_w:
-            rendered_content = Template(template_content).render(summary)
-            fp_w.write(rendered_content)
+    template = get_template(html_report_template)
+    with io.open(report_path, 'w', encoding='utf-8') as fp_w:
+        # write rendered content in chunks instead of buffering the whole report
+        for chunk in template.generate(summary):
+            fp_w.write(chunk)
 
     logger.log_info("Generated Html report: {}".format(report_path))
 
     return report_path
 
-def stringify_body(meta_data, request_or_response):
+class BodyStore(object):
+    """ save bodies as files in folder, named by sha1 of content,
+        thus identical bodies are saved only once, even across reports in the same folder.
+    """
+    def __init__(self, dir_path, compress=False):
+        self.dir_path = dir_path
+        self.compress = compress
+
+    def save(self, content, extension, compressible=True):
+        """ save content if not saved before.
+        @param (bytes) content
+        @param (str) extension: file extension, e.g. ".json"
+        @param (bool) compressible: False if file is loaded by browser directly, e.g. image src
+        @return (str) saved file path relative to report folder, e.g. "bodies/3f78...a1.json"
+        """
+        compress = self.compress and compressible
+        file_name = hashlib.sha1(content).hexdigest() + extension
+        if compress:
+            file_name += ".gz"
+
+        file_path = os.path.join(self.dir_path, file_name)
+        if not os.path.isfile(file_path):
+            if not os.path.isdir(self.dir_path):
+                os.makedirs(self.dir_path)
+
+            open_file = gzip.open if compress else io.open
+            with open_file(file_path, 'wb') as f:
+                f.write(content)
+
+        return "{}/{}".format(os.path.basename(self.dir_path), file_name)
+
+
+# mimetypes guesses uncommon extensions for these types on some platforms, e.g. ".bat", ".jpe"
+common_file_extensions = {
+    "application/json": ".json",
+    "text/plain": ".txt",
+    "text/html": ".html",
+    "image/jpeg": ".jpg"
+}
+
+
+def get_file_extension(content_type, default=".txt"):
+    """ get file extension by content type, e.g. "image/png" => ".png"
+    """
+    mime_type = content_type.split(";")[0].strip().lower()
+    if mime_type in common_file_extensions:
+        return common_file_extensions[mime_type]
+
+    return mimetypes.guess_extension(mime_type) or default
+
+
+def stringify_body(meta_data, request_or_response, body_limit=None, body_store=None):
+    """ convert body to string for rendering.
+        if body_limit and body_store are specified, body longer than body_limit is truncated,
+        full body is saved in body_store and linked in meta_data, images are saved as files too.
+            {
+                "response_body": "truncated body",
+                "response_body_link": "bodies/3f78...a1.json",
+                "response_body_size": 102400
+            }
+    """
+    from jinja2 import escape
+
+    body_key = '{}_body'.format(request_or_response)
+    if body_key not in meta_data:
+        # request is not sent, e.g. testcase failed in setup hooks
+        return
+
     headers = meta_data['{}_headers'.format(request_or_response)]
-    body = meta_data.get('{}_body'.format(request_or_response))
+    body = meta_data.get(body_key)
+    content_type = headers.get("Content-Type", "")
+
+    def truncate(content, extension):
+        """ save full content if its encoded length is longer than body limit.
+        @return (bytes) content truncated to body limit, or None if not truncated
+        """
+        if body_store is None:
+            return None
+
+        if not isinstance(content, bytes):
+            content = content.encode("utf-8")
+
+        if len(content) <= body_limit:
+            return None
+
+        meta_data[body_key + "_link"] = body_store.save(content, extension)
+        meta_data[body_key + "_size"] = len(content)
+        return content[:body_limit]
+
+    if isinstance(body, BodyRef):
+        body = body.load()
 
     if isinstance(body, CaseInsensitiveDict):
         body = json.dumps(dict(body), ensure_ascii=False)
 
     elif isinstance(body, (dict, list)):
         body = json.dumps(body, indent=2, ensure_ascii=False)
+        truncated = truncate(body, ".json")
+        if truncated is not None:
+            # drop character split by truncation
+            body = truncated.decode("utf-8", "ignore")
 
     elif isinstance(body, bytes):
-        resp_content_type = headers.get("Content-Type", "")
         try:
-            if "image" in resp_content_type:
+            if "image" in content_type:
                 meta_data["response_data_type"] = "image"
-                body = "data:{};base64,{}".format(
-                    resp_content_type,
-                    b64encode(body).decode('utf-8')
-                )
+                if body_store is not None:
+                    # images are rendered as img src, which could not be compressed
+                    body = body_store.save(
+                        body, get_file_extension(content_type, ".img"), compressible=False)
+                else:
+                    body = "data:{};base64,{}".format(
+                        content_type,
+                        b64encode(body).decode('utf-8')
+                    )
             else:
-                body = escape(body.decode("utf-8"))
+                truncated = truncate(body, get_file_extension(content_type, ".bin"))
+                if truncated is not None:
+                    body = escape(truncated.decode("utf-8", "replace"))
+                else:
+                    body = escape(body.decode("utf-8"))
         except UnicodeDecodeError:
             pass
 
-    elif not isinstance(body, (basestring, numeric_types, Iterable)):
+    elif isinstance(body, basestring):
+        truncated = truncate(body, get_file_extension(content_type))
+        if truncated is not None:
+            body = truncated.decode("utf-8", "ignore")
+
+    elif not isinstance(body, (numeric_types, Iterable)):
         # class instance, e.g. MultipartEncoder()
         body = repr(body)
 
-    meta_data['{}_body'.format(request_or_response)] = body
+    meta_data[body_key] = body
+
+
+def intern_string(value):
+    """ intern repeated strings, e.g. status, testcase name and testset key,
+        thus records share one copy of them.
+    """
+    try:
+        return intern(value)
+    except TypeError:
+        # unicode could not be interned in Python 2
+        return value
+
+
+class Headers(tuple):
+    """ headers stored as tuple of (key, value) pairs, which is much smaller than CaseInsensitiveDict.
+        items() and get() are kept for rendering report with templates written for dict headers.
+    """
+    __slots__ = ()
+
+    def items(self):
+        return self
+
+    def get(self, key, default=None):
+        key = key.lower()
+        for header_key, value in self:
+            if header_key.lower() == key:
+                return value
+
+        return default
+
+
+class BodyRef(object):
+    """ reference to body spooled to file, body is loaded only when rendering report.
+    """
+    __slots__ = ("path", "is_json")
+
+    def __init__(self, path, is_json=False):
+        self.path = path
+        self.is_json = is_json
+
+    def load(self):
+        with io.open(self.path, 'rb') as f:
+            content = f.read()
+
+        if self.is_json:
+            return json.loads(content.decode("utf-8"))
+
+        return content
+
+
+# spool folders not removed after rendering or exporting, e.g. run is interrupted
+spool_dir_paths = set()
+
+
+@atexit.register
+def remove_spool_dirs():
+    for dir_path in spool_dir_paths:
+        shutil.rmtree(dir_path, True)
+
+    spool_dir_paths.clear()
+
+
+class BodySpool(object):
+    """ spool bodies longer than body_limit to temporary folder,
+        which should be removed once report is rendered or exported, and is removed at exit otherwise.
+    """
+    def __init__(self, body_limit):
+        self.body_limit = body_limit
+        self.dir_path = None
+        self.count = 0
+
+    def spool(self, body):
+        """ spool body if it's longer than body_limit.
+        @return BodyRef if spooled, otherwise the original body
+        """
+        is_json = isinstance(body, (dict, list))
+        if is_json:
+            content = json.dumps(body, ensure_ascii=False)
+        elif isinstance(body, basestring):
+            content = body
+        else:
+            return body
+
+        if len(content) <= self.body_limit:
+            return body
+
+        if not isinstance(content, bytes):
+            content = content.encode("utf-8")
+
+        if self.dir_path is None:
+            self.dir_path = tempfile.mkdtemp(prefix="hrun-bodies-")
+            spool_dir_paths.add(self.dir_path)
+
+        self.count += 1
+        path = os.path.join(self.dir_path, str(self.count))
+        with io.open(path, 'wb') as f:
+            f.write(content)
+
+        return BodyRef(path, is_json)
+
+    def remove(self):
+        """ remove spooled bodies, BodyRef returned before could not be loaded afterwards.
+        """
+        if self.dir_path is None:
+            return
+
+        shutil.rmtree(self.dir_path, True)
+        spool_dir_paths.discard(self.dir_path)
+        self.dir_path = None
+
+
+def compact_meta_data(meta_data, body_spool=None):
+    """ compact meta data for keeping in test record:
+        headers are converted to tuples, and long bodies are spooled to files if body_spool specified.
+    """
+    meta_data = dict(meta_data or {})
+    for key in ["request_headers", "response_headers"]:
+        if key in meta_data:
+            meta_data[key] = Headers(
+                (intern_string(header_key), value)
+                for header_key, value in (meta_data[key] or {}).items()
+            )
+
+    if body_spool is not None:
+        for key in ["request_body", "response_body"]:
+            if key in meta_data:
+                meta_data[key] = body_spool.spool(meta_data[key])
+
+    return meta_data
+
+
+class TestRecord(object):
+    """ compact test record, item access is kept for compatibility with dict records.
+    """
+    __slots__ = ("name", "status", "attachment", "meta_data", "testset")
+
+    def __init__(self, name, status, attachment, meta_data, testset=""):
+        self.name = name
+        self.status = intern_string(status)
+        self.attachment = attachment
+        self.meta_data = meta_data
+        self.testset = intern_string(testset)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return list(self.__slots__)
 
 
 class HtmlTestResult(unittest.TextTestResult):
@@ -142,24 +470,46 @@ class HtmlTestResult(unittest.TextTestResult):
 
     Used by TextTestRunner.
     """
-    def __init__(self, stream, descriptions, verbosity):
+    def __init__(self, stream, descriptions, verbosity, writers=None, body_limit=None):
+        """
+        @param (list) writers: streaming report writers, e.g. JUnitXmlWriter,
+            each test record is written as soon as the test finishes.
+        @param (int) body_limit: if specified, bodies longer than body_limit are spooled
+            to temporary files instead of being held in memory until report is rendered.
+        """
         super(HtmlTestResult, self).__init__(stream, descriptions, verbosity)
         self.records = []
+        self.writers = writers or []
+        self.tests_start_at = {}
+        self.body_spool = BodySpool(body_limit) if body_limit is not None else None
 
     def _record_test(self, test, status, attachment=''):
-        self.records.append({
-            'name': test.shortDescription(),
-            'status': status,
-            'attachment': attachment,
-            "meta_data": test.meta_data
-        })
+        record = TestRecord(
+            intern_string(test.shortDescription()),
+            status,
+            attachment,
+            compact_meta_data(test.meta_data, self.body_spool),
+            getattr(test, "testset_key", "")
+        )
+        self.records.append(record)
+
+        duration = time.time() - self.tests_start_at.pop(id(test), time.time())
+        for writer in self.writers:
+            writer.write(record, duration)
 
     def startTestRun(self):
         self.start_at = time.time()
+        for writer in self.writers:
+            writer.start(datetime.fromtimestamp(self.start_at))
+
+    def stopTestRun(self):
+        for writer in self.writers:
+            writer.close(self)
 
     def startTest(self, test):
         """ add start test time """
         super(HtmlTestResult, self).startTest(test)
+        self.tests_start_at[id(test)] = time.time()
         logger.color_print(test.shortDescription(), "yellow")
 
     def addSuccess(self, test):
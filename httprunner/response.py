@@ -3,7 +3,7 @@
 import json
 import re
 
-from httprunner import exception, logger, testcase, utils
+from httprunner import exception, logger, profiler, testcase, utils
 from httprunner.compat import OrderedDict, basestring
 from requests.structures import CaseInsensitiveDict
 
@@ -137,6 +137,7 @@ class ResponseObject(object):
 
         return value
 
+    @profiler.timed("extract_response")
     def extract_response(self, extractors):
         """ extract value from requests.Response and store in OrderedDict.
         @param (list) extractors
@@ -0,0 +1,180 @@
+# encoding: utf-8
+""" retry policy and circuit breaker for HttpSession.
+"""
+
+import random
+import threading
+import time
+
+from httprunner import exception
+from httprunner.compat import integer_types
+from requests.compat import urlparse
+from requests import exceptions as requests_exceptions
+from requests.exceptions import RequestException
+
+idempotent_methods = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"]
+
+
+class CircuitOpenError(RequestException):
+    """ request is not sent because circuit of target host is open.
+    """
+    pass
+
+
+class RetryPolicy(object):
+    """ decide whether to retry a request, and how long to wait before next attempt.
+        backoff of the nth retry is random between 0 and min(backoff_max, backoff_factor * 2^(n-1))
+        with jitter, or exactly the upper bound without jitter.
+    """
+    def __init__(self, max_retries=3, backoff_factor=0.5, backoff_max=10, jitter=True,
+                 status_codes=None, exceptions=None, idempotent_only=True):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.status_codes = set(status_codes if status_codes is not None else [502, 503, 504])
+        self.exceptions = tuple(
+            get_request_exception(name)
+            for name in (exceptions if exceptions is not None else ["ConnectionError", "Timeout"])
+        )
+        self.idempotent_only = idempotent_only
+
+    @classmethod
+    def from_config(cls, retry_config):
+        """ create retry policy from testset config or testcase.
+        @param retry_config: max retries, or dict of RetryPolicy arguments
+            e.g. 3
+                 {"max_retries": 3, "backoff_factor": 0.5, "status_codes": [503]}
+        @return RetryPolicy, or None if retry is disabled
+        """
+        if not retry_config:
+            return None
+
+        if isinstance(retry_config, integer_types):
+            return cls(max_retries=retry_config)
+
+        if not isinstance(retry_config, dict):
+            raise exception.ParamsError("Invalid retry config: {}".format(retry_config))
+
+        try:
+            return cls(**retry_config)
+        except TypeError as ex:
+            raise exception.ParamsError("Invalid retry config: {}, {}".format(retry_config, ex))
+
+    def should_retry(self, method, response, retries):
+        """ check if request should be retried.
+        @param (str) method: request method
+        @param response: response of last attempt, error is attached if request failed
+        @param (int) retries: retried times so far
+        """
+        if retries >= self.max_retries:
+            return False
+
+        if self.idempotent_only and method.upper() not in idempotent_methods:
+            return False
+
+        error = getattr(response, "error", None)
+        if error is not None:
+            return isinstance(error, self.exceptions) and not isinstance(error, CircuitOpenError)
+
+        return response.status_code in self.status_codes
+
+    def get_backoff(self, retries):
+        """ get seconds to wait before the retry.
+        @param (int) retries: retried times including this one, starts from 1
+        """
+        backoff = min(self.backoff_max, self.backoff_factor * (2 ** (retries - 1)))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+
+        return backoff
+
+
+def get_request_exception(name):
+    """ get requests exception class by name, e.g. "ConnectionError", "ReadTimeout"
+    """
+    exception_class = getattr(requests_exceptions, name, None)
+    if not (isinstance(exception_class, type) and issubclass(exception_class, RequestException)):
+        raise exception.ParamsError("Invalid retryable exception: {}".format(name))
+
+    return exception_class
+
+
+class CircuitBreaker(object):
+    """ circuit breaker of a target host.
+        closed: requests are sent, circuit opens after failure_threshold consecutive failures.
+        open: requests fail fast without being sent, until reset_timeout seconds passed.
+        half open: one trial request is sent, circuit closes if it succeeds, otherwise opens again.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_sent = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        elif time.time() - self.opened_at < self.reset_timeout:
+            return "open"
+        else:
+            return "half_open"
+
+    def allow_request(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            elif state == "half_open" and not self.trial_sent:
+                self.trial_sent = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_sent = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+                self.trial_sent = False
+
+
+# circuit breakers of each host, shared by all sessions in current process
+circuit_breakers = {}
+circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url, circuit_breaker_config):
+    """ get circuit breaker of url host, create it if not exists.
+    @param (str) url: absolute request url
+    @param circuit_breaker_config: True, or dict of CircuitBreaker arguments
+        e.g. {"failure_threshold": 5, "reset_timeout": 30}
+    """
+    if not isinstance(circuit_breaker_config, dict):
+        circuit_breaker_config = {}
+
+    host = urlparse(url).netloc
+    with circuit_breakers_lock:
+        if host not in circuit_breakers:
+            try:
+                circuit_breakers[host] = CircuitBreaker(**circuit_breaker_config)
+            except TypeError as ex:
+                raise exception.ParamsError(
+                    "Invalid circuit_breaker config: {}, {}".format(circuit_breaker_config, ex))
+
+        return circuit_breakers[host]
+
+
+def is_failure(response):
+    """ connection errors and server errors are counted as failures of circuit breaker.
+    """
+    return getattr(response, "error", None) is not None or response.status_code >= 500
@@ -1,21 +1,39 @@
 # encoding: utf-8
 
+import copy
+import time
+from contextlib import contextmanager
 from unittest.case import SkipTest
 
-from httprunner import exception, logger, response, utils
+from httprunner import exception, hooks, logger, memoize, profiler, response, utils
+from httprunner.built_in import setup_hook_prepare_kwargs
 from httprunner.client import HttpSession
+from httprunner.compat import OrderedDict
 from httprunner.context import Context
+from httprunner.retry import RetryPolicy
 
 
 class Runner(object):
 
-    def __init__(self, config_dict=None, http_client_session=None):
+    def __init__(self, config_dict=None, http_client_session=None, default_rate_limit=None):
         self.http_client_session = http_client_session
         self.context = Context()
+        # compiled pipelines of hook actions
+        # hook_actions => hook_pipeline
+        self.hook_pipelines = memoize.IdentityCache()
+        # requests of static testcases prepared on first run
+        # testcase_request => (method, url, group, kwargs, static_request)
+        self.static_requests = memoize.IdentityCache()
 
         config_dict = config_dict or {}
         self.init_config(config_dict, "testset")
 
+        # retry policy and circuit breaker of http requests, only effective with HttpSession
+        self.retry_policy = RetryPolicy.from_config(config_dict.get("retry"))
+        self.circuit_breaker_config = config_dict.get("circuit_breaker")
+        # rate limit in testset config overrides the default one, e.g. specified by command line
+        self.rate_limit_config = config_dict.get("rate_limit") or default_rate_limit
+
         # testset setup hooks
         testset_setup_hooks = config_dict.pop("setup_hooks", [])
         if testset_setup_hooks:
@@ -28,10 +46,35 @@ class Runner(object):
         if self.testset_teardown_hooks:
             self.do_hook_actions(self.testset_teardown_hooks)
 
-    def init_config(self, config_dict, level):
+    def fork(self):
+        """ create a runner with forked context and http session,
+            which is used to run testcase concurrently with other testcases of current testset.
+        """
+        runner = copy.copy(self)
+        runner.context = self.context.fork()
+        runner.testset_teardown_hooks = []
+        if isinstance(self.http_client_session, HttpSession):
+            runner.http_client_session = self.http_client_session.fork()
+
+        return runner
+
+    def join(self, forked_runner, variable_names):
+        """ bind variables extracted in forked runner to current runner.
+        """
+        forked_variables_mapping = forked_runner.context.testset_shared_variables_mapping
+        extracted_variables_mapping = OrderedDict([
+            (name, forked_variables_mapping[name])
+            for name in variable_names
+            if name in forked_variables_mapping
+        ])
+        self.context.bind_extracted_variables(extracted_variables_mapping)
+
+    @profiler.timed("init_config")
+    def init_config(self, config_dict, level, parse_request=True):
         """ create/update context variables binds
         @param (dict) config_dict
         @param (str) level, "testset" or "testcase"
+        @param (bool) parse_request: False if request of testcase is already prepared
         testset:
             {
                 "name": "smoke testset",
@@ -40,6 +83,9 @@ class Runner(object):
                 "function_binds": {},   # optional
                 "import_module_items": [],  # optional
                 "variables": [],   # optional
+                "retry": {"max_retries": 3, "status_codes": [503]},  # optional
+                "circuit_breaker": {"failure_threshold": 5, "reset_timeout": 30},  # optional
+                "rate_limit": {"rate": 10, "max_in_flight": 4},  # optional
                 "request": {
                     "base_url": "http://127.0.0.1:5000",
                     "headers": {
@@ -67,11 +113,17 @@ class Runner(object):
             }
         @param (str) context level, testcase or testset
         """
-        # convert keys in request headers to lowercase
-        config_dict = utils.lower_config_dict_key(config_dict)
+        # convert keys in request headers to lowercase,
+        # keys in testcase request are converted when its request template is computed
+        if level == "testset":
+            config_dict = utils.lower_config_dict_key(config_dict)
+        else:
+            config_dict = utils.lower_dict_keys(config_dict)
 
         self.context.init_context(level)
         self.context.config_context(config_dict, level)
+        if not parse_request:
+            return None
 
         request_config = config_dict.get('request', {})
         parsed_request = self.context.get_parsed_request(request_config, level)
@@ -105,10 +157,138 @@ class Runner(object):
         if skip_reason:
             raise SkipTest(skip_reason)
 
-    def do_hook_actions(self, actions):
-        for action in actions:
-            logger.log_debug("call hook: {}".format(action))
-            self.context.eval_content(action)
+    @profiler.timed("do_hook_actions")
+    def do_hook_actions(self, actions, *hook_args):
+        """ run hook actions, actions are compiled into pipeline on first run.
+        @param (list) actions: hook actions, e.g. ["${setup_hook_add_kwargs($request)}", callable]
+        @param hook_args: arguments of python callable actions, e.g. request or response
+        """
+        if not actions:
+            return
+
+        hook_pipeline = self.hook_pipelines.get(actions)
+        if hook_pipeline is None:
+            hook_pipeline = hooks.HookPipeline(actions)
+            self.hook_pipelines.set(actions, hook_pipeline)
+
+        hook_pipeline.run(self.context, *hook_args)
+
+    def _get_session_kwargs(self, testcase_dict):
+        """ get retry policy, circuit breaker and rate limit arguments of request,
+            retry in testcase overrides the one in testset config,
+            rate limit in testset config overrides the one specified by command line.
+        """
+        if not isinstance(self.http_client_session, HttpSession):
+            # e.g. locust client
+            return {}
+
+        if "retry" in testcase_dict:
+            retry_policy = RetryPolicy.from_config(self.context.eval_content(testcase_dict["retry"]))
+        else:
+            retry_policy = self.retry_policy
+
+        session_kwargs = {}
+        if retry_policy:
+            session_kwargs["retry"] = retry_policy
+        if self.circuit_breaker_config:
+            session_kwargs["circuit_breaker"] = self.circuit_breaker_config
+
+        if self.rate_limit_config:
+            session_kwargs["rate_limit"] = self.rate_limit_config
+
+        return session_kwargs
+
+    def _is_static_testcase(self, testcase_dict):
+        """ check if request of testcase could be prepared once and sent repeatedly:
+            request references no variables or functions, and is not modified by hooks
+            other than the built-in setup_hook_prepare_kwargs.
+        """
+        if not isinstance(self.http_client_session, HttpSession):
+            # e.g. locust client
+            return False
+
+        if testcase_dict.get("setup_hooks"):
+            return False
+
+        if any(hook is not setup_hook_prepare_kwargs for hook in hooks.registered_hooks["setup"]):
+            return False
+
+        return self.context.is_static_request(testcase_dict.get("request"))
+
+    def _prepare_static_request(self, testcase_dict, method, url, group_name, parsed_request):
+        """ prepare request of static testcase, files are not supported as they are consumed
+            when sent, and auth other than basic auth tuple may keep state between requests.
+        """
+        auth = parsed_request.get("auth")
+        if "files" in parsed_request or (auth is not None and not isinstance(auth, tuple)):
+            return
+
+        static_request = self.http_client_session.prepare_static_request(
+            method, url, **parsed_request)
+        self.static_requests.set(
+            testcase_dict["request"],
+            (method, url, group_name, parsed_request, static_request)
+        )
+        return static_request
+
+    def _prepare_request(self, testcase_dict, phases):
+        """ evaluate request of testcase and run setup hooks, or reuse prepared static request.
+        @return (tuple) method, url, group_name, parsed_request, static_request
+        """
+        is_static = self._is_static_testcase(testcase_dict)
+        prepared = self.static_requests.get(testcase_dict["request"]) if is_static else None
+        static_request = None
+
+        # prepare
+        with self._record_phase(phases, "prepare"):
+            if prepared is not None:
+                # request of static testcase is evaluated and prepared on first run
+                self.init_config(testcase_dict, level="testcase", parse_request=False)
+                method, url, group_name, parsed_request, static_request = prepared
+                parsed_request = dict(parsed_request)
+                self.context.bind_testcase_variable("request", parsed_request)
+            else:
+                parsed_request = self.init_config(testcase_dict, level="testcase")
+                self.context.bind_testcase_variable("request", parsed_request)
+
+        # setup hooks
+        with self._record_phase(phases, "setup_hooks"):
+            if static_request is None:
+                for hook in hooks.registered_hooks["setup"]:
+                    hook(parsed_request)
+
+                self.do_hook_actions(testcase_dict.get("setup_hooks"), parsed_request)
+
+        if static_request is None:
+            try:
+                url = parsed_request.pop('url')
+                method = parsed_request.pop('method')
+                group_name = parsed_request.pop("group", None)
+            except KeyError:
+                raise exception.ParamsError("URL or METHOD missed!")
+
+            if is_static:
+                static_request = self._prepare_static_request(
+                    testcase_dict, method, url, group_name, dict(parsed_request))
+
+        return method, url, group_name, parsed_request, static_request
+
+    def _attach_phases(self, phases):
+        """ attach elapsed milliseconds of phases to meta data of http client session.
+        """
+        meta_data = getattr(self.http_client_session, "meta_data", None)
+        if isinstance(meta_data, dict):
+            meta_data["phases"] = phases
+
+    @contextmanager
+    def _record_phase(self, phases, phase):
+        """ record elapsed milliseconds of phase, even if it fails.
+        """
+        start_at = time.time()
+        try:
+            yield
+        finally:
+            phases[phase] = round((time.time() - start_at) * 1000, 2)
 
     def run_test(self, testcase_dict):
         """ run single testcase.
@@ -117,6 +297,7 @@ class Runner(object):
                 "name": "testcase description",
                 "skip": "skip this test unconditionally",
                 "times": 3,
+                "retry": {"max_retries": 3},    # optional, override
                 "requires": [],         # optional, override
                 "function_binds": {},   # optional, override
                 "variables": [],        # optional, override
@@ -136,53 +317,76 @@ class Runner(object):
                 "teardown_hooks": []        # optional
             }
         @return True or raise exception during test
+            elapsed milliseconds of each phase are recorded in meta_data of http client session
+            {
+                "phases": {
+                    "prepare": 1.2,
+                    "setup_hooks": 0.3,
+                    "request": 25.6,
+                    "teardown_hooks": 0.1,
+                    "extract": 0.2,
+                    "validate": 0.4
+                }
+            }
         """
         # check skip
         self._handle_skip_feature(testcase_dict)
 
-        # prepare
-        parsed_request = self.init_config(testcase_dict, level="testcase")
-        self.context.bind_testcase_variable("request", parsed_request)
-
-        # setup hooks
-        setup_hooks = testcase_dict.get("setup_hooks", [])
-        setup_hooks.insert(0, "${setup_hook_prepare_kwargs($request)}")
-        self.do_hook_actions(setup_hooks)
-
+        phases = OrderedDict()
         try:
-            url = parsed_request.pop('url')
-            method = parsed_request.pop('method')
-            group_name = parsed_request.pop("group", None)
-        except KeyError:
-            raise exception.ParamsError("URL or METHOD missed!")
+            method, url, group_name, parsed_request, static_request = \
+                self._prepare_request(testcase_dict, phases)
+        except BaseException:
+            # request is not sent, meta data of previous request is replaced
+            self.http_client_session.meta_data = {}
+            self._attach_phases(phases)
+            raise
 
         logger.log_info("{method} {url}".format(method=method, url=url))
         logger.log_debug("request kwargs(raw): {kwargs}".format(kwargs=parsed_request))
 
         # request
-        resp = self.http_client_session.request(
-            method,
-            url,
-            name=group_name,
-            **parsed_request
-        )
-        resp_obj = response.ResponseObject(resp)
+        with self._record_phase(phases, "request"):
+            if static_request is None:
+                request_kwargs = dict(parsed_request, **self._get_session_kwargs(testcase_dict))
+            else:
+                request_kwargs = dict(
+                    self._get_session_kwargs(testcase_dict), static_request=static_request)
+
+            try:
+                resp = self.http_client_session.request(
+                    method,
+                    url,
+                    name=group_name,
+                    **request_kwargs
+                )
+            finally:
+                # meta data is reset by each request, phases afterwards are updated in place
+                self._attach_phases(phases)
+
+            resp_obj = response.ResponseObject(resp)
 
         # teardown hooks
-        teardown_hooks = testcase_dict.get("teardown_hooks", [])
-        if teardown_hooks:
-            self.context.bind_testcase_variable("response", resp_obj)
-            self.do_hook_actions(teardown_hooks)
+        with self._record_phase(phases, "teardown_hooks"):
+            teardown_hooks = testcase_dict.get("teardown_hooks", [])
+            if teardown_hooks:
+                self.context.bind_testcase_variable("response", resp_obj)
+                self.do_hook_actions(teardown_hooks, resp_obj)
+
+            for hook in hooks.registered_hooks["teardown"]:
+                hook(resp_obj)
 
         # extract
-        extractors = testcase_dict.get("extract", []) or testcase_dict.get("extractors", [])
-        extracted_variables_mapping = resp_obj.extract_response(extractors)
-        self.context.bind_extracted_variables(extracted_variables_mapping)
+        with self._record_phase(phases, "extract"):
+            extractors = testcase_dict.get("extract", []) or testcase_dict.get("extractors", [])
+            extracted_variables_mapping = resp_obj.extract_response(extractors)
+            self.context.bind_extracted_variables(extracted_variables_mapping)
 
         # validate
         validators = testcase_dict.get("validate", []) or testcase_dict.get("validators", [])
         try:
-            self.context.validate(validators, resp_obj)
+            with self._record_phase(phases, "validate"):
+                self.context.validate(validators, resp_obj)
         except (exception.ParamsError, exception.ResponseError, \
             exception.ValidationError, exception.ParseResponseError):
             # log request
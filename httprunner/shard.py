@@ -0,0 +1,150 @@
+# encoding: utf-8
+
+import copy
+
+from httprunner import exception, logger, testcase
+from httprunner.history import get_testset_key
+
+
+def split_testset_by_parameters(testset):
+    """ split testset into several testsets, each one with a single config parameters combination.
+    @param (dict) testset
+        {
+            "name": "desc1",
+            "config": {
+                "parameters": [
+                    {"user_agent": ["iOS/10.1", "iOS/10.2"]},
+                    {"app_version": "${gen_app_version()}"}
+                ]
+            },
+            "testcases": [testcase11, testcase12]
+        }
+    @return (list) testsets, each config parameters is pinned to one combination
+        [
+            {
+                "name": "desc1",
+                "config": {
+                    "parameters": [{"app_version-user_agent": [["2.8.5", "iOS/10.1"]]}]
+                },
+                "testcases": [testcase11, testcase12]
+            },
+            ...
+        ]
+    """
+    config_dict = testset.get("config", {})
+    parameters = config_dict.get("parameters")
+    if not parameters:
+        return [testset]
+
+    cartesian_product_parameters = testcase.parse_parameters(
+        parameters,
+        config_dict.get("path")
+    )
+
+    testsets = []
+    for parameter_mapping in cartesian_product_parameters:
+        parameter_names = sorted(parameter_mapping.keys())
+        parameter_values = [parameter_mapping[name] for name in parameter_names]
+
+        split_config_dict = copy.copy(config_dict)
+        split_config_dict["parameters"] = [
+            {"-".join(parameter_names): [parameter_values]}
+        ]
+        split_testset = copy.copy(testset)
+        split_testset["config"] = split_config_dict
+        testsets.append(split_testset)
+
+    return testsets
+
+
+def partition(weights, shard_count):
+    """ partition items into shards, balanced by items' weights.
+        items are assigned in longest-weight-first order, each to the least loaded shard;
+        ties are broken by item index and shard index, so partition is deterministic.
+    @param (list) weights: weight of each item
+    @param (int) shard_count
+    @return (list) items indexes of each shard
+        e.g. weights [5, 3, 2, 2], shard_count 2 => [[0, 3], [1, 2]]
+    """
+    shards = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+
+    ordered_indexes = sorted(range(len(weights)), key=lambda index: (-weights[index], index))
+    for index in ordered_indexes:
+        shard_index = loads.index(min(loads))
+        shards[shard_index].append(index)
+        loads[shard_index] += weights[index]
+
+    return [sorted(indexes) for indexes in shards]
+
+
+class Shard(object):
+    """ select testsets of one shard, testsets are partitioned deterministically across shards.
+        each node of CI runs with the same testsets and shard count, but different shard index.
+    """
+    def __init__(self, shard_index, shard_count, by_parameters=False, history=None):
+        """
+        @param (int) shard_index: index of current shard, starts from 0
+        @param (int) shard_count: total count of shards
+        @param (bool) by_parameters: if True, config parameters combinations are partitioned
+            separately instead of the whole testset.
+        @param (TestHistory) history: if specified, durations recorded from previous runs
+            are used to balance shards by expected runtime.
+        """
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise exception.ParamsError(
+                "invalid shard: index {}, count {}".format(shard_index, shard_count))
+
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.by_parameters = by_parameters
+        self.history = history
+
+    def _get_units(self, testsets):
+        """ get partition units in sorted order, each unit is a (key, testset, duration) tuple.
+        """
+        units = []
+        for testset in testsets:
+            testset_key = get_testset_key(testset)
+
+            if self.by_parameters:
+                split_testsets = split_testset_by_parameters(testset)
+                duration = self.history and self.history.get_combination_duration(testset_key)
+            else:
+                split_testsets = [testset]
+                duration = self.history and self.history.get_testset_duration(testset_key)
+
+            for index, split_testset in enumerate(split_testsets):
+                unit_key = (testset_key, index)
+                units.append((unit_key, split_testset, duration))
+
+        return sorted(units, key=lambda unit: unit[0])
+
+    def select(self, testsets):
+        """ select testsets assigned to current shard.
+        """
+        units = self._get_units(testsets)
+        known_durations = [unit[2] for unit in units if unit[2] is not None]
+
+        if known_durations:
+            # testsets never run before are expected to take the average duration
+            default_duration = sum(known_durations) / len(known_durations)
+            weights = [
+                default_duration if unit[2] is None else unit[2]
+                for unit in units
+            ]
+            shards = partition(weights, self.shard_count)
+        else:
+            # round-robin on sorted units
+            shards = partition([1] * len(units), self.shard_count)
+
+        selected_testsets = [units[index][1] for index in shards[self.shard_index]]
+        logger.log_info(
+            "shard {}/{}: {} of {} units selected.".format(
+                self.shard_index + 1,
+                self.shard_count,
+                len(selected_testsets),
+                len(units)
+            )
+        )
+        return selected_testsets
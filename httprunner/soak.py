@@ -0,0 +1,346 @@
+# encoding: utf-8
+""" soak mode, testsets are run repeatedly for a wall-clock duration or iterations, e.g. overnight
+    endurance tests. results are aggregated into counters and latency histograms of each testcase
+    instead of a record for each run, thus memory does not grow with the duration.
+"""
+
+import collections
+import math
+import re
+import time
+import unittest
+
+from httprunner import exception, logger
+from httprunner.compat import OrderedDict, basestring, numeric_types
+from httprunner.report import HtmlTestResult
+
+# each item but the last one ends with unit, thus invalid input does not backtrack exponentially
+duration_regexp = re.compile(r"^(?:\d+(?:\.\d+)?[dhms])*(?:\d+(?:\.\d+)?)?$")
+duration_item_regexp = re.compile(r"(\d+(?:\.\d+)?)([dhms]?)")
+duration_units = {"d": 86400, "h": 3600, "m": 60, "s": 1, "": 1}
+
+
+def parse_duration(duration):
+    """ parse duration to seconds.
+    @param duration: seconds, or string with units, e.g. 90, "90s", "10m", "2h", "1h30m", "1d"
+    @return (float) seconds
+    """
+    if isinstance(duration, numeric_types) and not isinstance(duration, bool):
+        seconds = float(duration)
+    elif isinstance(duration, basestring) and duration_regexp.match(duration.strip()):
+        seconds = sum(
+            float(value) * duration_units[unit]
+            for value, unit in duration_item_regexp.findall(duration.strip())
+        )
+    else:
+        raise exception.ParamsError("Invalid duration: {}".format(duration))
+
+    if seconds <= 0:
+        raise exception.ParamsError("Invalid duration: {}".format(duration))
+
+    return seconds
+
+
+class Soak(object):
+    """ stop condition of soak run, stops when duration elapsed or iterations reached,
+        whichever comes first. the iteration in progress is finished before stopping.
+    """
+    def __init__(self, duration=None, iterations=None):
+        if duration is None and iterations is None:
+            raise exception.ParamsError("duration or iterations should be specified for soak run.")
+
+        self.duration = parse_duration(duration) if duration is not None else None
+        self.iterations = int(iterations) if iterations is not None else None
+
+    @classmethod
+    def from_config(cls, config_dict):
+        """ create soak from duration and iterations in testset config.
+        @return Soak, or None if neither is specified
+        """
+        duration = config_dict.get("duration")
+        iterations = config_dict.get("iterations")
+        if duration is None and iterations is None:
+            return None
+
+        return cls(duration, iterations)
+
+    def is_done(self, start_at, iterations):
+        if self.iterations is not None and iterations >= self.iterations:
+            return True
+
+        return self.duration is not None and time.time() - start_at >= self.duration
+
+
+def disable_cleanup(suite):
+    """ tests are removed from unittest suites after running since Python 3.4,
+        keep them to run the suite again.
+    """
+    if isinstance(suite, unittest.BaseTestSuite):
+        suite._cleanup = False
+        for test in suite:
+            disable_cleanup(test)
+
+
+class SoakSuite(unittest.TestSuite):
+    """ run suite repeatedly until soak is done, or the run is stopped or interrupted.
+    """
+    def __init__(self, suite, soak):
+        super(SoakSuite, self).__init__([suite])
+        disable_cleanup(self)
+        self.suite = suite
+        self.soak = soak
+        self.iterations = 0
+
+    def run(self, result, debug=False):
+        start_at = time.time()
+        try:
+            while not result.shouldStop and not self.soak.is_done(start_at, self.iterations):
+                self.suite(result)
+                self.iterations += 1
+                if isinstance(result, SoakResult):
+                    result.iterations += 1
+        except KeyboardInterrupt:
+            logger.log_warning("soak run interrupted after {} iterations.".format(self.iterations))
+
+        return result
+
+
+class LatencyHistogram(object):
+    """ latencies counted in log scale buckets, each bucket covers 5% range of values,
+        thus memory is bounded however many latencies are recorded,
+        and percentiles are accurate within bucket precision.
+    """
+    growth = 1.05
+    min_value = 0.01
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        value = max(float(value), self.min_value)
+        index = int(math.floor(math.log(value) / math.log(self.growth)))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+        self.count += other.count
+        self.total += other.total
+        for value in [other.min, other.max]:
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        """ get percentile latency, e.g. percent 99 for p99, None if no latency recorded.
+        """
+        if not self.count:
+            return None
+
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        cumulative = 0
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            if cumulative >= rank:
+                # middle of bucket in log scale
+                value = self.growth ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+
+    def get_stat(self):
+        """ @return (dict)
+            {"count": 100, "min": 1.2, "mean": 12.5, "p50": 10.1, "p90": 20.3, "p99": 35.6, "max": 40.2}
+        """
+        stat = {"count": self.count}
+        if not self.count:
+            return stat
+
+        stat["min"] = round(self.min, 2)
+        stat["mean"] = round(self.total / self.count, 2)
+        for percent in [50, 90, 99]:
+            stat["p{}".format(percent)] = round(self.percentile(percent), 2)
+        stat["max"] = round(self.max, 2)
+        return stat
+
+
+def new_counters():
+    return OrderedDict([
+        ("runs", 0),
+        ("successes", 0),
+        ("failures", 0),
+        ("errors", 0),
+        ("skipped", 0)
+    ])
+
+
+class SoakResult(HtmlTestResult):
+    """ test result of soak run, results are aggregated into counters and latency histograms of
+        each testcase, and of each interval to show trends over time. only the latest max_records
+        records of failed runs are kept for the report, successful runs are not recorded.
+    """
+    status_counters = {
+        "success": "successes",
+        "failure": "failures",
+        "error": "errors",
+        "skipped": "skipped",
+        "ExpectedFailure": "successes",
+        "UnexpectedSuccess": "failures"
+    }
+
+    def __init__(self, stream, descriptions, verbosity, writers=None, body_limit=None,
+                 max_records=100, interval=60):
+        # each run is not printed, progress of each interval is logged instead
+        super(SoakResult, self).__init__(stream, descriptions, 0, writers, body_limit)
+        self.records = collections.deque(maxlen=max_records)
+        self.failures = collections.deque(maxlen=max_records)
+        self.errors = collections.deque(maxlen=max_records)
+        self.skipped = collections.deque(maxlen=max_records)
+        self.expectedFailures = collections.deque(maxlen=max_records)
+        self.unexpectedSuccesses = collections.deque(maxlen=max_records)
+        # counts of all runs, lists above only keep the latest ones
+        self.counts = {
+            "failures": 0,
+            "errors": 0,
+            "skipped": 0,
+            "expectedFailures": 0,
+            "unexpectedSuccesses": 0
+        }
+        self.iterations = 0
+        self.interval = interval
+        # {(testset_key, testcase_name): {"runs": 10, ..., "latency": LatencyHistogram()}}
+        self.testcases = OrderedDict()
+        self.windows = []
+        self.window = None
+
+    def _new_window(self, start_at):
+        window = new_counters()
+        window["start_at"] = start_at
+        window["latency"] = LatencyHistogram()
+        return window
+
+    def _close_window(self, end_at):
+        window = self.window
+        if not window or not window["runs"]:
+            return
+
+        elapsed = max(end_at - window["start_at"], 0.001)
+        window_stat = OrderedDict([
+            ("offset", round(window["start_at"] - self.start_at, 1)),
+            ("duration", round(elapsed, 1)),
+            ("runs", window["runs"]),
+            ("rps", round(window["runs"] / elapsed, 2)),
+            ("failures", window["failures"]),
+            ("errors", window["errors"]),
+            ("latency", window["latency"].get_stat())
+        ])
+        self.windows.append(window_stat)
+        logger.log_info(
+            "soak {}s: {} runs, {} req/s, {} failures, {} errors, p50 {} ms, p99 {} ms".format(
+                int(end_at - self.start_at), window_stat["runs"], window_stat["rps"],
+                window_stat["failures"], window_stat["errors"],
+                window_stat["latency"].get("p50"), window_stat["latency"].get("p99")
+            )
+        )
+
+    def _record_test(self, test, status, attachment=''):
+        now = time.time()
+        if self.window is None:
+            self.window = self._new_window(self.start_at)
+        elif now - self.window["start_at"] >= self.interval:
+            self._close_window(now)
+            self.window = self._new_window(now)
+
+        key = (getattr(test, "testset_key", ""), test.shortDescription())
+        if key not in self.testcases:
+            self.testcases[key] = new_counters()
+            self.testcases[key]["latency"] = LatencyHistogram()
+
+        counter = self.status_counters.get(status, "failures")
+        response_time_ms = (getattr(test, "meta_data", None) or {}).get("response_time_ms")
+        for stat in [self.testcases[key], self.window]:
+            stat["runs"] += 1
+            stat[counter] += 1
+            if status != "skipped" and response_time_ms is not None:
+                stat["latency"].record(response_time_ms)
+
+        if status == "success":
+            self.tests_start_at.pop(id(test), None)
+        else:
+            super(SoakResult, self)._record_test(test, status, attachment)
+
+    def startTest(self, test):
+        unittest.TextTestResult.startTest(self, test)
+        self.tests_start_at[id(test)] = time.time()
+
+    def stopTestRun(self):
+        self._close_window(time.time())
+        self.window = None
+        super(SoakResult, self).stopTestRun()
+
+    def addSuccess(self, test):
+        unittest.TextTestResult.addSuccess(self, test)
+        self._record_test(test, 'success')
+
+    def addError(self, test, err):
+        unittest.TextTestResult.addError(self, test, err)
+        self.counts["errors"] += 1
+        self._record_test(test, 'error', self._exc_info_to_string(err, test))
+
+    def addFailure(self, test, err):
+        unittest.TextTestResult.addFailure(self, test, err)
+        self.counts["failures"] += 1
+        self._record_test(test, 'failure', self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        unittest.TextTestResult.addSkip(self, test, reason)
+        self.counts["skipped"] += 1
+        self._record_test(test, 'skipped', reason)
+
+    def addExpectedFailure(self, test, err):
+        unittest.TextTestResult.addExpectedFailure(self, test, err)
+        self.counts["expectedFailures"] += 1
+        self._record_test(test, 'ExpectedFailure', self._exc_info_to_string(err, test))
+
+    def addUnexpectedSuccess(self, test):
+        unittest.TextTestResult.addUnexpectedSuccess(self, test)
+        self.counts["unexpectedSuccesses"] += 1
+        self._record_test(test, 'UnexpectedSuccess')
+
+    def get_soak_stat(self):
+        """ get aggregated stat of soak run.
+        @return (dict)
+            {
+                "iterations": 100,
+                "testcases": [
+                    {
+                        "testset": "tests/data/demo.yml",
+                        "name": "get token",
+                        "runs": 100, "successes": 99, "failures": 1, "errors": 0, "skipped": 0,
+                        "latency": {"count": 100, "min": 1.2, "mean": 12.5, "p50": 10.1, ...}
+                    }
+                ],
+                "windows": [
+                    {"offset": 0, "duration": 60, "runs": 6000, "rps": 100, "failures": 1, ...}
+                ]
+            }
+        """
+        testcases = []
+        for (testset_key, name), stat in self.testcases.items():
+            testcase_stat = OrderedDict([("testset", testset_key), ("name", name)])
+            testcase_stat.update(stat)
+            testcase_stat["latency"] = stat["latency"].get_stat()
+            testcases.append(testcase_stat)
+
+        return {
+            "iterations": self.iterations,
+            "testcases": testcases,
+            "windows": list(self.windows)
+        }
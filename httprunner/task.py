@@ -1,12 +1,22 @@
 # encoding: utf-8
 
 import copy
+import functools
 import sys
+import threading
+import time
 import unittest
+from multiprocessing.pool import ThreadPool
+from unittest.case import SkipTest
 
-from httprunner import exception, logger, runner, testcase, utils
+from httprunner import (exception, logger, memoize, memwatch, profiler, runner, testcase,
+                        utils)
 from httprunner.compat import is_py3
+from httprunner.exporters import create_writers
+from httprunner.history import TestHistory, get_testset_key
 from httprunner.report import HtmlTestResult, get_summary, render_html_report
+from httprunner.shard import Shard
+from httprunner.soak import Soak, SoakResult, SoakSuite
 from httprunner.testcase import TestcaseLoader
 from httprunner.utils import load_dot_env_file
 
@@ -14,18 +24,91 @@ from httprunner.utils import load_dot_env_file
 class TestCase(unittest.TestCase):
     """ create a testcase.
     """
+    # key of testset which the testcase belongs to, set when added to TestSuite
+    testset_key = ""
+    # times of running the testcase each time it is run in suite, each run is recorded in result
+    times = 1
+
     def __init__(self, test_runner, testcase_dict):
         super(TestCase, self).__init__()
         self.test_runner = test_runner
         self.testcase_dict = copy.copy(testcase_dict)
+        self.stat = {
+            "runs": 0,
+            "failures": 0,
+            "duration": 0
+        }
 
     def runTest(self):
         """ run testcase and check result.
         """
+        start_at = time.time()
+        status = "failure"
         try:
-            self.test_runner.run_test(self.testcase_dict)
+            with memwatch.track_step(self.testset_key, self.shortDescription()):
+                self.test_runner.run_test(self.testcase_dict)
+            status = "success"
+        except SkipTest:
+            status = "skipped"
+            raise
         finally:
             self.meta_data = getattr(self.test_runner.http_client_session, "meta_data", {})
+            self._update_stat(status, time.time() - start_at)
+
+    def run(self, result=None):
+        """ run testcase for specified times, instead of adding it to suite repeatedly.
+        """
+        for _ in range(self.times):
+            result = super(TestCase, self).run(result) or result
+            if result is None:
+                continue
+
+            if memwatch.budget_exceeded():
+                result.stop()
+
+            if result.shouldStop:
+                break
+
+        return result
+
+    def run_with_runner(self, test_runner, result):
+        """ run testcase with specified runner instead of its own runner.
+        """
+        origin_test_runner = self.test_runner
+        self.test_runner = test_runner
+        try:
+            return self.run(result)
+        finally:
+            self.test_runner = origin_test_runner
+
+    def _update_stat(self, status, duration):
+        """ accumulate runs, failures and duration of current testcase, skipped runs are ignored.
+        """
+        if status == "skipped":
+            return
+
+        self.stat["runs"] += 1
+        self.stat["duration"] += duration
+        if status == "failure":
+            self.stat["failures"] += 1
+
+class ThreadSafeTestResult(object):
+    """ proxy of test result, serialize result updates from concurrently running testcases.
+    """
+    def __init__(self, result):
+        self._result = result
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._result, name)
+        if not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return wrapper
 
 class TestSuite(unittest.TestSuite):
     """ create test suite with a testset, it may include one or several testcases.
@@ -41,7 +124,8 @@ class TestSuite(unittest.TestSuite):
                     "parameters": {},
                     "variables": [],
                     "request": {},
-                    "output": []
+                    "output": [],
+                    "concurrency": 1    # optional, run independent testcases concurrently
                 },
                 "testcases": [
                     {
@@ -58,13 +142,18 @@ class TestSuite(unittest.TestSuite):
         (dict) variables_mapping:
             passed in variables mapping, it will override variables in config block
     """
-    def __init__(self, testset, variables_mapping=None, http_client_session=None):
+    def __init__(self, testset, variables_mapping=None, http_client_session=None, rate_limit=None):
         super(TestSuite, self).__init__()
         self.test_runner_list = []
+        self.testcase_list = []
+        self.testset_key = get_testset_key(testset)
+        self.duration = 0
 
         config_dict = testset.get("config", {})
         self.output_variables_list = config_dict.get("output", [])
         self.testset_file_path = config_dict.get("path")
+        self.concurrency = int(config_dict.get("concurrency", 1))
+        self.test_groups = []
         config_dict_parameters = config_dict.get("parameters", [])
 
         config_dict_variables = config_dict.get("variables", [])
@@ -75,13 +164,15 @@ class TestSuite(unittest.TestSuite):
             config_dict_variables,
             config_dict_parameters
         )
+        self.combinations = len(config_parametered_variables_list)
         self.testcase_parser = testcase.TestcaseParser()
         testcases = testset.get("testcases", [])
 
         for config_variables in config_parametered_variables_list:
             # config level
             config_dict["variables"] = config_variables
-            test_runner = runner.Runner(config_dict, http_client_session)
+            test_runner = runner.Runner(config_dict, http_client_session, rate_limit)
+            tests = []
 
             for testcase_dict in testcases:
                 testcase_dict = copy.copy(testcase_dict)
@@ -106,7 +197,59 @@ class TestSuite(unittest.TestSuite):
                         testcase_name = testcase_dict["name"]
                     self.test_runner_list.append((test_runner, variables))
 
-                    self._add_test_to_suite(testcase_name, test_runner, testcase_dict)
+                    tests.extend(self._add_test_to_suite(testcase_name, test_runner, testcase_dict))
+
+            self.test_groups.append(tests)
+
+    def run(self, result, *args, **kwargs):
+        """ run testset and record its duration
+        """
+        start_at = time.time()
+        try:
+            if self.concurrency > 1:
+                return self._run_concurrently(result)
+
+            return super(TestSuite, self).run(result, *args, **kwargs)
+        finally:
+            self.duration = time.time() - start_at
+
+    def _run_concurrently(self, result):
+        """ run testcases stage by stage, testcases in each stage do not depend on each other
+            and are run concurrently with forked runners.
+        """
+        thread_safe_result = ThreadSafeTestResult(result)
+        pool = ThreadPool(self.concurrency)
+
+        def run_forked(test):
+            forked_runner = test.test_runner.fork()
+            test.run_with_runner(forked_runner, thread_safe_result)
+            return forked_runner
+
+        try:
+            for tests in self.test_groups:
+                testcases = [test.testcase_dict for test in tests]
+                dependencies = testcase.get_testcases_dependencies(testcases)
+
+                for stage in testcase.group_by_dependencies(dependencies):
+                    if result.shouldStop:
+                        return result
+
+                    if len(stage) == 1:
+                        tests[stage[0]](result)
+                        continue
+
+                    stage_tests = [tests[index] for index in stage]
+                    forked_runners = pool.map(run_forked, stage_tests)
+                    for test, forked_runner in zip(stage_tests, forked_runners):
+                        test.test_runner.join(
+                            forked_runner,
+                            testcase.get_extracted_variables(test.testcase_dict)
+                        )
+        finally:
+            pool.close()
+            pool.join()
+
+        return result
 
     def _get_parametered_variables(self, variables, parameters):
         """ parameterize varaibles with parameters
@@ -135,7 +278,28 @@ class TestSuite(unittest.TestSuite):
             TestCase.runTest.__func__.__doc__ = testcase_name
 
         test = TestCase(test_runner, testcase_dict)
-        [self.addTest(test) for _ in range(int(testcase_dict.get("times", 1)))]
+        test.testset_key = self.testset_key
+        test.times = int(testcase_dict.get("times", 1))
+        self.testcase_list.append(test)
+        self.addTest(test)
+        return [test]
+
+    @property
+    def testcases_stat(self):
+        """ get stat of each testcase in testset, testcases with the same name are merged.
+        @return (dict)
+            {
+                "get token": {"runs": 3, "failures": 1, "duration": 0.36}
+            }
+        """
+        testcases_stat = {}
+        for test in self.testcase_list:
+            name = test.testcase_dict.get("name", "")
+            stat = testcases_stat.setdefault(name, {"runs": 0, "failures": 0, "duration": 0})
+            for key in stat:
+                stat[key] += test.stat[key]
+
+        return testcases_stat
 
     @property
     def output(self):
@@ -154,7 +318,8 @@ class TaskSuite(unittest.TestSuite):
     """ create task suite with specified testcase path.
         each task suite may include one or several test suite.
     """
-    def __init__(self, testsets, mapping=None, http_client_session=None):
+    def __init__(self, testsets, mapping=None, http_client_session=None, soak=None,
+                 rate_limit=None):
         """
         @params
             testsets (dict/list): testset or list of testset
@@ -172,29 +337,50 @@ class TaskSuite(unittest.TestSuite):
                 ]
             mapping (dict):
                 passed in variables mapping, it will override variables in config block
+            soak (Soak):
+                if specified, all testsets are run repeatedly until soak is done,
+                otherwise testsets with duration or iterations in config are run repeatedly.
+            rate_limit (dict):
+                default rate limit of requests, overridden by rate_limit in testset config.
         """
         super(TaskSuite, self).__init__()
         mapping = mapping or {}
 
-        if not testsets:
-            raise exception.TestcaseNotFound
-
         if isinstance(testsets, dict):
             testsets = [testsets]
 
         self.suite_list = []
+        self.soak_mode = soak is not None
         for testset in testsets:
-            suite = TestSuite(testset, mapping, http_client_session)
-            self.addTest(suite)
+            suite = TestSuite(testset, mapping, http_client_session, rate_limit)
             self.suite_list.append(suite)
 
+            if soak:
+                continue
+
+            testset_soak = Soak.from_config(testset.get("config", {}))
+            if testset_soak:
+                self.soak_mode = True
+                self.addTest(SoakSuite(suite, testset_soak))
+            else:
+                self.addTest(suite)
+
+        if soak:
+            self.addTest(SoakSuite(unittest.TestSuite(self.suite_list), soak))
+
     @property
     def tasks(self):
         return self.suite_list
 
 
-def init_task_suite(path_or_testsets, mapping=None, http_client_session=None):
+@profiler.timed("init_task_suite")
+def init_task_suite(path_or_testsets, mapping=None, http_client_session=None,
+                    shard=None, schedule=None, soak=None, rate_limit=None):
     """ initialize task suite
+    @param (Shard) shard: if specified, only testsets assigned to the shard will be included.
+    @param (function) schedule: if specified, testsets will be run in the order it returns.
+    @param (Soak) soak: if specified, testsets will be run repeatedly until soak is done.
+    @param (dict) rate_limit: default rate limit of requests, overridden by testset config.
     """
     if not testcase.is_testsets(path_or_testsets):
         TestcaseLoader.load_test_dependencies()
@@ -202,9 +388,21 @@ def init_task_suite(path_or_testsets, mapping=None, http_client_session=None):
     else:
         testsets = path_or_testsets
 
+    if not testsets:
+        raise exception.TestcaseNotFound
+
+    if isinstance(testsets, dict):
+        testsets = [testsets]
+
+    if shard:
+        testsets = shard.select(testsets)
+
+    if schedule:
+        testsets = schedule(testsets)
+
     # TODO: move comparator uniform here
     mapping = mapping or {}
-    return TaskSuite(testsets, mapping, http_client_session)
+    return TaskSuite(testsets, mapping, http_client_session, soak, rate_limit)
 
 
 class HttpRunner(object):
@@ -215,12 +413,67 @@ class HttpRunner(object):
             - resultclass: HtmlTestResult or TextTestResult
             - failfast: False/True, stop the test run on the first error or failure.
             - dot_env_path: .env file path
+            - history_path: test history file path, durations and failures of each run
+                will be recorded in it, and testsets will be scheduled by previous records:
+                historically failing testsets first in failfast mode, otherwise longest first.
+            - shard_index, shard_count: only run testsets assigned to the specified shard.
+            - shard_by_parameters: False/True, partition config parameters combinations
+                instead of the whole testsets.
+            - report_formats: streaming report formats, e.g. ["junit", "json"],
+                each testcase is written to report as soon as it finishes.
+            - report_name: name of streaming reports, same as html report name.
+            - body_limit: bodies longer than body_limit are spooled to temporary files
+                while running, instead of being held in memory until report is rendered.
+            - rate_limit: default rate limit of requests to each host, overridden by testset config.
+                e.g. {"rate": 20, "burst": 20, "max_in_flight": 4, "per_group": False}
+            - duration, iterations: soak mode, run testsets repeatedly for the duration,
+                e.g. "2h", or the iterations, whichever comes first. results are aggregated
+                into counters and latency histograms instead of records of each run.
         """
         dot_env_path = kwargs.pop("dot_env_path", None)
         load_dot_env_file(dot_env_path)
 
-        kwargs.setdefault("resultclass", HtmlTestResult)
+        history_path = kwargs.pop("history_path", None)
+        self.history = TestHistory(history_path) if history_path else None
+        self.failfast = kwargs.get("failfast", False)
+
+        shard_index = kwargs.pop("shard_index", None)
+        shard_count = kwargs.pop("shard_count", None)
+        shard_by_parameters = kwargs.pop("shard_by_parameters", False)
+        if shard_count is not None:
+            self.shard = Shard(shard_index or 0, shard_count, shard_by_parameters, self.history)
+        else:
+            self.shard = None
+
+        report_formats = kwargs.pop("report_formats", None) or []
+        report_name = kwargs.pop("report_name", None)
+        body_limit = kwargs.pop("body_limit", None)
+        self.rate_limit = kwargs.pop("rate_limit", None)
+        duration = kwargs.pop("duration", None)
+        iterations = kwargs.pop("iterations", None)
+        if duration is not None or iterations is not None:
+            self.soak = Soak(duration, iterations)
+        else:
+            self.soak = None
+
+        resultclass = kwargs.get("resultclass", HtmlTestResult)
+        result_kwargs = {}
+        writers = create_writers(report_formats, report_name)
+        if writers:
+            result_kwargs["writers"] = writers
+        if body_limit is not None:
+            result_kwargs["body_limit"] = body_limit
+
+        if result_kwargs:
+            kwargs["resultclass"] = functools.partial(resultclass, **result_kwargs)
+            self.soak_resultclass = functools.partial(SoakResult, **result_kwargs)
+        else:
+            kwargs["resultclass"] = resultclass
+            self.soak_resultclass = SoakResult
+
+        self.resultclass = kwargs["resultclass"]
         self.runner = unittest.TextTestRunner(**kwargs)
+        self.body_spool = None
 
     def run(self, path_or_testsets, mapping=None):
         """ start to run test with varaibles mapping
@@ -239,14 +492,53 @@ class HttpRunner(object):
         @param (dict) mapping:
             if mapping specified, it will override variables in config block
         """
+        # bodies spooled in previous run are not needed since its summary is replaced
+        self.remove_spooled_bodies()
+        memoize.function_cache.reset_stats()
         try:
-            task_suite = init_task_suite(path_or_testsets, mapping)
+            task_suite = init_task_suite(
+                path_or_testsets,
+                mapping,
+                shard=self.shard,
+                schedule=self._schedule_testsets if self.history else None,
+                soak=self.soak,
+                rate_limit=self.rate_limit
+            )
         except exception.TestcaseNotFound:
             logger.log_error("Testcases not found in {}".format(path_or_testsets))
             sys.exit(1)
 
+        # results of soak run are aggregated instead of being recorded for each run
+        if task_suite.soak_mode:
+            self.runner.resultclass = self.soak_resultclass
+        else:
+            self.runner.resultclass = self.resultclass
+
         result = self.runner.run(task_suite)
+        self.body_spool = getattr(result, "body_spool", None)
         self.summary = get_summary(result)
+        self.summary["function_cache"] = memoize.function_cache.get_stats()
+        if isinstance(result, SoakResult):
+            self.summary["soak"] = result.get_soak_stat()
+
+        monitor = memwatch.get_monitor()
+        if monitor:
+            self.summary["memory"] = monitor.get_report()
+
+        if self.history:
+            for task in task_suite.tasks:
+                testcases_stat = task.testcases_stat
+                # testsets not run, e.g. stopped by failfast, keep their previous records
+                if not any(stat["runs"] for stat in testcases_stat.values()):
+                    continue
+
+                self.history.record_testset(
+                    task.testset_key,
+                    task.duration,
+                    task.combinations,
+                    testcases_stat
+                )
+            self.history.dump()
 
         output = []
         for task in task_suite.tasks:
@@ -255,18 +547,42 @@ class HttpRunner(object):
         self.summary["output"] = output
         return self
 
-    def gen_html_report(self, html_report_name=None, html_report_template=None):
+    def _schedule_testsets(self, testsets):
+        if self.failfast:
+            return self.history.sort_testsets_by_failure_rate(testsets)
+        else:
+            return self.history.sort_testsets_by_duration(testsets)
+
+    def gen_html_report(self, html_report_name=None, html_report_template=None,
+                        body_limit=None, compress_bodies=False):
         """ generate html report and return report path
         @param (str) html_report_name:
             output html report file name
         @param (str) html_report_template:
             report template file path, template should be in Jinja2 format
+        @param (int) body_limit:
+            truncate bodies longer than body_limit in report, and save full bodies beside report
+        @param (bool) compress_bodies:
+            gzip compress full bodies saved beside report
         """
-        return render_html_report(
+        report_path = render_html_report(
             self.summary,
             html_report_name,
-            html_report_template
+            html_report_template,
+            body_limit,
+            compress_bodies
         )
+        # spooled bodies are loaded into summary when rendering
+        self.remove_spooled_bodies()
+        return report_path
+
+    def remove_spooled_bodies(self):
+        """ remove bodies spooled to temporary files in current run,
+            call it once bodies are rendered or exported, otherwise they are removed at exit.
+        """
+        if self.body_spool is not None:
+            self.body_spool.remove()
+            self.body_spool = None
 
 
 class LocustTask(object):
@@ -275,15 +591,21 @@ class LocustTask(object):
         self.task_suite = init_task_suite(path_or_testsets, mapping, locust_client)
 
     def run(self):
-        for suite in self.task_suite:
-            for test in suite:
-                try:
-                    test.runTest()
-                except exception.MyBaseError as ex:
-                    from locust.events import request_failure
-                    request_failure.fire(
-                        request_type=test.testcase_dict.get("request", {}).get("method"),
-                        name=test.testcase_dict.get("request", {}).get("url"),
-                        response_time=0,
-                        exception=ex
-                    )
+        # testsets are iterated directly, as they may be wrapped in SoakSuite,
+        # and testcases are repeated for times as TestCase.run does
+        for suite in self.task_suite.tasks:
+            for test in suite.testcase_list:
+                for _ in range(test.times):
+                    self._run_test(test)
+
+    def _run_test(self, test):
+        try:
+            test.runTest()
+        except exception.MyBaseError as ex:
+            from locust.events import request_failure
+            request_failure.fire(
+                request_type=test.testcase_dict.get("request", {}).get("method"),
+                name=test.testcase_dict.get("request", {}).get("url"),
+                response_time=0,
+                exception=ex
+            )
@@ -9,8 +9,8 @@ import os
 import random
 import re
 
-from httprunner import exception, logger, utils
-from httprunner.compat import OrderedDict, basestring, numeric_types
+from httprunner import exception, logger, memoize, utils
+from httprunner.compat import OrderedDict, basestring, builtins, numeric_types
 from httprunner.utils import FileUtils
 
 variable_regexp = r"\$([\w_]+)"
@@ -108,30 +108,127 @@ class TestcaseLoader(object):
         "suite": {}
     }
     testcases_cache_mapping = {}
+    # definitions loaded from each api/suite file
+    # {file_path: {"mtime": 1528350000.0, "defs": [("api", "get_token")]}}
+    def_files_mapping = {}
+    # api/suite references of each testset/suite file
+    # {file_path: set([("api", "get_token"), ("suite", "create_and_check")])}
+    references_mapping = {}
+    # expanded api/suite blocks of each reference call, cleared when definitions are reloaded
+    # {("api", "get_token($user_agent)"): {"block": {...}, "validators_mapping": {...}}}
+    expanded_blocks_cache = {}
 
     @staticmethod
     def load_test_dependencies():
         """ load all api and suite definitions.
             default api folder is "$CWD/tests/api/".
             default suite folder is "$CWD/tests/suite/".
+            definition files loaded before are skipped unless they have been modified, or the
+            suites they reference have been reloaded; cached testsets referencing reloaded
+            definitions are invalidated.
+        @return (set) reloaded definitions
+            set([("api", "get_token"), ("suite", "create_and_check")])
         """
-        # TODO: cache api and suite loading
+        reloaded_defs = set()
+
         # load api definitions
         api_def_folder = os.path.join(os.getcwd(), "tests", "api")
         for test_file in FileUtils.load_folder_files(api_def_folder):
-            TestcaseLoader.load_api_file(test_file)
+            if TestcaseLoader._is_def_file_loaded(test_file):
+                continue
+
+            reloaded_defs.update(TestcaseLoader._unload_def_file(test_file))
+            reloaded_defs.update(TestcaseLoader.load_api_file(test_file))
 
         # load suite definitions
         suite_def_folder = os.path.join(os.getcwd(), "tests", "suite")
         for suite_file in FileUtils.load_folder_files(suite_def_folder):
-            suite = TestcaseLoader.load_test_file(suite_file)
-            if "def" not in suite["config"]:
-                raise exception.ParamsError("def missed in suite file: {}!".format(suite_file))
+            if TestcaseLoader._is_def_file_loaded(suite_file) \
+                and not TestcaseLoader.references_mapping.get(suite_file, set()) & reloaded_defs:
+                continue
+
+            reloaded_defs.update(TestcaseLoader._unload_def_file(suite_file))
+            reloaded_defs.update(TestcaseLoader.load_suite_file(suite_file))
+
+        if reloaded_defs:
+            TestcaseLoader.expanded_blocks_cache.clear()
+            for file_path in TestcaseLoader.get_files_referencing(reloaded_defs):
+                TestcaseLoader.invalidate_cache(file_path)
+
+        return reloaded_defs
+
+    @staticmethod
+    def _is_def_file_loaded(file_path):
+        """ check if definitions in file are loaded and up to date.
+        """
+        def_file = TestcaseLoader.def_files_mapping.get(file_path)
+        if not def_file or def_file["mtime"] != os.path.getmtime(file_path):
+            return False
+
+        for ref_type, name in def_file["defs"]:
+            if name not in TestcaseLoader.overall_def_dict[ref_type]:
+                return False
+
+        return True
+
+    @staticmethod
+    def _unload_def_file(file_path):
+        """ remove definitions loaded from file, return removed definitions.
+        """
+        def_file = TestcaseLoader.def_files_mapping.pop(file_path, None)
+        if not def_file:
+            return set()
+
+        for ref_type, name in def_file["defs"]:
+            TestcaseLoader.overall_def_dict[ref_type].pop(name, None)
+
+        return set(def_file["defs"])
+
+    @staticmethod
+    def _record_def_file(file_path, defs):
+        TestcaseLoader.def_files_mapping[file_path] = {
+            "mtime": os.path.getmtime(file_path),
+            "defs": defs
+        }
+        return set(defs)
+
+    @staticmethod
+    def get_files_referencing(defs):
+        """ get testset and suite files which reference any of the definitions.
+        """
+        return [
+            file_path
+            for file_path, references in TestcaseLoader.references_mapping.items()
+            if references & set(defs)
+        ]
+
+    @staticmethod
+    def invalidate_cache(path):
+        """ remove cached testsets of file path, as well as cached folders containing it.
+            functions resolved from debugtalk.py are cleared as well.
+        """
+        path = os.path.abspath(path)
+        for cached_path in list(TestcaseLoader.testcases_cache_mapping.keys()):
+            if cached_path == path or path.startswith(os.path.join(cached_path, "")):
+                del TestcaseLoader.testcases_cache_mapping[cached_path]
+
+        clear_resolved_functions()
+
+    @staticmethod
+    def load_suite_file(file_path):
+        """ load suite definition from file and store in overall_def_dict["suite"]
+        @return (set) loaded definitions
+        """
+        suite = TestcaseLoader.load_test_file(file_path)
+        if "def" not in suite["config"]:
+            raise exception.ParamsError("def missed in suite file: {}!".format(file_path))
 
-            call_func = suite["config"]["def"]
-            function_meta = parse_function(call_func)
-            suite["function_meta"] = function_meta
-            TestcaseLoader.overall_def_dict["suite"][function_meta["func_name"]] = suite
+        call_func = suite["config"]["def"]
+        function_meta = parse_function(call_func)
+        suite["function_meta"] = function_meta
+        func_name = function_meta["func_name"]
+        TestcaseLoader.overall_def_dict["suite"][func_name] = suite
+        return TestcaseLoader._record_def_file(file_path, [("suite", func_name)])
 
     @staticmethod
     def load_api_file(file_path):
@@ -153,11 +250,13 @@ class TestcaseLoader(object):
                         }
                     }
                 ]
+        @return (set) loaded definitions
         """
         api_items = FileUtils.load_file(file_path)
         if not isinstance(api_items, list):
             raise exception.FileFormatError("API format error: {}".format(file_path))
 
+        defs = []
         for api_item in api_items:
             if not isinstance(api_item, dict) or len(api_item) != 1:
                 raise exception.FileFormatError("API format error: {}".format(file_path))
@@ -175,6 +274,9 @@ class TestcaseLoader(object):
 
             api_dict["function_meta"] = function_meta
             TestcaseLoader.overall_def_dict["api"][func_name] = api_dict
+            defs.append(("api", func_name))
+
+        return TestcaseLoader._record_def_file(file_path, defs)
 
     @staticmethod
     def load_test_file(file_path):
@@ -218,6 +320,7 @@ class TestcaseLoader(object):
             },
             "testcases": []     # TODO: rename to tests
         }
+        references = set()
         for item in FileUtils.load_file(file_path):
             if not isinstance(item, dict) or len(item) != 1:
                 raise exception.FileFormatError("Testcase format error: {}".format(file_path))
@@ -233,11 +336,22 @@ class TestcaseLoader(object):
             elif key == "test":
                 if "api" in test_block:
                     ref_call = test_block["api"]
-                    def_block = TestcaseLoader._get_block_by_name(ref_call, "api")
-                    TestcaseLoader._override_block(def_block, test_block)
+                    references.add(("api", parse_function(ref_call)["func_name"]))
+                    expanded_block = TestcaseLoader._expand_block(ref_call, "api")
+                    if expanded_block["validators_mapping"] is None:
+                        def_validators = expanded_block["block"].get("validate") \
+                            or expanded_block["block"].get("validators", [])
+                        expanded_block["validators_mapping"] = _get_validators_mapping(def_validators)
+
+                    TestcaseLoader._override_block(
+                        expanded_block["block"],
+                        test_block,
+                        expanded_block["validators_mapping"]
+                    )
                     testset["testcases"].append(test_block)
                 elif "suite" in test_block:
                     ref_call = test_block["suite"]
+                    references.add(("suite", parse_function(ref_call)["func_name"]))
                     block = TestcaseLoader._get_block_by_name(ref_call, "suite")
                     testset["testcases"].extend(block["testcases"])
                 else:
@@ -248,6 +362,7 @@ class TestcaseLoader(object):
                     "unexpected block key: {}. block key should only be 'config' or 'test'.".format(key)
                 )
 
+        TestcaseLoader.references_mapping[os.path.abspath(file_path)] = references
         return testset
 
     @staticmethod
@@ -257,6 +372,33 @@ class TestcaseLoader(object):
             ref_call: e.g. api_v1_Account_Login_POST($UserName, $Password)
             ref_type: "api" or "suite"
         """
+        return TestcaseLoader._expand_block(ref_call, ref_type)["block"]
+
+    @staticmethod
+    def _expand_block(ref_call, ref_type):
+        """ get expanded block of reference call, blocks are cached by reference call,
+            thus each api/suite is expanded only once for identical reference calls.
+        @return (dict)
+            {
+                "block": {...},             # api or suite block with call args substituted
+                "validators_mapping": None  # validators mapping of api block, set when needed
+            }
+        """
+        cache_key = (ref_type, ref_call)
+        expanded_block = TestcaseLoader.expanded_blocks_cache.get(cache_key)
+        if expanded_block is None:
+            expanded_block = {
+                "block": TestcaseLoader._substitute_block_args(ref_call, ref_type),
+                "validators_mapping": None
+            }
+            TestcaseLoader.expanded_blocks_cache[cache_key] = expanded_block
+
+        return expanded_block
+
+    @staticmethod
+    def _substitute_block_args(ref_call, ref_type):
+        """ get api or suite definition, and substitute defined args with call args.
+        """
         function_meta = parse_function(ref_call)
         func_name = function_meta["func_name"]
         call_args = function_meta["args"]
@@ -300,7 +442,7 @@ class TestcaseLoader(object):
         return block
 
     @staticmethod
-    def _override_block(def_block, current_block):
+    def _override_block(def_block, current_block, def_validators_mapping=None):
         """ override def_block with current_block
         @param def_block:
             {
@@ -314,6 +456,7 @@ class TestcaseLoader(object):
                 "extract": [{"token": "content.token"}],
                 "validate": [{'eq': ['status_code', 201]}, {'len_eq': ['content.token', 16]}]
             }
+        @param def_validators_mapping: validators mapping of def_block if computed before
         @return
             {
                 "name": "get token",
@@ -335,7 +478,8 @@ class TestcaseLoader(object):
         current_block.update(def_block)
         current_block["validate"] = _merge_validator(
             def_validators,
-            current_validators
+            current_validators,
+            def_validators_mapping
         )
         current_block["extract"] = _merge_extractor(
             def_extrators,
@@ -472,11 +616,12 @@ def _get_validators_mapping(validators):
 
     return validators_mapping
 
-def _merge_validator(def_validators, current_validators):
+def _merge_validator(def_validators, current_validators, def_validators_mapping=None):
     """ merge def_validators with current_validators
     @params:
         def_validators: [{'eq': ['v1', 200]}, {"check": "s2", "expect": 16, "comparator": "len_eq"}]
         current_validators: [{"check": "v1", "expect": 201}, {'len_eq': ['s3', 12]}]
+        def_validators_mapping: mapping of def_validators if computed before, it's not modified
     @return:
         [
             {"check": "v1", "expect": 201, "comparator": "eq"},
@@ -491,7 +636,10 @@ def _merge_validator(def_validators, current_validators):
         return def_validators
 
     else:
-        api_validators_mapping = _get_validators_mapping(def_validators)
+        if def_validators_mapping is None:
+            api_validators_mapping = _get_validators_mapping(def_validators)
+        else:
+            api_validators_mapping = dict(def_validators_mapping)
         test_validators_mapping = _get_validators_mapping(current_validators)
 
         api_validators_mapping.update(test_validators_mapping)
@@ -599,6 +747,19 @@ def substitute_variables_with_mapping(content, mapping):
             }
         }
     """
+    if not mapping:
+        return content
+
+    # replace longer variables first, e.g. $uid_new before $uid
+    variables_regexp = re.compile("|".join(
+        re.escape(var) for var in sorted(mapping, key=len, reverse=True)
+    ))
+    return _substitute_variables(content, mapping, variables_regexp)
+
+def _substitute_variables(content, mapping, variables_regexp):
+    """ substitute variables in content in a single pass with compiled regexp of mapping keys,
+        thus substituted values are not substituted again.
+    """
     # TODO: refactor type check
     if isinstance(content, bool):
         return content
@@ -611,28 +772,119 @@ def substitute_variables_with_mapping(content, mapping):
 
     if isinstance(content, (list, set, tuple)):
         return [
-            substitute_variables_with_mapping(item, mapping)
+            _substitute_variables(item, mapping, variables_regexp)
             for item in content
         ]
 
     if isinstance(content, dict):
         substituted_data = {}
         for key, value in content.items():
-            eval_key = substitute_variables_with_mapping(key, mapping)
-            eval_value = substitute_variables_with_mapping(value, mapping)
+            eval_key = _substitute_variables(key, mapping, variables_regexp)
+            eval_value = _substitute_variables(value, mapping, variables_regexp)
             substituted_data[eval_key] = eval_value
 
         return substituted_data
 
     # content is in string format here
-    for var, value in mapping.items():
-        if content == var:
-            # content is a variable
-            content = value
-        else:
-            content = content.replace(var, str(value))
+    if content in mapping:
+        # content is a variable
+        return mapping[content]
+
+    return variables_regexp.sub(lambda match: str(mapping[match.group(0)]), content)
+
+def get_referenced_variables(content):
+    """ get all variable names referenced in content recursively
+    @param content in any data structure
+        {
+            "url": "/api/users/$uid",
+            "headers": {"token": "$token"},
+            "json": ["${gen_md5($device_sn)}"]
+        }
+    @return (set) variable names
+        {"uid", "token", "device_sn"}
+    """
+    if isinstance(content, (list, tuple, set)):
+        variables = set()
+        for item in content:
+            variables.update(get_referenced_variables(item))
+        return variables
+
+    if isinstance(content, dict):
+        variables = set()
+        for key, value in content.items():
+            variables.update(get_referenced_variables(key))
+            variables.update(get_referenced_variables(value))
+        return variables
 
-    return content
+    return set(extract_variables(content))
+
+def get_extracted_variables(testcase_dict):
+    """ get names of variables extracted by testcase
+    """
+    extractors = testcase_dict.get("extract", []) or testcase_dict.get("extractors", [])
+    return set(utils.convert_to_order_dict(extractors or []).keys())
+
+def get_testcases_dependencies(testcases):
+    """ get data dependencies between testcases, testcase depends on an earlier testcase if:
+        - it references variables extracted by the earlier testcase
+        - it extracts variables referenced or extracted by the earlier testcase
+        - either one is marked with "barrier: true", which orders it after all earlier testcases
+          and before all later ones, e.g. login that sets cookies without extracting variables.
+        - it is the same testcase repeated with "times".
+    @param (list) testcases: testcase dicts in execution order
+    @return (list) indexes of earlier testcases that each testcase depends on
+        e.g.
+        [
+            {"name": "login", "extract": [{"token": "content.token"}]},
+            {"name": "get user", "request": {"headers": {"token": "$token"}}},
+            {"name": "get config", "request": {"url": "/api/config"}}
+        ]
+        => [[], [0], []]
+    """
+    reads_list = []
+    writes_list = []
+    for testcase_dict in testcases:
+        content = {
+            key: value
+            for key, value in testcase_dict.items()
+            if key not in ["name", "extract", "extractors"]
+        }
+        reads_list.append(get_referenced_variables(content))
+        writes_list.append(get_extracted_variables(testcase_dict))
+
+    dependencies = []
+    for index, testcase_dict in enumerate(testcases):
+        reads, writes = reads_list[index], writes_list[index]
+        depends = []
+        for prev_index in range(index):
+            prev_testcase_dict = testcases[prev_index]
+            if testcase_dict.get("barrier") or prev_testcase_dict.get("barrier") \
+                or testcase_dict is prev_testcase_dict \
+                or reads & writes_list[prev_index] \
+                or writes & (reads_list[prev_index] | writes_list[prev_index]):
+                depends.append(prev_index)
+
+        dependencies.append(depends)
+
+    return dependencies
+
+def group_by_dependencies(dependencies):
+    """ group testcases into stages, testcases in the same stage are independent of each other,
+        and each stage only depends on earlier stages.
+    @param (list) dependencies: result of get_testcases_dependencies
+        e.g. [[], [0], [], [1, 2]]
+    @return (list) testcase indexes of each stage
+        e.g. [[0, 2], [1], [3]]
+    """
+    levels = []
+    for depends in dependencies:
+        levels.append(max([levels[index] + 1 for index in depends] or [0]))
+
+    stages = [[] for _ in range(max(levels or [-1]) + 1)]
+    for index, level in enumerate(levels):
+        stages[level].append(index)
+
+    return stages
 
 def gen_cartesian_product(*args):
     """ generate cartesian product for lists
@@ -726,12 +978,53 @@ def parse_parameters(parameters, testset_path=None):
 
     return gen_cartesian_product(*parsed_parameters_list)
 
+# functions resolved for testsets, besides functions bound to parser, keyed by testset path.
+# {testset_path: {func_name: function, or None if not found}}
+resolved_functions_mapping = {}
+
+
+def resolve_function(testset_path, func_name):
+    """ resolve function which is not bound, in python builtin functions,
+        then in debugtalk.py of testset folder and its ancestor folders.
+        resolved functions are cached, including not found ones, until clear_resolved_functions().
+    @return function, or None if not found
+    """
+    functions_mapping = resolved_functions_mapping.get(testset_path)
+    if functions_mapping is None:
+        functions_mapping = resolved_functions_mapping.setdefault(testset_path, {})
+
+    try:
+        return functions_mapping[func_name]
+    except KeyError:
+        pass
+
+    func = getattr(builtins, func_name, None)
+    if not callable(func):
+        func = None
+        if testset_path is not None:
+            try:
+                func = utils.search_conf_item(testset_path, "function", func_name)
+            except exception.FunctionNotFound:
+                pass
+
+    functions_mapping[func_name] = func
+    return func
+
+
+def clear_resolved_functions():
+    """ clear resolved functions, e.g. when debugtalk.py files are modified.
+    """
+    resolved_functions_mapping.clear()
+
+
 class TestcaseParser(object):
 
-    def __init__(self, variables={}, functions={}, file_path=None):
+    def __init__(self, variables={}, functions={}, file_path=None, pure_functions=None):
         self.update_binded_variables(variables)
         self.bind_functions(functions)
         self.file_path = file_path
+        # names of functions whose results are cached by arguments, besides functions decorated with @pure
+        self.pure_functions = set(pure_functions or [])
 
     def update_binded_variables(self, variables):
         """ bind variables to current testcase parser
@@ -759,15 +1052,12 @@ class TestcaseParser(object):
             if item_name in self.functions:
                 return self.functions[item_name]
 
-            try:
-                # check if builtin functions
-                item_func = eval(item_name)
-                if callable(item_func):
-                    # is builtin function
-                    return item_func
-            except (NameError, TypeError):
-                # is not builtin function, continue to search
-                pass
+            func = resolve_function(self.file_path, item_name)
+            if func is None:
+                raise exception.ParamsError(
+                    "{} is not defined in bind functions!".format(item_name))
+
+            return func
         elif item_type == "variable":
             if item_name in self.variables:
                 return self.variables[item_name]
@@ -814,7 +1104,10 @@ class TestcaseParser(object):
                 eval_value = self.parameterize(*args, **kwargs)
             else:
                 func = self.get_bind_function(func_name)
-                eval_value = func(*args, **kwargs)
+                if func_name in self.pure_functions or memoize.is_pure(func):
+                    eval_value = memoize.function_cache.call(func, args, kwargs)
+                else:
+                    eval_value = func(*args, **kwargs)
 
             func_content = "${" + func_content + "}"
             if func_content == content:
@@ -0,0 +1,90 @@
+# encoding: utf-8
+""" unix domain socket transport, requests to http+unix:// URLs are sent through the socket
+    whose path is percent-encoded in the host, e.g. http+unix://%2Ftmp%2Fapi.sock/api/users
+    connections of each socket are pooled as TCP connections of each host.
+"""
+
+import socket
+
+from requests.adapters import HTTPAdapter
+from requests.compat import unquote, urlparse
+from urllib3._collections import RecentlyUsedContainer
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+UNIX_SCHEME = "http+unix"
+
+
+def get_socket_path(url):
+    """ get unix socket path encoded in the host of URL.
+    @param url: e.g. http+unix://%2Ftmp%2Fapi.sock/api/users
+    @return (str) e.g. /tmp/api.sock
+    """
+    return unquote(urlparse(url).netloc)
+
+
+class UnixHTTPConnection(HTTPConnection):
+
+    def __init__(self, *args, **kwargs):
+        self.socket_path = kwargs.pop("socket_path")
+        super(UnixHTTPConnection, self).__init__(*args, **kwargs)
+
+    def _new_conn(self):
+        """ connect to unix socket instead of TCP address, called by connect of urllib3 1.x and 2.x
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # timeout may be a sentinel of default timeout
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except socket.error:
+            sock.close()
+            raise
+
+        return sock
+
+
+class UnixHTTPConnectionPool(HTTPConnectionPool):
+
+    ConnectionCls = UnixHTTPConnection
+
+    def __init__(self, socket_path, **kwargs):
+        # Host header is sent as localhost
+        super(UnixHTTPConnectionPool, self).__init__(
+            "localhost", socket_path=socket_path, **kwargs)
+        self.socket_path = socket_path
+
+
+class UnixHTTPAdapter(HTTPAdapter):
+    """ transport adapter of http+unix:// URLs, mounted in HttpSession.
+        proxies are ignored as requests are sent to local sockets.
+    """
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super(UnixHTTPAdapter, self).init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.unix_pools = RecentlyUsedContainer(connections, dispose_func=lambda pool: pool.close())
+
+    def get_connection(self, url, proxies=None):
+        socket_path = get_socket_path(url)
+        with self.unix_pools.lock:
+            pool = self.unix_pools.get(socket_path)
+            if pool is None:
+                pool = UnixHTTPConnectionPool(
+                    socket_path,
+                    maxsize=self._pool_maxsize,
+                    block=self._pool_block
+                )
+                self.unix_pools[socket_path] = pool
+
+        return pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        # called instead of get_connection since requests 2.32
+        return self.get_connection(request.url, proxies)
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        super(UnixHTTPAdapter, self).close()
+        self.unix_pools.clear()
@@ -15,8 +15,7 @@ import string
 import types
 from datetime import datetime
 
-import yaml
-from httprunner import exception, logger
+from httprunner import exception, logger, profiler
 from httprunner.compat import OrderedDict, is_py2, is_py3
 from requests.structures import CaseInsensitiveDict
 
@@ -66,6 +65,8 @@ class FileUtils(object):
     def _load_yaml_file(yaml_file):
         """ load yaml file and check file content format
         """
+        import yaml
+
         with io.open(yaml_file, 'r', encoding='utf-8') as stream:
             yaml_content = yaml.load(stream)
             FileUtils._check_format(yaml_file, yaml_content)
@@ -115,6 +116,7 @@ class FileUtils(object):
         return csv_content_list
 
     @staticmethod
+    @profiler.timed("load_file")
     def load_file(file_path):
         if not os.path.isfile(file_path):
             raise exception.FileNotFoundError("{} does not exist.".format(file_path))
@@ -311,6 +313,26 @@ def filter_module(module, filter_type):
     module_functions_dict = dict(filter(filter_type, vars(module).items()))
     return module_functions_dict
 
+# functions and variables of imported debugtalk.py files, keyed by file path
+# {file_path: (mtime, {"function": functions_dict, "variable": variables_dict})}
+debugtalk_items_cache = {}
+
+def load_debugtalk_items(file_path, item_type):
+    """ load functions or variables from debugtalk.py file,
+        file is imported again only if it's modified since last import.
+    """
+    mtime = os.path.getmtime(file_path)
+    cached = debugtalk_items_cache.get(file_path)
+    if cached is None or cached[0] != mtime:
+        imported_module = get_imported_module_from_file(file_path)
+        cached = (mtime, {
+            "function": filter_module(imported_module, "function"),
+            "variable": filter_module(imported_module, "variable")
+        })
+        debugtalk_items_cache[file_path] = cached
+
+    return cached[1][item_type]
+
 def search_conf_item(start_path, item_type, item_name):
     """ search expected function or variable recursive upward
     @param
@@ -322,8 +344,7 @@ def search_conf_item(start_path, item_type, item_name):
     target_file = os.path.join(dir_path, "debugtalk.py")
 
     if os.path.isfile(target_file):
-        imported_module = get_imported_module_from_file(target_file)
-        items_dict = filter_module(imported_module, item_type)
+        items_dict = load_debugtalk_items(target_file, item_type)
         if item_name in items_dict:
             return items_dict[item_name]
         else:
@@ -0,0 +1,157 @@
+# encoding: utf-8
+
+import os
+import time
+
+from httprunner import exception, logger
+from httprunner.testcase import TestcaseLoader
+from httprunner.utils import FileUtils
+
+
+def get_debugtalk_files(testset_files):
+    """ get debugtalk.py files which may be searched by testsets, in testset folders and upward.
+    """
+    debugtalk_files = set()
+    searched_dirs = set()
+    for testset_file in testset_files:
+        dir_path = os.path.dirname(os.path.abspath(testset_file))
+        while dir_path not in searched_dirs:
+            searched_dirs.add(dir_path)
+            debugtalk_file = os.path.join(dir_path, "debugtalk.py")
+            if os.path.isfile(debugtalk_file):
+                debugtalk_files.add(debugtalk_file)
+
+            parent_dir_path = os.path.dirname(dir_path)
+            if parent_dir_path == dir_path:
+                break
+            dir_path = parent_dir_path
+
+    return debugtalk_files
+
+
+class TestsetWatcher(object):
+    """ watch testset, api, suite and debugtalk.py files, and find out testsets affected by changes.
+    """
+    def __init__(self, testset_paths):
+        if not isinstance(testset_paths, (list, set)):
+            testset_paths = [testset_paths]
+
+        self.testset_paths = [os.path.abspath(path) for path in testset_paths]
+        self.def_folders = [
+            os.path.join(os.getcwd(), "tests", "api"),
+            os.path.join(os.getcwd(), "tests", "suite")
+        ]
+        self.snapshot = self.take_snapshot()
+
+    def get_testset_files(self):
+        testset_files = set()
+        for path in self.testset_paths:
+            if os.path.isdir(path):
+                testset_files.update(FileUtils.load_folder_files(path))
+            elif os.path.isfile(path):
+                testset_files.add(path)
+
+        def_files = set(FileUtils.load_folder_files(self.def_folders))
+        return testset_files - def_files
+
+    def take_snapshot(self):
+        """ get modified time of all watched files.
+        @return (dict)
+            {
+                "testset": {file_path: mtime},
+                "def": {file_path: mtime},
+                "debugtalk": {file_path: mtime}
+            }
+        """
+        testset_files = self.get_testset_files()
+        files_mapping = {
+            "testset": testset_files,
+            "def": FileUtils.load_folder_files(self.def_folders),
+            "debugtalk": get_debugtalk_files(testset_files)
+        }
+
+        snapshot = {}
+        for file_type, files in files_mapping.items():
+            snapshot[file_type] = {}
+            for file_path in files:
+                try:
+                    snapshot[file_type][file_path] = os.path.getmtime(file_path)
+                except OSError:
+                    # file removed during snapshot
+                    continue
+
+        return snapshot
+
+    def get_changed_files(self):
+        """ take a new snapshot and compare with the last one.
+        @return (dict) changed files of each type, including added, modified and removed files.
+        """
+        snapshot = self.take_snapshot()
+        changed_files = {}
+        for file_type, files_mtime in snapshot.items():
+            last_files_mtime = self.snapshot.get(file_type, {})
+            changed_files[file_type] = set(
+                file_path
+                for file_path in set(files_mtime) | set(last_files_mtime)
+                if files_mtime.get(file_path) != last_files_mtime.get(file_path)
+            )
+
+        self.snapshot = snapshot
+        return changed_files
+
+    def get_affected_testsets(self, changed_files):
+        """ invalidate loaded testsets and definitions of changed files,
+            and get testset files which should be rerun.
+        """
+        affected_testsets = set()
+        testset_files = self.snapshot["testset"]
+
+        for file_path in changed_files["testset"]:
+            TestcaseLoader.invalidate_cache(file_path)
+            if file_path in testset_files:
+                affected_testsets.add(file_path)
+
+        for debugtalk_file in changed_files["debugtalk"]:
+            dir_path = os.path.join(os.path.dirname(debugtalk_file), "")
+            for file_path in testset_files:
+                if file_path.startswith(dir_path):
+                    TestcaseLoader.invalidate_cache(file_path)
+                    affected_testsets.add(file_path)
+
+        if changed_files["def"]:
+            reloaded_defs = TestcaseLoader.load_test_dependencies()
+            for file_path in TestcaseLoader.get_files_referencing(reloaded_defs):
+                if file_path in testset_files:
+                    affected_testsets.add(file_path)
+
+        return sorted(affected_testsets)
+
+
+def watch(testset_paths, run_testsets, interval=0.5):
+    """ run testsets, then rerun affected testsets whenever watched files change.
+    @param testset_paths: testset file or folder paths
+    @param (function) run_testsets: function to run testsets with specified paths
+    @param (float) interval: seconds between checking file changes
+    """
+    watcher = TestsetWatcher(testset_paths)
+    run_testsets(testset_paths)
+    logger.color_print("Watching for file changes, press Ctrl+C to exit.", "GREEN")
+
+    while True:
+        time.sleep(interval)
+        changed_files = watcher.get_changed_files()
+        if not any(changed_files.values()):
+            continue
+
+        try:
+            affected_testsets = watcher.get_affected_testsets(changed_files)
+            if not affected_testsets:
+                continue
+
+            logger.color_print("Rerun affected testsets: {}".format(affected_testsets), "GREEN")
+            run_testsets(affected_testsets)
+        except SystemExit:
+            # HttpRunner.run exits when testsets are not found, e.g. removed while watching
+            logger.log_error("failed to rerun testsets: {}".format(affected_testsets))
+        except (exception.MyBaseError, Exception) as ex:
+            logger.log_error("failed to rerun testsets: {}".format(ex))
@@ -77,7 +77,7 @@ setup(
     url=about['__url__'],
     license=about['__license__'],
     python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, <4',
-    packages=find_packages(exclude=["examples", "tests", "tests.*"]),
+    packages=find_packages(exclude=["examples", "tests", "tests.*", "benchmarks"]),
     package_data={
         '': ["README.md"],
         'httprunner': ["templates/*"],
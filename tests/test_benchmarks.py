@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import e2e, runner
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_time_function(self):
+        result = runner.time_function(lambda: None, repeat=3, min_time=0.001)
+        self.assertEqual(result["repeat"], 3)
+        self.assertGreater(result["number"], 1)
+        self.assertLessEqual(result["min"], result["median"])
+
+    def test_compare_results(self):
+        baseline_results = {
+            "parse_function[1]": {"min": 1.0},
+            "query_json[1]": {"min": 1.0},
+            "removed[1]": {"min": 1.0}
+        }
+        results = {
+            "parse_function[1]": {"min": 1.05},
+            "query_json[1]": {"min": 1.2},
+            "added[1]": {"min": 1.0}
+        }
+        comparisons = runner.compare_results(results, baseline_results, threshold=0.1)
+        self.assertEqual(
+            [(key, is_regression) for key, _, is_regression in comparisons],
+            [("parse_function[1]", False), ("query_json[1]", True)]
+        )
+
+    def test_run_benchmarks(self):
+        # make sure all benchmarks keep working with current code
+        results = runner.run_benchmarks(repeat=1, min_time=0, quick=True)
+        self.assertIn("parse_function[1]", results)
+        self.assertIn("render_html_report[10]", results)
+
+    def test_main_with_baseline(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            result_path = os.path.join(temp_dir, "result.json")
+            argv = ["-k", "parse_function", "--quick", "--repeat", "1", "--min-time", "0"]
+            self.assertEqual(runner.main(argv + ["--output", result_path]), 0)
+            self.assertIn("parse_function[1]", runner.load_results(result_path))
+            # negative threshold makes any timing a regression
+            self.assertEqual(
+                runner.main(argv + ["--baseline", result_path, "--threshold", "-1"]),
+                1
+            )
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_e2e_scenario(self):
+        port = e2e.get_free_port()
+        server_process = e2e.start_stub_server(port)
+        base_url = "http://127.0.0.1:{}".format(port)
+        try:
+            for mode in e2e.MODES:
+                result = e2e.run_scenario(mode, "crud", base_url, 1)
+                self.assertEqual(result["requests"], 5)
+                self.assertGreater(result["requests_per_second"], 0)
+        finally:
+            server_process.terminate()
+            server_process.wait()
@@ -1,6 +1,14 @@
+import os
+import shutil
+import tempfile
+import time
+
+from httprunner import ratelimit, retry
 from httprunner.built_in import setup_hook_prepare_kwargs
 from httprunner.client import HttpSession
 from httprunner.compat import bytes
+from httprunner.retry import CircuitOpenError, RetryPolicy
+from requests.exceptions import ConnectionError, InvalidURL
 from tests.base import ApiServerUnittest
 
 
@@ -70,3 +78,115 @@ class TestHttpClient(ApiServerUnittest):
         }
         setup_hook_prepare_kwargs(request)
         self.assertIsInstance(request["data"], bytes)
+
+    def test_request_with_retry(self):
+        retry_policy = RetryPolicy(max_retries=2, backoff_factor=0.01, status_codes=[503])
+        resp = self.api_client.get(
+            "http://127.0.0.1:3458/status/503", retry=retry_policy)
+        self.assertEqual(resp.status_code, 503)
+        meta_data = self.api_client.meta_data
+        self.assertEqual(meta_data["retries"], 2)
+        self.assertEqual(len(meta_data["attempts"]), 2)
+        self.assertEqual(meta_data["attempts"][0]["status_code"], 503)
+        # response time includes all attempts
+        self.assertGreaterEqual(
+            meta_data["response_time_ms"],
+            sum(attempt["response_time_ms"] for attempt in meta_data["attempts"])
+        )
+
+        # POST is not idempotent
+        resp = self.api_client.post(
+            "http://127.0.0.1:3458/status/503", retry=retry_policy)
+        self.assertEqual(self.api_client.meta_data["retries"], 0)
+
+    def test_request_with_circuit_breaker(self):
+        url = "http://127.0.0.1:1/api/users"
+        circuit_breaker_config = {"failure_threshold": 2, "reset_timeout": 60}
+        try:
+            for _ in range(2):
+                resp = self.api_client.get(url, circuit_breaker=circuit_breaker_config)
+                self.assertIsInstance(resp.error, ConnectionError)
+
+            resp = self.api_client.get(url, circuit_breaker=circuit_breaker_config)
+            self.assertIsInstance(resp.error, CircuitOpenError)
+            self.assertEqual(resp.status_code, 0)
+        finally:
+            retry.circuit_breakers.clear()
+
+    def test_circuit_breaker_trial_raises(self):
+        url = "http://127.0.0.1:3458/get"
+        circuit_breaker_config = {"failure_threshold": 1, "reset_timeout": 0.01}
+        circuit_breaker = retry.get_circuit_breaker(url, circuit_breaker_config)
+        try:
+            circuit_breaker.record_failure()
+            time.sleep(0.02)
+            self.assertEqual(circuit_breaker.state, "half_open")
+
+            def raise_invalid_url(*args, **kwargs):
+                raise InvalidURL("invalid url")
+
+            self.api_client._send_request_limited = raise_invalid_url
+            with self.assertRaises(InvalidURL):
+                self.api_client.get(url, circuit_breaker=circuit_breaker_config)
+            del self.api_client._send_request_limited
+
+            # failed trial opens circuit again, and another trial is sent after reset timeout
+            self.assertEqual(circuit_breaker.state, "open")
+            time.sleep(0.02)
+            resp = self.api_client.get(url, circuit_breaker=circuit_breaker_config)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(circuit_breaker.state, "closed")
+        finally:
+            retry.circuit_breakers.clear()
+
+    def test_static_request_with_same_headers(self):
+        temp_dir = tempfile.mkdtemp()
+        netrc_path = os.path.join(temp_dir, "netrc")
+        with open(netrc_path, "w") as f:
+            f.write("machine 127.0.0.1 login user password secret\n")
+
+        netrc_env = os.environ.get("NETRC")
+        os.environ["NETRC"] = netrc_path
+        try:
+            session = HttpSession("http://127.0.0.1:3458")
+            session.cookies.set("session_id", "abc")
+            kwargs = {
+                "headers": {"Content-Type": "application/json", "os_platform": "ios"},
+                "params": {"a": 1},
+                "data": b'{"b": 2}'
+            }
+            session.request("POST", "/post", **kwargs)
+            dynamic_meta_data = session.meta_data
+
+            static_request = session.prepare_static_request("POST", "/post", **kwargs)
+            session.request("POST", "/post", static_request=static_request)
+            static_meta_data = session.meta_data
+        finally:
+            if netrc_env is None:
+                os.environ.pop("NETRC")
+            else:
+                os.environ["NETRC"] = netrc_env
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(static_meta_data["status_code"], 200)
+        self.assertEqual(static_meta_data["url"], dynamic_meta_data["url"])
+        self.assertEqual(static_meta_data["request_body"], dynamic_meta_data["request_body"])
+        self.assertEqual(
+            dict(static_meta_data["request_headers"]),
+            dict(dynamic_meta_data["request_headers"])
+        )
+        # credentials in netrc and session cookies are sent by both
+        self.assertIn("Authorization", static_meta_data["request_headers"])
+        self.assertEqual(static_meta_data["request_headers"]["Cookie"], "session_id=abc")
+
+    def test_request_with_rate_limit(self):
+        url = "http://127.0.0.1:3458/get"
+        rate_limit_config = {"rate": 50, "burst": 1, "max_in_flight": 1}
+        try:
+            self.api_client.get(url, rate_limit=rate_limit_config)
+            self.api_client.get(url, rate_limit=rate_limit_config)
+            meta_data = self.api_client.meta_data
+            self.assertGreater(meta_data["rate_limit_wait_ms"], 0)
+            self.assertEqual(meta_data["status_code"], 200)
+        finally:
+            ratelimit.reset()
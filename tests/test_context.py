@@ -101,6 +101,42 @@ class VariableBindsUnittest(ApiServerUnittest):
             self.assertIn("sum2nums", context_variables)
             self.assertEqual(context_variables["sum2nums"], 5)
 
+    def test_context_bind_lazy_variables(self):
+        calls = []
+
+        def gen_payload(size):
+            calls.append(size)
+            return "x" * size
+
+        self.context.bind_functions({"gen_payload": gen_payload}, level="testset")
+        self.context.bind_variables([
+            {"size": 3},
+            {"payload": "${gen_payload($size)}"},
+            {"unused": "${gen_payload(1000)}"},
+            {"data": {"payload": "$payload"}}
+        ], level="testset")
+        self.assertEqual(calls, [])
+
+        # testcase variables override testset variables, but not the ones they depend on
+        self.context.init_context("testcase")
+        self.context.bind_variables([{"size": 5}])
+        self.assertEqual(self.context.eval_content("$data"), {"payload": "xxx"})
+        self.assertEqual(self.context.eval_content("${gen_payload($size)}"), "xxxxx")
+        self.assertEqual(calls, [3, 5])
+
+        # testset variables are evaluated once, and deep copied for each testcase
+        testcase_variables = self.context.testcase_variables_mapping
+        testcase_variables["data"]["payload"] = "modified"
+        self.context.init_context("testcase")
+        self.assertEqual(self.context.testcase_variables_mapping["data"], {"payload": "xxx"})
+        self.assertEqual(self.context.testset_shared_variables_mapping["data"], {"payload": "xxx"})
+        self.assertEqual(calls, [3, 5])
+
+    def test_context_bind_lazy_variables_not_found(self):
+        self.context.bind_variables([{"token": "$not_exist"}])
+        with self.assertRaises(exception.ParamsError):
+            self.context.eval_content("$token")
+
     def test_call_builtin_functions(self):
         testcase1 = {
             "variables": [
@@ -229,6 +265,47 @@ class VariableBindsUnittest(ApiServerUnittest):
         self.assertEqual(parsed_request["data"], testcase["variables"][2]["data"])
         self.assertEqual(parsed_request["headers"]["secret_key"], "DebugTalk")
 
+    def test_get_request_template(self):
+        test_runner = runner.Runner({
+            "request": {
+                "base_url": "http://127.0.0.1:5000",
+                "headers": {"User-Agent": "iOS/2.8.3", "Token": "abc"}
+            }
+        })
+        context = test_runner.context
+        request = {
+            "url": "/api/users/$uid",
+            "METHOD": "GET",
+            "Headers": {"Token": "$token"}
+        }
+        request_template = context.get_request_template(request)
+        self.assertEqual(
+            request_template,
+            {
+                "base_url": "http://127.0.0.1:5000",
+                "url": "/api/users/$uid",
+                "method": "GET",
+                "headers": {"user-agent": "iOS/2.8.3", "token": "$token"}
+            }
+        )
+        self.assertIs(context.get_request_template(request), request_template)
+
+        context.bind_variables({"uid": 1000, "token": "xyz"})
+        parsed_request = context.get_parsed_request(request)
+        self.assertEqual(parsed_request["url"], "/api/users/1000")
+        self.assertEqual(parsed_request["headers"]["token"], "xyz")
+        parsed_request.pop("url")
+        self.assertEqual(context.get_parsed_request(request)["url"], "/api/users/1000")
+
+        self.assertFalse(context.is_static_request(request))
+        self.assertTrue(context.is_static_request({"url": "/api/users", "method": "GET"}))
+        self.assertFalse(context.is_static_request({}))
+        self.assertEqual(request_template["url"], "/api/users/$uid")
+
+        # templates are computed again with new testset request config
+        context.init_context("testset")
+        self.assertEqual(context.get_request_template(request)["headers"], {"token": "$token"})
+
     def test_exec_content_functions(self):
         test_runner = runner.Runner()
         content = "${sleep_N_secs(1)}"
@@ -0,0 +1,107 @@
+# encoding: utf-8
+import io
+import json
+import os
+import shutil
+import unittest
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from httprunner import exporters
+
+
+class FakeResult(unittest.TestResult):
+    duration = 1.5
+
+
+class TestExporters(unittest.TestCase):
+
+    def setUp(self):
+        self.report_name = "test_exporters"
+        self.start_at = datetime(2018, 6, 1, 12, 30, 0)
+        self.records = [
+            {
+                "name": "get token",
+                "status": "success",
+                "attachment": "",
+                "meta_data": {
+                    "method": "POST",
+                    "url": "http://127.0.0.1:5000/api/get-token",
+                    "status_code": 200,
+                    "response_time_ms": 12.5
+                },
+                "testset": "tests/data/demo.yml"
+            },
+            {
+                "name": u"create user <中文>",
+                "status": "failure",
+                "attachment": u"Traceback:\n\x1b[0mValidationFailure: 200 != 201 & 'x'",
+                "meta_data": {},
+                "testset": "tests/data/demo.yml"
+            }
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(os.path.join(os.getcwd(), "reports", self.report_name), ignore_errors=True)
+
+    def test_create_writers(self):
+        writers = exporters.create_writers(["html", "junit", "json"], self.report_name)
+        self.assertEqual(len(writers), 2)
+        self.assertIsInstance(writers[0], exporters.JUnitXmlWriter)
+        self.assertIsInstance(writers[1], exporters.JsonLinesWriter)
+
+    def test_junit_xml_writer(self):
+        writer = exporters.JUnitXmlWriter(self.report_name)
+        writer.start(self.start_at)
+        self.assertTrue(writer.path.endswith(
+            os.path.join(self.report_name, "test_exporters-2018-06-01-12-30-00.xml")))
+
+        writer.write(self.records[0], 0.02)
+        # partial report is valid xml before the run finishes
+        with io.open(writer.path, 'rb') as f:
+            testsuite = ET.fromstring(f.read()).find("testsuite")
+        self.assertEqual(len(testsuite.findall("testcase")), 1)
+
+        writer.write(self.records[1], 0.03)
+        result = FakeResult()
+        result.testsRun = 2
+        result.failures.append((None, self.records[1]["attachment"]))
+        writer.close(result)
+
+        with io.open(writer.path, 'rb') as f:
+            testsuite = ET.fromstring(f.read()).find("testsuite")
+        self.assertEqual(testsuite.get("tests"), "2")
+        self.assertEqual(testsuite.get("failures"), "1")
+        self.assertEqual(testsuite.get("time"), "1.500")
+        testcases = testsuite.findall("testcase")
+        self.assertEqual(len(testcases), 2)
+        self.assertEqual(testcases[0].get("classname"), "tests/data/demo.yml")
+        self.assertIn("api/get-token", testcases[0].find("system-out").text)
+        self.assertEqual(testcases[1].get("name"), u"create user <中文>")
+        self.assertEqual(
+            testcases[1].find("failure").get("message"),
+            u"[0mValidationFailure: 200 != 201 & 'x'"
+        )
+
+    def test_json_lines_writer(self):
+        writer = exporters.JsonLinesWriter(self.report_name)
+        writer.start(self.start_at)
+        writer.write(self.records[0], 0.02)
+        with io.open(writer.path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+        writer.write(self.records[1], 0.03)
+        result = FakeResult()
+        result.testsRun = 2
+        result.failures.append((None, self.records[1]["attachment"]))
+        writer.close(result)
+
+        with io.open(writer.path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]["type"], "testcase")
+        self.assertEqual(lines[0]["status_code"], 200)
+        self.assertEqual(lines[1]["status"], "failure")
+        self.assertEqual(lines[2]["type"], "summary")
+        self.assertFalse(lines[2]["success"])
+        self.assertEqual(lines[2]["stat"]["failures"], 1)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from httprunner.history import TestHistory
+
+
+class TestTestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.temp_dir, "history.json")
+        self.testsets = [
+            {"name": name, "config": {}, "testcases": []}
+            for name in ["short", "long", "new", "flaky"]
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_record_partial_combinations(self):
+        history = TestHistory(self.history_path)
+        history.record_testset("demo", 8, combinations=4)
+        history.record_testset("demo", 3, combinations=1)
+        self.assertEqual(history.get_testset_duration("demo"), 12)
+        self.assertEqual(history.get_combination_duration("demo"), 3)
+        self.assertIsNone(history.get_testset_duration("not_exist"))
+
+    def test_record_testcases(self):
+        history = TestHistory(self.history_path)
+        history.record_testset("demo", 1, testcases_stat={
+            "get token": {"runs": 2, "failures": 1, "duration": 0.5},
+            "skipped": {"runs": 0, "failures": 0, "duration": 0}
+        })
+        history.record_testset("demo", 1, testcases_stat={
+            "get token": {"runs": 2, "failures": 0, "duration": 0.3}
+        })
+        history.dump()
+
+        record = TestHistory(self.history_path).testsets["demo"]
+        self.assertEqual(record["runs"], 2)
+        self.assertEqual(record["failures"], 1)
+        self.assertEqual(record["failure_rate"], 0.25)
+        self.assertNotIn("skipped", record["testcases"])
+        self.assertEqual(
+            record["testcases"]["get token"],
+            {"duration": 0.15, "runs": 4, "failures": 1, "failure_rate": 0.25}
+        )
+
+    def test_sort_testsets(self):
+        history = TestHistory(self.history_path)
+        history.record_testset("short", 1)
+        history.record_testset("long", 10)
+        history.record_testset("flaky", 5, testcases_stat={
+            "get token": {"runs": 1, "failures": 1, "duration": 5}
+        })
+
+        self.assertEqual(
+            [testset["name"] for testset in history.sort_testsets_by_duration(self.testsets)],
+            ["new", "long", "flaky", "short"]
+        )
+        self.assertEqual(
+            [testset["name"] for testset in history.sort_testsets_by_failure_rate(self.testsets)],
+            ["flaky", "new", "short", "long"]
+        )
+
+    def test_load_invalid_file(self):
+        with open(self.history_path, "w") as f:
+            f.write("invalid")
+
+        self.assertEqual(TestHistory(self.history_path).testsets, {})
@@ -0,0 +1,57 @@
+import unittest
+
+from httprunner import exception, hooks
+from httprunner.context import Context
+
+
+class TestHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.context = Context()
+        self.context.bind_functions({"record": self.record})
+
+    def record(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    def test_compile_function_call(self):
+        action = hooks.HookAction("${record($request, 1, tag=setup)}")
+        self.assertEqual(action.func_name, "record")
+        self.assertEqual(action.args, ["$request", 1])
+        self.assertEqual(action.kwargs, {"tag": "setup"})
+        self.assertTrue(action.lazy_args)
+
+        self.context.bind_testcase_variable("request", {"url": "/get"})
+        action(self.context)
+        self.assertEqual(self.calls, [(({"url": "/get"}, 1), {"tag": "setup"})])
+
+    def test_compile_static_args(self):
+        action = hooks.HookAction("${record(1, 2)}")
+        self.assertFalse(action.lazy_args)
+        action(self.context)
+        action(self.context)
+        self.assertEqual(self.calls, [((1, 2), {}), ((1, 2), {})])
+
+    def test_compile_other_content(self):
+        action = hooks.HookAction("${record(1)}${record(2)}")
+        self.assertIsNone(action.func_name)
+        action(self.context)
+        self.assertEqual(self.calls, [((1,), {}), ((2,), {})])
+
+    def test_callable_action(self):
+        pipeline = hooks.HookPipeline([self.record, "${record(2)}"])
+        self.assertEqual(len(pipeline), 2)
+        pipeline.run(self.context, "response")
+        self.assertEqual(self.calls, [(("response",), {}), ((2,), {})])
+
+    def test_register_hook(self):
+        hooks.register_hook("teardown", self.record)
+        try:
+            self.assertIn(self.record, hooks.registered_hooks["teardown"])
+        finally:
+            hooks.unregister_hook("teardown", self.record)
+
+        self.assertNotIn(self.record, hooks.registered_hooks["teardown"])
+
+        with self.assertRaises(exception.ParamsError):
+            hooks.register_hook("before", self.record)
@@ -1,7 +1,11 @@
+import io
 import os
 import shutil
+import tempfile
 
-from httprunner import HttpRunner
+from httprunner import HttpRunner, exception
+from httprunner.history import TestHistory
+from httprunner.report import BodyRef
 from httprunner.exception import FileNotFoundError
 from tests.base import ApiServerUnittest
 
@@ -80,10 +84,29 @@ class TestHttpRunner(ApiServerUnittest):
         self.assertEqual(summary["stat"]["testsRun"], 10)
         self.assertEqual(summary["stat"]["skipped"], 4)
 
-        runner.gen_html_report(html_report_name=output_folder_name)
+        report = runner.gen_html_report(html_report_name=output_folder_name)
+        with io.open(report, encoding='utf-8') as f:
+            self.assertIn('<div class="phase-request"', f.read())
+
         report_save_dir = os.path.join(os.getcwd(), 'reports', output_folder_name)
         shutil.rmtree(report_save_dir)
 
+    def test_report_formats(self):
+        report_name = "test_report_formats"
+        runner = HttpRunner(report_formats=["junit", "json"], report_name=report_name)
+        runner.run(self.testset_path)
+        report_save_dir = os.path.join(os.getcwd(), 'reports', report_name)
+        try:
+            report_files = sorted(os.listdir(report_save_dir))
+            self.assertEqual(len(report_files), 2)
+            self.assertTrue(report_files[0].endswith(".jsonl"))
+            self.assertTrue(report_files[1].endswith(".xml"))
+            with io.open(os.path.join(report_save_dir, report_files[0]), encoding='utf-8') as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), runner.summary["stat"]["testsRun"] + 1)
+        finally:
+            shutil.rmtree(report_save_dir)
+
     def test_run_testsets(self):
         testsets = [self.testset]
         runner = HttpRunner().run(testsets)
@@ -92,6 +115,18 @@ class TestHttpRunner(ApiServerUnittest):
         self.assertEqual(summary["stat"]["testsRun"], 2)
         self.assertIn("records", summary)
 
+    def test_run_testset_with_pure_functions(self):
+        testset = self.testset
+        testset["config"]["pure_functions"] = ["gen_sign"]
+        testset["config"]["function_binds"] = {"gen_sign": "lambda sn: sn[::-1]"}
+        for testcase in testset["testcases"]:
+            testcase["request"]["headers"]["sign"] = "${gen_sign(FwgRiO7CNA50DSU)}"
+
+        summary = HttpRunner().run(testset).summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["function_cache"]["misses"], 1)
+        self.assertGreaterEqual(summary["function_cache"]["hits"], 1)
+
     def test_run_testset(self):
         testsets = self.testset
         runner = HttpRunner().run(testsets)
@@ -147,6 +182,48 @@ class TestHttpRunner(ApiServerUnittest):
         report_save_dir = os.path.join(os.getcwd(), 'reports', output_folder_name)
         shutil.rmtree(report_save_dir)
 
+    def test_html_report_with_body_limit(self):
+        testset_path = "tests/httpbin/load_image.yml"
+        # bodies longer than limit are spooled while running, and loaded when rendering
+        runner = HttpRunner(body_limit=100).run(testset_path)
+        self.assertTrue(any(
+            isinstance(record["meta_data"]["response_body"], BodyRef)
+            for record in runner.summary["records"]
+        ))
+        spool_dir_path = runner.body_spool.dir_path
+        self.assertTrue(os.path.isdir(spool_dir_path))
+        output_folder_name = os.path.basename(os.path.splitext(testset_path)[0])
+        report = runner.gen_html_report(html_report_name=output_folder_name, body_limit=100)
+        # spooled bodies are removed once rendered
+        self.assertFalse(os.path.exists(spool_dir_path))
+        report_save_dir = os.path.join(os.getcwd(), 'reports', output_folder_name)
+        try:
+            with io.open(report, encoding='utf-8') as f:
+                content = f.read()
+            self.assertNotIn("base64", content)
+
+            image_links = [
+                record["meta_data"]["response_body"]
+                for record in runner.summary["records"]
+                if record["meta_data"].get("response_data_type") == "image"
+            ]
+            self.assertTrue(image_links)
+            for link in image_links:
+                self.assertIn('src="{}"'.format(link), content)
+                self.assertTrue(os.path.isfile(os.path.join(report_save_dir, link)))
+        finally:
+            shutil.rmtree(report_save_dir)
+
+    def test_rerun_with_body_limit(self):
+        testset_path = "tests/httpbin/load_image.yml"
+        runner = HttpRunner(body_limit=100).run(testset_path)
+        spool_dir_path = runner.body_spool.dir_path
+        runner.run(testset_path)
+        # bodies spooled in previous run are removed, instead of piling up until exit
+        self.assertFalse(os.path.exists(spool_dir_path))
+        self.assertTrue(os.path.isdir(runner.body_spool.dir_path))
+        runner.remove_spooled_bodies()
+
     def test_testcase_layer(self):
         testcase_path = "tests/testcases/smoketest.yml"
         runner = HttpRunner(failfast=True).run(testcase_path)
@@ -154,6 +231,102 @@ class TestHttpRunner(ApiServerUnittest):
         self.assertTrue(summary["success"])
         self.assertEqual(summary["stat"]["testsRun"], 8)
 
+    def test_run_shards_with_history(self):
+        temp_dir = tempfile.mkdtemp()
+        history_path = os.path.join(temp_dir, "history.json")
+        testset_paths = [self.testset_path, "tests/httpbin/upload.yml"]
+
+        tests_run = 0
+        for shard_index in range(3):
+            kwargs = {
+                "history_path": history_path,
+                "shard_index": shard_index,
+                "shard_count": 3
+            }
+            runner = HttpRunner(**kwargs).run(testset_paths)
+            self.assertTrue(runner.summary["success"])
+            tests_run += runner.summary["stat"]["testsRun"]
+
+        self.assertEqual(tests_run, 11)
+        history = TestHistory(history_path)
+        self.assertGreater(history.get_testset_duration(self.testset_path), 0)
+        self.assertIsNotNone(history.get_testset_duration("tests/httpbin/upload.yml"))
+        self.assertIn("testcases", history.testsets[self.testset_path])
+        shutil.rmtree(temp_dir)
+
+    def test_run_shard_count_invalid(self):
+        with self.assertRaises(exception.ParamsError):
+            HttpRunner(shard_index=0, shard_count=0)
+
+    def test_run_failfast_with_history(self):
+        temp_dir = tempfile.mkdtemp()
+        history_path = os.path.join(temp_dir, "history.json")
+        testsets = [
+            {
+                "name": "failed testset",
+                "config": {"request": {"base_url": "http://127.0.0.1:3458"}},
+                "testcases": [{
+                    "name": "status 500",
+                    "request": {"url": "/status/500", "method": "GET"},
+                    "validate": [{"eq": ["status_code", 200]}]
+                }]
+            },
+            {
+                "name": "stopped testset",
+                "config": {"request": {"base_url": "http://127.0.0.1:3458"}},
+                "testcases": [{"name": "get", "request": {"url": "/get", "method": "GET"}}]
+            }
+        ]
+        history = TestHistory(history_path)
+        history.record_testset("stopped testset", 0.5)
+        history.dump()
+
+        runner = HttpRunner(failfast=True, history_path=history_path).run(testsets)
+        self.assertEqual(runner.summary["stat"]["testsRun"], 1)
+        history = TestHistory(history_path)
+        self.assertEqual(history.testsets["failed testset"]["runs"], 1)
+        self.assertEqual(history.testsets["stopped testset"]["runs"], 1)
+        self.assertEqual(history.get_testset_duration("stopped testset"), 0.5)
+        shutil.rmtree(temp_dir)
+
+    def test_run_testset_concurrently(self):
+        testset = {
+            "name": "run independent testcases concurrently",
+            "config": {
+                "request": {"base_url": "http://127.0.0.1:3458"},
+                "concurrency": 3
+            },
+            "testcases": [
+                {
+                    "name": "get host",
+                    "request": {"url": "/get", "method": "GET"},
+                    "extract": [{"host": "content.headers.Host"}]
+                },
+                {
+                    "name": "get with host header",
+                    "request": {"url": "/get", "method": "GET", "headers": {"X-Host": "$host"}},
+                    "extract": [{"x_host": "content.headers.X-Host"}],
+                    "validate": [{"eq": ["content.headers.X-Host", "127.0.0.1:3458"]}]
+                },
+                {
+                    "name": "get with params",
+                    "request": {"url": "/get", "method": "GET", "params": {"host": "$host"}},
+                    "validate": [{"eq": ["content.args.host", "127.0.0.1:3458"]}],
+                    "times": 2
+                },
+                {
+                    "name": "post extracted host",
+                    "request": {"url": "/post", "method": "POST", "data": "$x_host"},
+                    "validate": [{"eq": ["content.data", "127.0.0.1:3458"]}]
+                }
+            ]
+        }
+        runner = HttpRunner().run(testset)
+        summary = runner.summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["testsRun"], 5)
+        self.assertEqual(len(summary["records"]), 5)
+
     def test_load_env_path(self):
         self.assertNotIn("PROJECT_KEY", os.environ)
         HttpRunner(dot_env_path="tests/data/test.env").run(self.testset_path)
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from httprunner.compat import json
+
+HEAVY_MODULES = [
+    "requests", "urllib3", "jinja2", "yaml", "colorlog", "requests_toolbelt",
+    "locust", "httprunner.task", "httprunner.report"
+]
+
+
+def parse_importtime(output):
+    """ parse output of `python -X importtime` into cumulative import time of each module.
+        import time: self [us] | cumulative | imported package
+        import time:       136 |        136 |   httprunner.compat
+    """
+    modules_time = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(fields[1])
+        except (IndexError, ValueError):
+            # header line
+            continue
+
+        modules_time[fields[2].strip()] = cumulative
+
+    return modules_time
+
+
+def get_imported_modules(statement):
+    """ run statement in a new interpreter, and get modules imported by it.
+    @return (dict) imported modules mapping to their cumulative import time in microseconds,
+        time is None if it can not be measured before Python 3.7.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.getcwd()] + [path for path in [env.get("PYTHONPATH")] if path])
+
+    if sys.version_info >= (3, 7):
+        cmd = [sys.executable, "-X", "importtime", "-c", statement]
+        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT, env=env)
+        return parse_importtime(output.decode("utf-8"))
+
+    statement += "\nimport json, sys\nprint(json.dumps(list(sys.modules)))"
+    cmd = [sys.executable, "-c", statement]
+    output = subprocess.check_output(cmd, env=env)
+    return dict.fromkeys(json.loads(output.decode("utf-8").splitlines()[-1]))
+
+
+class TestImportTime(unittest.TestCase):
+
+    def assert_not_imported(self, imported_modules, module_names):
+        for module_name in module_names:
+            self.assertNotIn(module_name, imported_modules)
+
+    def test_parse_importtime(self):
+        output = "import time: self [us] | cumulative | imported package\n" \
+            "import time:       136 |        136 |   httprunner.compat\n" \
+            "import time:      1024 |       2048 | httprunner.cli\n"
+        self.assertEqual(
+            parse_importtime(output),
+            {"httprunner.compat": 136, "httprunner.cli": 2048}
+        )
+
+    def test_import_cli(self):
+        imported_modules = get_imported_modules("import httprunner.cli")
+        self.assertIn("httprunner.cli", imported_modules)
+        self.assert_not_imported(imported_modules, HEAVY_MODULES)
+
+    def test_import_package(self):
+        imported_modules = get_imported_modules("import httprunner")
+        self.assert_not_imported(imported_modules, HEAVY_MODULES)
+
+        imported_modules = get_imported_modules("from httprunner import HttpRunner")
+        self.assertIn("httprunner.task", imported_modules)
+        self.assert_not_imported(imported_modules, ["jinja2", "yaml", "colorlog", "locust"])
+
+    def test_load_json_testset(self):
+        imported_modules = get_imported_modules(
+            "from httprunner.utils import FileUtils\n"
+            "FileUtils.load_file('tests/data/demo_testset_hardcode.json')"
+        )
+        self.assert_not_imported(imported_modules, ["yaml", "jinja2"])
@@ -0,0 +1,111 @@
+import unittest
+
+from httprunner import memoize
+from httprunner.testcase import TestcaseParser
+
+
+class TestFunctionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def add(self, a, b=0):
+        self.calls.append((a, b))
+        return a + b
+
+    def test_call(self):
+        function_cache = memoize.FunctionCache(maxsize=2)
+        self.assertEqual(function_cache.call(self.add, [1], {"b": 2}), 3)
+        self.assertEqual(function_cache.call(self.add, [1], {"b": 2}), 3)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(function_cache.call(self.add, [1, 3], {}), 4)
+        self.assertEqual(
+            function_cache.get_stats(),
+            {"hits": 1, "misses": 2, "size": 2, "maxsize": 2}
+        )
+
+    def test_typed_arguments(self):
+        function_cache = memoize.FunctionCache()
+        results = [
+            function_cache.call(str, [arg], {})
+            for arg in [1, 1.0, True, 1]
+        ]
+        self.assertEqual(results, ["1", "1.0", "True", "1"])
+        self.assertEqual(function_cache.call(self.add, [0], {"b": 1.0}), 1.0)
+        self.assertIsInstance(function_cache.call(self.add, [0], {"b": 1}), int)
+        self.assertEqual(function_cache.get_stats()["hits"], 1)
+
+    def test_lru_eviction(self):
+        function_cache = memoize.FunctionCache(maxsize=2)
+        function_cache.call(self.add, [1], {})
+        function_cache.call(self.add, [2], {})
+        # 1 is most recently used, 2 is evicted
+        function_cache.call(self.add, [1], {})
+        function_cache.call(self.add, [3], {})
+        function_cache.call(self.add, [1], {})
+        self.assertEqual(self.calls, [(1, 0), (2, 0), (3, 0)])
+        function_cache.call(self.add, [2], {})
+        self.assertEqual(self.calls[-1], (2, 0))
+
+    def test_unhashable_and_mutable(self):
+        function_cache = memoize.FunctionCache()
+        self.assertEqual(function_cache.call(self.add, [[1], [2]], {}), [1, 2])
+        self.assertEqual(function_cache.call(self.add, [[1], [2]], {}), [1, 2])
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(function_cache.get_stats()["misses"], 0)
+
+        result = function_cache.call(self.add, [(1,), (2,)], {})
+        self.assertEqual(result, (1, 2))
+
+        gen_dict = lambda key: {key: []}
+        result = function_cache.call(gen_dict, ["a"], {})
+        result["a"].append(1)
+        self.assertEqual(function_cache.call(gen_dict, ["a"], {}), {"a": []})
+
+    def test_eval_pure_functions(self):
+        memoize.function_cache.clear()
+
+        @memoize.pure
+        def sign(content):
+            self.calls.append(content)
+            return content.upper()
+
+        parser = TestcaseParser(
+            variables={"device_sn": "abc"},
+            functions={"sign": sign, "add": self.add}
+        )
+        for _ in range(3):
+            self.assertEqual(parser.eval_content_with_bindings("${sign($device_sn)}"), "ABC")
+            self.assertEqual(parser.eval_content_with_bindings("${add(1, 2)}"), 3)
+        self.assertEqual(self.calls, ["abc", (1, 2), (1, 2), (1, 2)])
+
+        parser.pure_functions = set(["add"])
+        parser.eval_content_with_bindings("${add(1, 2)}")
+        parser.eval_content_with_bindings("${add(1, 2)}")
+        self.assertEqual(len(self.calls), 5)
+        self.assertEqual(memoize.function_cache.get_stats()["hits"], 3)
+
+
+class TestIdentityCache(unittest.TestCase):
+
+    def test_get_set(self):
+        identity_cache = memoize.IdentityCache()
+        request = {"url": "/get"}
+        self.assertIsNone(identity_cache.get(request))
+        identity_cache.set(request, "template")
+        self.assertEqual(identity_cache.get(request), "template")
+        # cached by identity instead of equality
+        self.assertEqual(identity_cache.get({"url": "/get"}, "missed"), "missed")
+
+    def test_lru_eviction(self):
+        identity_cache = memoize.IdentityCache(maxsize=2)
+        requests = [{"url": "/get"}, {"url": "/post"}, {"url": "/put"}]
+        identity_cache.set(requests[0], 0)
+        identity_cache.set(requests[1], 1)
+        # requests[0] is most recently used, requests[1] is evicted
+        identity_cache.get(requests[0])
+        identity_cache.set(requests[2], 2)
+        self.assertEqual(len(identity_cache), 2)
+        self.assertIsNone(identity_cache.get(requests[1]))
+        self.assertEqual(identity_cache.get(requests[0]), 0)
+        self.assertEqual(identity_cache.get(requests[2]), 2)
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from httprunner import HttpRunner, exception, memwatch
+
+
+class TestMemwatch(unittest.TestCase):
+
+    def tearDown(self):
+        memwatch.disable()
+
+    def test_parse_size(self):
+        self.assertEqual(memwatch.parse_size(512), 512 * 1024 * 1024)
+        self.assertEqual(memwatch.parse_size("512MB"), 512 * 1024 * 1024)
+        self.assertEqual(memwatch.parse_size("2G"), 2 * 1024 * 1024 * 1024)
+        self.assertEqual(memwatch.parse_size("800kb"), 800 * 1024)
+
+        for size in ["2TB", "MB", 0, None]:
+            with self.assertRaises(exception.ParamsError):
+                memwatch.parse_size(size)
+
+    def test_get_rss(self):
+        self.assertGreater(memwatch.get_rss(), 1024 * 1024)
+
+    def test_track_step(self):
+        monitor = memwatch.enable(interval=0.01)
+        retained = []
+        for _ in range(3):
+            with memwatch.track_step("testset", "allocate"):
+                retained.append(bytearray(1024 * 1024))
+
+        with memwatch.track_step("testset", "noop"):
+            pass
+
+        memwatch.disable()
+        report = monitor.get_report()
+        self.assertFalse(report["budget_exceeded"])
+        self.assertGreaterEqual(len(report["samples"]), 2)
+        self.assertGreater(report["peak_rss_mb"], 0)
+
+        top_step = report["top_steps"][0]
+        self.assertEqual(top_step["name"], "allocate")
+        self.assertEqual(top_step["runs"], 3)
+        self.assertGreaterEqual(top_step["growth_kb"], 3 * 1024)
+        self.assertTrue(any(site["growth_kb"] >= 3 * 1024 for site in report["top_sites"]))
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            report_path = os.path.join(temp_dir, "memory.json")
+            memwatch.dump_report(report, report_path)
+            self.assertTrue(os.path.isfile(report_path))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_budget_exceeded(self):
+        memwatch.enable(interval=0.01, budget="1KB")
+        self.assertTrue(memwatch.budget_exceeded())
+        with self.assertRaises(exception.MemoryBudgetExceeded):
+            with memwatch.track_step("testset", "step"):
+                pass
+
+        testset = {
+            "name": "memory budget",
+            "testcases": [
+                {
+                    "name": "get",
+                    "request": {"url": "http://127.0.0.1:3458/get", "method": "GET"},
+                    "times": 3
+                },
+                {
+                    "name": "post",
+                    "request": {"url": "http://127.0.0.1:3458/post", "method": "POST"}
+                }
+            ]
+        }
+        summary = HttpRunner().run(testset).summary
+        self.assertFalse(summary["success"])
+        self.assertEqual(summary["stat"]["testsRun"], 1)
+        self.assertEqual(summary["stat"]["errors"], 1)
+        self.assertIn("memory budget exceeded", summary["records"][0]["attachment"])
+        self.assertTrue(summary["memory"]["budget_exceeded"])
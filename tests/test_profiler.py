@@ -0,0 +1,67 @@
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+
+from httprunner import profiler
+
+
+@profiler.timed("sleep")
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        profiler.reset()
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+        shutil.rmtree(self.temp_dir)
+
+    def test_disabled(self):
+        self.assertEqual(sleep(0), 0)
+        self.assertEqual(profiler.get_stats(), {})
+
+    def test_timed(self):
+        profiler.enable()
+        for seconds in [0.01, 0.02, 0.03]:
+            sleep(seconds)
+        profiler.disable()
+        sleep(0)
+
+        stats = profiler.get_stats()["sleep"]
+        self.assertEqual(stats["count"], 3)
+        self.assertGreaterEqual(stats["total"], 0.06)
+        self.assertGreaterEqual(stats["p50"], 0.02)
+        self.assertLess(stats["p50"], 0.03)
+        self.assertEqual(stats["p99"], stats["max"])
+
+    def test_get_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(profiler.get_percentile(values, 50), 50)
+        self.assertEqual(profiler.get_percentile(values, 90), 90)
+        self.assertEqual(profiler.get_percentile([1], 99), 1)
+
+    def test_dump_pstats_and_collapsed_stacks(self):
+        pstats_path = os.path.join(self.temp_dir, "hrun.pstats")
+        collapsed_path = os.path.join(self.temp_dir, "hrun.collapsed")
+        profiler.enable(pstats_path, collapsed_path)
+        sleep(0.1)
+        profiler.disable()
+
+        function_names = [key[2] for key in pstats.Stats(pstats_path).stats]
+        self.assertIn("sleep", function_names)
+
+        with open(collapsed_path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertTrue(any("sleep (test_profiler.py:" in line for line in lines))
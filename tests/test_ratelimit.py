@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+
+from httprunner import exception, ratelimit, runner
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def tearDown(self):
+        ratelimit.reset()
+
+    def test_token_bucket(self):
+        bucket = ratelimit.TokenBucket(rate=100, burst=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        # tokens are reserved in order
+        self.assertAlmostEqual(bucket.reserve(), 0.01, delta=0.002)
+        self.assertAlmostEqual(bucket.reserve(), 0.02, delta=0.002)
+
+    def test_token_bucket_rate(self):
+        bucket = ratelimit.TokenBucket(rate=200, burst=1)
+        start_at = time.time()
+        for _ in range(21):
+            bucket.acquire()
+        self.assertGreaterEqual(time.time() - start_at, 0.09)
+
+    def test_max_in_flight(self):
+        rate_limiter = ratelimit.RateLimiter(max_in_flight=2)
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def request():
+            rate_limiter.acquire()
+            with lock:
+                in_flight.append(1)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+            rate_limiter.release()
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max(max_in_flight), 2)
+
+    def test_get_rate_limiter(self):
+        config = {"rate": 10}
+        rate_limiter = ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/a", "a", config)
+        self.assertIs(
+            ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/b", "b", config),
+            rate_limiter
+        )
+        self.assertIsNot(
+            ratelimit.get_rate_limiter("http://127.0.0.1:3458/get", None, config),
+            rate_limiter
+        )
+
+        config = {"rate": 10, "per_group": True}
+        self.assertIsNot(
+            ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/a", "a", config),
+            ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/b", "b", config)
+        )
+
+        with self.assertRaises(exception.ParamsError):
+            ratelimit.get_rate_limiter("http://127.0.0.1:8000", None, {"unknown": 1})
+
+        # limiters of different configs are not shared
+        rate_limiter = ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/a", None, {"rate": 20})
+        self.assertIsNot(
+            ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/b", None, {"rate": 5}),
+            rate_limiter
+        )
+        self.assertIs(
+            ratelimit.get_rate_limiter("http://127.0.0.1:5000/api/b", None, {"rate": 20}),
+            rate_limiter
+        )
+
+        ratelimit.reset()
+        self.assertEqual(ratelimit.rate_limiters, {})
+
+    def test_runner_rate_limit(self):
+        default_rate_limit = {"rate": 20}
+        test_runner = runner.Runner({}, default_rate_limit=default_rate_limit)
+        self.assertEqual(test_runner._get_session_kwargs({})["rate_limit"], default_rate_limit)
+
+        # rate limit in testset config overrides the default one
+        test_runner = runner.Runner({"rate_limit": {"rate": 5}}, default_rate_limit=default_rate_limit)
+        self.assertEqual(test_runner._get_session_kwargs({})["rate_limit"], {"rate": 5})
+
+        # default rate limit is scoped to runners it is passed to
+        self.assertNotIn("rate_limit", runner.Runner({})._get_session_kwargs({}))
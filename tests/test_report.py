@@ -0,0 +1,164 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from httprunner import report
+from requests.structures import CaseInsensitiveDict
+
+
+class TestReport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.bodies_dir = os.path.join(self.temp_dir, "bodies")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def gen_meta_data(self, body, content_type="application/json"):
+        return {
+            "request_headers": CaseInsensitiveDict({"Content-Type": content_type}),
+            "request_body": body,
+            "response_headers": CaseInsensitiveDict(),
+            "response_body": b""
+        }
+
+    def test_get_file_extension(self):
+        self.assertEqual(report.get_file_extension("image/png"), ".png")
+        self.assertEqual(report.get_file_extension("application/json; charset=utf-8"), ".json")
+        self.assertEqual(report.get_file_extension("unknown/unknown"), ".txt")
+
+    def test_stringify_body_without_limit(self):
+        meta_data = self.gen_meta_data({"data": "x" * 100})
+        report.stringify_body(meta_data, "request")
+        self.assertIn("x" * 100, meta_data["request_body"])
+        self.assertNotIn("request_body_link", meta_data)
+
+    def test_stringify_body_truncated(self):
+        body_store = report.BodyStore(self.bodies_dir)
+        meta_data = self.gen_meta_data({"data": "x" * 100})
+        report.stringify_body(meta_data, "request", 10, body_store)
+        self.assertEqual(len(meta_data["request_body"]), 10)
+
+        link = meta_data["request_body_link"]
+        self.assertTrue(link.startswith("bodies/") and link.endswith(".json"))
+        with open(os.path.join(self.temp_dir, link), "rb") as f:
+            content = f.read()
+        self.assertEqual(len(content), meta_data["request_body_size"])
+        self.assertIn(b"x" * 100, content)
+
+        # short body is kept as is
+        meta_data = self.gen_meta_data(b"abc", "text/plain")
+        report.stringify_body(meta_data, "request", 10, body_store)
+        self.assertEqual(meta_data["request_body"], "abc")
+        self.assertNotIn("request_body_link", meta_data)
+
+    def test_stringify_body_deduplicated_and_compressed(self):
+        body_store = report.BodyStore(self.bodies_dir, compress=True)
+        links = []
+        for _ in range(2):
+            meta_data = self.gen_meta_data(b"y" * 100, "text/plain")
+            report.stringify_body(meta_data, "request", 10, body_store)
+            links.append(meta_data["request_body_link"])
+
+        self.assertEqual(links[0], links[1])
+        self.assertTrue(links[0].endswith(".txt.gz"))
+        self.assertEqual(len(os.listdir(self.bodies_dir)), 1)
+        with gzip.open(os.path.join(self.temp_dir, links[0])) as f:
+            self.assertEqual(f.read(), b"y" * 100)
+
+        # images are not compressed, as they are loaded by browser as img src
+        meta_data = self.gen_meta_data(b"\x89PNG", "image/png")
+        report.stringify_body(meta_data, "request", 10, body_store)
+        self.assertTrue(meta_data["request_body"].endswith(".png"))
+        with open(os.path.join(self.temp_dir, meta_data["request_body"]), "rb") as f:
+            self.assertEqual(f.read(), b"\x89PNG")
+
+    def test_stringify_body_truncated_by_encoded_length(self):
+        body_store = report.BodyStore(self.bodies_dir)
+        # 6 characters, 18 bytes in utf-8
+        meta_data = self.gen_meta_data(u"\u4e2d" * 6, "text/plain")
+        report.stringify_body(meta_data, "request", 10, body_store)
+        self.assertEqual(meta_data["request_body"], u"\u4e2d" * 3)
+        self.assertEqual(meta_data["request_body_size"], 18)
+
+    def test_stringify_body_not_sent(self):
+        meta_data = {"phases": {"prepare": 1.2}}
+        report.stringify_body(meta_data, "request")
+        report.stringify_body(meta_data, "response")
+        self.assertEqual(meta_data, {"phases": {"prepare": 1.2}})
+
+    def test_stringify_image_body(self):
+        meta_data = self.gen_meta_data(b"\x89PNG", "image/png")
+        report.stringify_body(meta_data, "request")
+        self.assertTrue(meta_data["request_body"].startswith("data:image/png;base64,"))
+
+        meta_data = self.gen_meta_data(b"\x89PNG", "image/png")
+        report.stringify_body(meta_data, "request", 10, report.BodyStore(self.bodies_dir))
+        self.assertTrue(meta_data["request_body"].endswith(".png"))
+        self.assertEqual(meta_data["response_data_type"], "image")
+
+    def test_render_html_report_with_cached_template(self):
+        template_path = os.path.join(self.temp_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write("{% for record in records %}{{ record.name }};{% endfor %}")
+
+        summary = {
+            "time": {"start_at": datetime.now()},
+            "records": [
+                {"name": "test {}".format(index), "meta_data": self.gen_meta_data(b"")}
+                for index in range(3)
+            ]
+        }
+        current_dir = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            report_path = report.render_html_report(summary, "cached", template_path)
+            with open(report_path) as f:
+                self.assertEqual(f.read(), "test 0;test 1;test 2;")
+
+            template = report.get_template(template_path)
+            self.assertIs(report.get_template(template_path), template)
+
+            # modified template is reloaded
+            with open(template_path, "w") as f:
+                f.write("{{ records | length }}")
+            os.utime(template_path, (time.time() + 10, time.time() + 10))
+            report_path = report.render_html_report(summary, "cached", template_path)
+            with open(report_path) as f:
+                self.assertEqual(f.read(), "3")
+        finally:
+            os.chdir(current_dir)
+
+    def test_test_record(self):
+        record = report.TestRecord("get token", "success", "", {"status_code": 200})
+        self.assertEqual(record["status"], "success")
+        self.assertEqual(record.get("testset"), "")
+        self.assertIn("meta_data", record)
+        self.assertRaises(KeyError, lambda: record["unknown"])
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_compact_meta_data(self):
+        body_spool = report.BodySpool(10)
+        meta_data = self.gen_meta_data({"data": "x" * 100})
+        meta_data["response_body"] = b"abc"
+        compacted = report.compact_meta_data(meta_data, body_spool)
+        self.assertIsInstance(compacted["request_headers"], report.Headers)
+        self.assertEqual(compacted["request_headers"].get("content-type"), "application/json")
+        self.assertEqual(dict(compacted["request_headers"].items()), {"Content-Type": "application/json"})
+        self.assertIsInstance(compacted["request_body"], report.BodyRef)
+        self.assertEqual(compacted["request_body"].load(), {"data": "x" * 100})
+        self.assertEqual(compacted["response_body"], b"abc")
+
+        report.stringify_body(compacted, "request")
+        self.assertIn("x" * 100, compacted["request_body"])
+
+        spool_dir_path = body_spool.dir_path
+        self.assertIn(spool_dir_path, report.spool_dir_paths)
+        body_spool.remove()
+        self.assertFalse(os.path.exists(spool_dir_path))
+        self.assertNotIn(spool_dir_path, report.spool_dir_paths)
@@ -0,0 +1,84 @@
+import time
+import unittest
+
+from httprunner import exception
+from httprunner.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from requests import Response
+from requests.exceptions import ConnectionError, ReadTimeout
+
+
+def gen_response(status_code=200, error=None):
+    response = Response()
+    response.status_code = status_code
+    if error is not None:
+        response.error = error
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_from_config(self):
+        self.assertIsNone(RetryPolicy.from_config(None))
+        self.assertIsNone(RetryPolicy.from_config(0))
+        self.assertEqual(RetryPolicy.from_config(2).max_retries, 2)
+
+        retry_policy = RetryPolicy.from_config({"max_retries": 1, "status_codes": [500]})
+        self.assertEqual(retry_policy.status_codes, set([500]))
+
+        with self.assertRaises(exception.ParamsError):
+            RetryPolicy.from_config({"unknown": 1})
+        with self.assertRaises(exception.ParamsError):
+            RetryPolicy.from_config({"exceptions": ["KeyError"]})
+
+    def test_should_retry(self):
+        retry_policy = RetryPolicy(max_retries=2)
+        self.assertTrue(retry_policy.should_retry("GET", gen_response(503), 0))
+        self.assertFalse(retry_policy.should_retry("GET", gen_response(503), 2))
+        self.assertFalse(retry_policy.should_retry("GET", gen_response(500), 0))
+        self.assertFalse(retry_policy.should_retry("POST", gen_response(503), 0))
+        self.assertTrue(retry_policy.should_retry("get", gen_response(0, ConnectionError()), 0))
+        # ReadTimeout is subclass of Timeout
+        self.assertTrue(retry_policy.should_retry("GET", gen_response(0, ReadTimeout()), 0))
+        self.assertFalse(retry_policy.should_retry("GET", gen_response(0, CircuitOpenError()), 0))
+
+        retry_policy = RetryPolicy(idempotent_only=False, exceptions=[])
+        self.assertTrue(retry_policy.should_retry("POST", gen_response(502), 0))
+        self.assertFalse(retry_policy.should_retry("POST", gen_response(0, ConnectionError()), 0))
+
+    def test_get_backoff(self):
+        retry_policy = RetryPolicy(backoff_factor=0.5, backoff_max=1.5, jitter=False)
+        self.assertEqual(
+            [retry_policy.get_backoff(retries) for retries in range(1, 5)],
+            [0.5, 1, 1.5, 1.5]
+        )
+
+        retry_policy.jitter = True
+        for _ in range(10):
+            self.assertTrue(0 <= retry_policy.get_backoff(2) <= 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_circuit_breaker(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        circuit_breaker.record_failure()
+        self.assertTrue(circuit_breaker.allow_request())
+        circuit_breaker.record_failure()
+        self.assertEqual(circuit_breaker.state, "open")
+        self.assertFalse(circuit_breaker.allow_request())
+
+        time.sleep(0.06)
+        self.assertEqual(circuit_breaker.state, "half_open")
+        # only one trial request in half open state
+        self.assertTrue(circuit_breaker.allow_request())
+        self.assertFalse(circuit_breaker.allow_request())
+
+        # trial failed, open again
+        circuit_breaker.record_failure()
+        self.assertEqual(circuit_breaker.state, "open")
+
+        time.sleep(0.06)
+        self.assertTrue(circuit_breaker.allow_request())
+        circuit_breaker.record_success()
+        self.assertEqual(circuit_breaker.state, "closed")
+        self.assertTrue(circuit_breaker.allow_request())
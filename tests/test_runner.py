@@ -152,6 +152,89 @@ class TestRunner(ApiServerUnittest):
         test_runner = runner.Runner(config_dict)
         test_runner.run_test(test)
 
+    def test_run_testcase_with_callable_hooks_repeatedly(self):
+        requests = []
+        responses = []
+        test = {
+            "name": "callable hooks",
+            "request": {
+                "url": "http://127.0.0.1:3458/anything",
+                "method": "GET"
+            },
+            "setup_hooks": [
+                requests.append,
+                "${modify_headers_os_platform($request, android)}"
+            ],
+            "teardown_hooks": [responses.append],
+            "validate": [
+                {"check": "content.headers.Os-Platform", "expect": "android"}
+            ]
+        }
+        test_runner = runner.Runner({
+            "path": os.path.join(os.getcwd(), __file__),
+            "request": {"headers": {"os_platform": "ios"}}
+        })
+        for _ in range(3):
+            test_runner.run_test(test)
+
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(responses[0].status_code, 200)
+        # hook actions are compiled once, and testcase is not modified
+        self.assertEqual(len(test["setup_hooks"]), 2)
+        self.assertEqual(len(test_runner.hook_pipelines), 2)
+
+    def test_run_static_testcase_repeatedly(self):
+        test_runner = runner.Runner({
+            "request": {
+                "base_url": "http://127.0.0.1:3458",
+                "headers": {"Content-Type": "application/json"}
+            }
+        })
+        static_test = {
+            "name": "static post",
+            "request": {
+                "url": "/post",
+                "method": "POST",
+                "headers": {"os_platform": "ios"},
+                "data": {"a": 1}
+            },
+            "validate": [
+                {"eq": ["status_code", 200]},
+                {"eq": ["content.json.a", 1]},
+                {"eq": ["content.headers.Os-Platform", "ios"]}
+            ]
+        }
+        get_cookies_test = {
+            "name": "static get cookies",
+            "request": {"url": "/cookies", "method": "GET"},
+            "extract": [{"cookies": "content.cookies"}]
+        }
+        set_cookie_test = {
+            "name": "set cookie",
+            "variables": [{"value": "${gen_random_string(8)}"}],
+            "request": {"url": "/cookies/set?token=$value", "method": "GET"},
+            "extract": [{"token": "content.cookies.token"}]
+        }
+
+        for _ in range(3):
+            test_runner.run_test(static_test)
+            meta_data = test_runner.http_client_session.meta_data
+            self.assertEqual(meta_data["request_body"], b'{"a": 1}')
+            self.assertEqual(meta_data["request_headers"]["os_platform"], "ios")
+            self.assertIn("request", meta_data["phases"])
+
+        self.assertEqual(len(test_runner.static_requests), 1)
+
+        # cookies of session are applied each time static request is sent
+        for _ in range(2):
+            test_runner.run_test(set_cookie_test)
+            test_runner.run_test(get_cookies_test)
+            variables_mapping = test_runner.context.testset_shared_variables_mapping
+            self.assertEqual(variables_mapping["cookies"], {"token": variables_mapping["token"]})
+
+        # request referencing variables is evaluated each time
+        self.assertEqual(len(test_runner.static_requests), 2)
+
     def test_run_httprunner_with_hooks(self):
         testcase_file_path = os.path.join(
             os.getcwd(), 'tests/httpbin/hooks.yml')
@@ -196,6 +279,88 @@ class TestRunner(ApiServerUnittest):
         # check if teardown function executed
         self.assertLess(end_time - start_time, 0.5)
 
+    def test_run_test_record_phases(self):
+        test = {
+            "name": "get token",
+            "request": {
+                "url": "http://127.0.0.1:5000/api/get-token",
+                "method": "POST",
+                "headers": {
+                    "content-type": "application/json",
+                    "user_agent": "iOS/10.3",
+                    "device_sn": "HZfFBh6tU59EdXJ",
+                    "os_platform": "ios",
+                    "app_version": "2.8.6"
+                },
+                "json": {
+                    "sign": "f1219719911caae89ccc301679857ebfda115ca2"
+                }
+            },
+            "extract": [
+                {"token": "content.token"}
+            ],
+            "validate": [
+                {"check": "status_code", "expect": 201}
+            ]
+        }
+        self.test_runner.init_config({}, "testset")
+
+        with self.assertRaises(exception.ValidationError):
+            self.test_runner.run_test(test)
+
+        phases = self.test_runner.http_client_session.meta_data["phases"]
+        self.assertEqual(
+            list(phases.keys()),
+            ["prepare", "setup_hooks", "request", "teardown_hooks", "extract", "validate"]
+        )
+        for elapsed_ms in phases.values():
+            self.assertGreaterEqual(elapsed_ms, 0)
+
+    def test_run_test_record_phases_before_request(self):
+        def failing_hook(request):
+            time.sleep(0.01)
+            raise RuntimeError("setup hook failed")
+
+        test = {
+            "name": "setup hook fails",
+            "request": {"url": "http://127.0.0.1:3458/get", "method": "GET"},
+            "setup_hooks": [failing_hook]
+        }
+        self.test_runner.init_config({}, "testset")
+        self.test_runner.run_test({
+            "name": "previous request",
+            "request": {"url": "http://127.0.0.1:3458/get", "method": "GET"}
+        })
+
+        with self.assertRaises(RuntimeError):
+            self.test_runner.run_test(test)
+
+        # meta data of previous request is not reported for the failed testcase
+        meta_data = self.test_runner.http_client_session.meta_data
+        self.assertEqual(list(meta_data.keys()), ["phases"])
+        self.assertEqual(list(meta_data["phases"].keys()), ["prepare", "setup_hooks"])
+        self.assertGreaterEqual(meta_data["phases"]["setup_hooks"], 10)
+
+    def test_run_test_with_retry(self):
+        test = {
+            "name": "get unavailable service",
+            "request": {
+                "url": "http://127.0.0.1:3458/status/503",
+                "method": "GET"
+            },
+            "validate": [
+                {"check": "status_code", "expect": 503}
+            ]
+        }
+        test_runner = runner.Runner({"retry": {"max_retries": 2, "backoff_factor": 0.01}})
+        test_runner.run_test(test)
+        self.assertEqual(test_runner.http_client_session.meta_data["retries"], 2)
+
+        # retry in testcase overrides the one in testset config
+        test["retry"] = 0
+        test_runner.run_test(test)
+        self.assertNotIn("retries", test_runner.http_client_session.meta_data)
+
     def test_run_testset_with_teardown_hooks_fail(self):
         test = {
             "name": "get token",
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from httprunner import shard
+from httprunner.exception import ParamsError
+from httprunner.history import TestHistory, get_testset_key
+
+
+class TestShard(unittest.TestCase):
+
+    def setUp(self):
+        self.testsets = [
+            {
+                "name": "testset {}".format(index),
+                "config": {"path": "tests/testcases/testset_{}.yml".format(index)},
+                "testcases": []
+            }
+            for index in range(5)
+        ]
+        self.temp_dir = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.temp_dir, "history.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_testset_key(self):
+        testset = {
+            "name": "demo",
+            "config": {"path": os.path.join(os.getcwd(), "tests", "data", "demo.yml")},
+            "testcases": []
+        }
+        self.assertEqual(get_testset_key(testset), "tests/data/demo.yml")
+        self.assertEqual(get_testset_key({"name": "demo", "testcases": []}), "demo")
+
+    def test_partition(self):
+        self.assertEqual(
+            shard.partition([1, 1, 1, 1, 1], 2),
+            [[0, 2, 4], [1, 3]]
+        )
+        self.assertEqual(
+            shard.partition([5, 3, 2, 2], 2),
+            [[0, 3], [1, 2]]
+        )
+        self.assertEqual(shard.partition([1], 3), [[0], [], []])
+
+    def test_shard_invalid(self):
+        with self.assertRaises(ParamsError):
+            shard.Shard(2, 2)
+        with self.assertRaises(ParamsError):
+            shard.Shard(0, 0)
+
+    def test_shard_select_round_robin(self):
+        selected = []
+        for shard_index in range(2):
+            # input order should not affect partition
+            testsets = self.testsets if shard_index else list(reversed(self.testsets))
+            selected.append([
+                testset["name"]
+                for testset in shard.Shard(shard_index, 2).select(testsets)
+            ])
+
+        self.assertEqual(selected[0], ["testset 0", "testset 2", "testset 4"])
+        self.assertEqual(selected[1], ["testset 1", "testset 3"])
+
+    def test_shard_select_with_history(self):
+        history = TestHistory(self.history_path)
+        history.record_testset("tests/testcases/testset_0.yml", 100)
+        history.record_testset("tests/testcases/testset_1.yml", 10)
+        history.record_testset("tests/testcases/testset_2.yml", 10)
+        history.record_testset("tests/testcases/testset_3.yml", 10)
+        history.dump()
+
+        history = TestHistory(self.history_path)
+        selected = shard.Shard(0, 2, history=history).select(self.testsets)
+        self.assertEqual([testset["name"] for testset in selected], ["testset 0"])
+        selected = shard.Shard(1, 2, history=history).select(self.testsets)
+        self.assertEqual(len(selected), 4)
+
+    def test_split_testset_by_parameters(self):
+        testset = {
+            "name": "demo",
+            "config": {
+                "path": "tests/data/demo_parameters.yml",
+                "parameters": [
+                    {"user_agent": ["iOS/10.1", "iOS/10.2"]},
+                    {"username-password": [["test1", "111111"], ["test2", "222222"]]}
+                ]
+            },
+            "testcases": []
+        }
+        testsets = shard.split_testset_by_parameters(testset)
+        self.assertEqual(len(testsets), 4)
+        self.assertEqual(
+            testsets[0]["config"]["parameters"],
+            [{"password-user_agent-username": [["111111", "iOS/10.1", "test1"]]}]
+        )
+        self.assertEqual(len(testset["config"]["parameters"]), 2)
+
+        selected = shard.Shard(1, 3, by_parameters=True).select([testset])
+        self.assertEqual(len(selected), 1)
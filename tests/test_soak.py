@@ -0,0 +1,114 @@
+import time
+import unittest
+
+from httprunner import HttpRunner, exception, soak
+from tests.base import ApiServerUnittest
+
+
+class TestSoak(unittest.TestCase):
+
+    def test_parse_duration(self):
+        self.assertEqual(soak.parse_duration(90), 90)
+        self.assertEqual(soak.parse_duration("90"), 90)
+        self.assertEqual(soak.parse_duration("30s"), 30)
+        self.assertEqual(soak.parse_duration("10m"), 600)
+        self.assertEqual(soak.parse_duration("1h30m"), 5400)
+        self.assertEqual(soak.parse_duration("0.5d"), 43200)
+
+        for duration in ["2x", "h", "", 0, True, "1.5.5"]:
+            with self.assertRaises(exception.ParamsError):
+                soak.parse_duration(duration)
+
+        # invalid long duration is rejected without catastrophic backtracking
+        start_at = time.time()
+        with self.assertRaises(exception.ParamsError):
+            soak.parse_duration("1" * 1000 + "x")
+        self.assertLess(time.time() - start_at, 0.1)
+
+    def test_soak_from_config(self):
+        self.assertIsNone(soak.Soak.from_config({}))
+        testset_soak = soak.Soak.from_config({"duration": "1m", "iterations": 3})
+        self.assertEqual(testset_soak.duration, 60)
+        self.assertTrue(testset_soak.is_done(0, 3))
+        self.assertFalse(testset_soak.is_done(1e12, 2))
+
+        with self.assertRaises(exception.ParamsError):
+            soak.Soak()
+
+    def test_latency_histogram(self):
+        histogram = soak.LatencyHistogram()
+        self.assertEqual(histogram.get_stat(), {"count": 0})
+        for value in range(1, 1001):
+            histogram.record(value)
+
+        stat = histogram.get_stat()
+        self.assertEqual(stat["count"], 1000)
+        self.assertEqual(stat["min"], 1)
+        self.assertEqual(stat["max"], 1000)
+        self.assertEqual(stat["mean"], 500.5)
+        self.assertAlmostEqual(stat["p50"], 500, delta=500 * 0.05)
+        self.assertAlmostEqual(stat["p99"], 990, delta=990 * 0.05)
+        self.assertLess(len(histogram.buckets), 200)
+
+        other = soak.LatencyHistogram()
+        other.record(5000)
+        histogram.merge(other)
+        self.assertEqual(histogram.count, 1001)
+        self.assertEqual(histogram.max, 5000)
+
+
+class TestSoakRun(ApiServerUnittest):
+
+    def setUp(self):
+        self.testset = {
+            "name": "soak testset",
+            "config": {
+                "request": {"base_url": "http://127.0.0.1:3458"}
+            },
+            "testcases": [
+                {
+                    "name": "get",
+                    "request": {"url": "/get", "method": "GET"},
+                    "validate": [{"eq": ["status_code", 200]}],
+                    "times": 2
+                },
+                {
+                    "name": "status 500",
+                    "request": {"url": "/status/500", "method": "GET"},
+                    "validate": [{"eq": ["status_code", 200]}]
+                }
+            ]
+        }
+
+    def test_run_iterations(self):
+        summary = HttpRunner(iterations=5).run(self.testset).summary
+        self.assertFalse(summary["success"])
+        self.assertEqual(summary["stat"]["testsRun"], 15)
+        self.assertEqual(summary["stat"]["errors"], 5)
+        self.assertEqual(summary["soak"]["iterations"], 5)
+
+        # only failed runs are recorded
+        self.assertEqual(len(summary["records"]), 5)
+        testcases = {
+            testcase["name"]: testcase
+            for testcase in summary["soak"]["testcases"]
+        }
+        self.assertEqual(testcases["get"]["runs"], 10)
+        self.assertEqual(testcases["get"]["successes"], 10)
+        self.assertEqual(testcases["get"]["latency"]["count"], 10)
+        self.assertEqual(testcases["status 500"]["errors"], 5)
+
+    def test_run_with_config_duration(self):
+        self.testset["config"]["duration"] = 0.5
+        self.testset["testcases"].pop()
+        summary = HttpRunner().run(self.testset).summary
+        self.assertTrue(summary["success"])
+        self.assertGreaterEqual(summary["soak"]["iterations"], 1)
+        self.assertEqual(summary["stat"]["testsRun"], summary["soak"]["iterations"] * 2)
+        self.assertEqual(summary["records"], [])
+
+    def test_run_without_soak(self):
+        summary = HttpRunner().run(self.testset).summary
+        self.assertNotIn("soak", summary)
+        self.assertEqual(summary["stat"]["testsRun"], 3)
+        self.assertEqual(len(summary["records"]), 3)
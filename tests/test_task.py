@@ -1,6 +1,7 @@
 import os
 
 from httprunner import task
+from httprunner.client import HttpSession
 from httprunner.testcase import TestcaseLoader
 from tests.base import ApiServerUnittest
 
@@ -78,3 +79,32 @@ class TestTask(ApiServerUnittest):
         for suite in task_suite:
             for testcase in suite:
                 self.assertIsInstance(testcase, task.TestCase)
+
+    def test_locust_task_run(self):
+        requested_urls = []
+
+        class LocustClient(HttpSession):
+            def request(self, method, url, name=None, **kwargs):
+                requested_urls.append(url)
+                return super(LocustClient, self).request(method, url, name, **kwargs)
+
+        testsets = [
+            {
+                "name": "repeated testcase",
+                "config": {"request": {"base_url": "http://127.0.0.1:3458"}},
+                "testcases": [
+                    {"name": "get", "request": {"url": "/get", "method": "GET"}, "times": 3}
+                ]
+            },
+            {
+                "name": "soak testset",
+                "config": {"request": {"base_url": "http://127.0.0.1:3458"}, "iterations": 5},
+                "testcases": [
+                    {"name": "post", "request": {"url": "/post", "method": "POST"}}
+                ]
+            }
+        ]
+        locust_task = task.LocustTask(testsets, LocustClient("http://127.0.0.1:3458"))
+        locust_task.run()
+        # each locust task runs testsets once, repeating is left to locust
+        self.assertEqual(requested_urls, ["/get", "/get", "/get", "/post"])
@@ -57,6 +57,19 @@ class TestTestcaseLoader(unittest.TestCase):
         self.assertEqual(block["function_meta"]["func_name"], "get_user")
         self.assertEqual(block["function_meta"]["args"], ['$uid', '$token'])
 
+    def test_get_block_by_name_cached(self):
+        TestcaseLoader.load_test_dependencies()
+        block = TestcaseLoader._get_block_by_name("get_user(1000, $token)", "api")
+        self.assertEqual(block["request"]["url"], "/api/users/1000")
+        self.assertIs(
+            TestcaseLoader._get_block_by_name("get_user(1000, $token)", "api"),
+            block
+        )
+        self.assertEqual(
+            TestcaseLoader._get_block_by_name("get_user(1001, $token)", "api")["request"]["url"],
+            "/api/users/1001"
+        )
+
     def test_get_block_by_name_args_mismatch(self):
         TestcaseLoader.load_test_dependencies()
         ref_call = "get_user($uid, $token, $var)"
@@ -604,6 +617,30 @@ class TestcaseParserUnittest(unittest.TestCase):
         content = testcase_parser._eval_content_functions("/api/${gen_md5(abc)}")
         self.assertEqual(content, "/api/900150983cd24fb0d6963f7d28e17f72")
 
+    def test_resolve_function(self):
+        testset_path = "tests/data/demo_testset_hardcode.yml"
+        try:
+            self.assertIs(testcase.resolve_function(None, "len"), len)
+            self.assertIsNone(testcase.resolve_function(None, "gen_md5"))
+            # functions of testcase module are not resolvable as eval() did
+            self.assertIsNone(testcase.resolve_function(None, "parse_function"))
+
+            gen_md5 = testcase.resolve_function(testset_path, "gen_md5")
+            self.assertEqual(gen_md5("abc"), "900150983cd24fb0d6963f7d28e17f72")
+            self.assertIs(testcase.resolve_function(testset_path, "gen_md5"), gen_md5)
+
+            # not found functions are cached as well
+            self.assertIsNone(testcase.resolve_function(testset_path, "not_exist"))
+            self.assertEqual(
+                testcase.resolved_functions_mapping[testset_path],
+                {"gen_md5": gen_md5, "not_exist": None}
+            )
+
+            TestcaseLoader.invalidate_cache(testset_path)
+            self.assertEqual(testcase.resolved_functions_mapping, {})
+        finally:
+            testcase.clear_resolved_functions()
+
     def test_parse_content_with_bindings_testcase(self):
         variables = {
             "uid": "1000",
@@ -678,6 +715,20 @@ class TestcaseParserUnittest(unittest.TestCase):
         self.assertFalse(result["request"]["data"]["false"])
         self.assertEqual("", result["request"]["data"]["empty_str"])
 
+    def test_substitute_variables_with_mapping_single_pass(self):
+        content = {
+            "url": "/api/users/$uid/$uid_new",
+            "headers": {"token": "$token"}
+        }
+        mapping = {
+            "$uid": "$token",
+            "$uid_new": 1001,
+            "$token": 1000
+        }
+        result = testcase.substitute_variables_with_mapping(content, mapping)
+        self.assertEqual(result["url"], "/api/users/$token/1001")
+        self.assertEqual(result["headers"]["token"], 1000)
+
 
     def test_parse_validator(self):
         validator = {"check": "status_code", "comparator": "eq", "expect": 201}
@@ -731,6 +782,20 @@ class TestcaseParserUnittest(unittest.TestCase):
         self.assertIn({'check': {'b': 1}, 'expect': 201, 'comparator': 'eq'}, merged_validators)
         self.assertNotIn({'check': {'b': 1}, 'expect': 200, 'comparator': 'eq'}, merged_validators)
 
+    def test_merge_validator_with_mapping(self):
+        def_validators = [{'eq': ['v1', 200]}, {'len_eq': ['s2', 16]}]
+        def_validators_mapping = testcase._get_validators_mapping(def_validators)
+        current_validators = [{'eq': ['v1', 201]}]
+
+        merged_validators = testcase._merge_validator(
+            def_validators, current_validators, def_validators_mapping)
+        self.assertIn({"check": "v1", "expect": 201, "comparator": "eq"}, merged_validators)
+        self.assertIn({"check": "s2", "expect": 16, "comparator": "len_eq"}, merged_validators)
+        self.assertEqual(
+            def_validators_mapping,
+            testcase._get_validators_mapping(def_validators)
+        )
+
     def test_merge_extractor(self):
         api_extrators = [{"var1": "val1"}, {"var2": "val2"}]
         current_extractors = [{"var1": "val111"}, {"var3": "val3"}]
@@ -777,3 +842,37 @@ class TestcaseParserUnittest(unittest.TestCase):
             }
         ]
         self.assertTrue(data_structure)
+
+    def test_get_referenced_variables(self):
+        content = {
+            "url": "/api/users/$uid",
+            "headers": {"token": "$token"},
+            "json": ["${gen_md5($device_sn, abc)}", 123, None]
+        }
+        self.assertEqual(
+            testcase.get_referenced_variables(content),
+            {"uid", "token", "device_sn"}
+        )
+
+    def test_get_testcases_dependencies(self):
+        testcases = [
+            {"name": "login", "extract": [{"token": "content.token"}]},
+            {"name": "get user", "request": {"headers": {"token": "$token"}}},
+            {"name": "get config", "request": {"url": "/api/config"}},
+            {"name": "refresh token", "extract": [{"token": "content.token"}]},
+            {"name": "logout", "barrier": True},
+            {"name": "get index", "request": {"url": "/"}}
+        ]
+        testcases.append(testcases[2])
+        dependencies = testcase.get_testcases_dependencies(testcases)
+        self.assertEqual(
+            dependencies,
+            [[], [0], [], [0, 1], [0, 1, 2, 3], [4], [2, 4]]
+        )
+        self.assertEqual(
+            testcase.group_by_dependencies(dependencies),
+            [[0, 2], [1], [3], [4], [5, 6]]
+        )
+
+    def test_group_by_dependencies_empty(self):
+        self.assertEqual(testcase.group_by_dependencies([]), [])
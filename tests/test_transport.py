@@ -0,0 +1,162 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+# runner stack is imported lazily, thus transport tests also run with latest requests and urllib3
+import httprunner
+from httprunner import transport
+from httprunner.client import HttpSession
+from requests.compat import quote
+from tests.api_server import app as flask_app
+
+try:
+    from socketserver import TCPServer, ThreadingMixIn
+except ImportError:
+    from SocketServer import TCPServer, ThreadingMixIn
+
+
+class UnixWSGIRequestHandler(WSGIRequestHandler):
+
+    def __init__(self, request, client_address, server):
+        # clients of unix sockets have no address
+        WSGIRequestHandler.__init__(self, request, ("unix", 0), server)
+
+    def get_environ(self):
+        environ = WSGIRequestHandler.get_environ(self)
+        # headers with underscores are dropped by wsgiref, e.g. device_sn
+        for key, value in self.headers.items():
+            environ_key = "HTTP_" + key.upper().replace("-", "_")
+            environ.setdefault(environ_key, value)
+
+        return environ
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixWSGIServer(ThreadingMixIn, WSGIServer):
+
+    address_family = socket.AF_UNIX
+    daemon_threads = True
+
+    def server_bind(self):
+        TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 80
+        self.setup_environ()
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "unix domain socket is not supported")
+class TestUnixSocketTransport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.socket_path = os.path.join(cls.temp_dir, "api.sock")
+        cls.server = UnixWSGIServer(cls.socket_path, UnixWSGIRequestHandler)
+        cls.server.set_app(flask_app)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever)
+        cls.server_thread.daemon = True
+        cls.server_thread.start()
+        cls.base_url = "http+unix://{}".format(quote(cls.socket_path, safe=""))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.temp_dir)
+
+    def test_get_socket_path(self):
+        self.assertEqual(
+            transport.get_socket_path("http+unix://%2Ftmp%2Fapi.sock/api/users?limit=1"),
+            "/tmp/api.sock"
+        )
+
+    def test_build_url(self):
+        session = HttpSession(self.base_url)
+        self.assertEqual(
+            session._build_url("/api/users"),
+            "{}/api/users".format(self.base_url)
+        )
+        self.assertEqual(
+            session._build_url("HTTP+UNIX://%2Ftmp%2Fapi.sock/get"),
+            "HTTP+UNIX://%2Ftmp%2Fapi.sock/get"
+        )
+
+    def test_request_with_meta_data(self):
+        session = HttpSession(self.base_url)
+        for _ in range(3):
+            resp = session.get("/", params={"a": 1})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.text, "Hello World!")
+
+        self.assertEqual(session.meta_data["url"], "{}/?a=1".format(self.base_url))
+        self.assertEqual(session.meta_data["status_code"], 200)
+        self.assertEqual(session.meta_data["content_size"], len("Hello World!"))
+        self.assertGreater(session.meta_data["response_time_ms"], 0)
+        self.assertGreater(session.meta_data["elapsed_ms"], 0)
+
+        # connections of each socket are pooled, and pools are shared by forked sessions
+        adapter = session.get_adapter(self.base_url)
+        self.assertIsInstance(adapter, transport.UnixHTTPAdapter)
+        self.assertIs(session.fork().get_adapter(self.base_url), adapter)
+        self.assertEqual(list(adapter.unix_pools.keys()), [self.socket_path])
+
+    def test_request_socket_not_exist(self):
+        session = HttpSession("http+unix://{}".format(quote(self.socket_path + ".missing", safe="")))
+        resp = session.get("/")
+        self.assertEqual(resp.status_code, 0)
+        self.assertIsNotNone(resp.error)
+
+    def test_run_testset(self):
+        testset = {
+            "name": "api server on unix socket",
+            "config": {
+                "import_module_items": ["tests.debugtalk"],
+                "variables": [
+                    {"user_agent": "iOS/10.3"},
+                    {"device_sn": "UNIXSOCKET"},
+                    {"os_platform": "ios"},
+                    {"app_version": "2.8.6"}
+                ],
+                "request": {
+                    "base_url": self.base_url,
+                    "headers": {"User-Agent": "$user_agent", "device_sn": "$device_sn"}
+                }
+            },
+            "testcases": [
+                {
+                    "name": "get token",
+                    "request": {
+                        "url": "/api/get-token",
+                        "method": "POST",
+                        "headers": {"os_platform": "$os_platform", "app_version": "$app_version"},
+                        "json": {
+                            "sign": "${get_sign($user_agent, $device_sn, $os_platform, $app_version)}"
+                        }
+                    },
+                    "extract": [{"token": "content.token"}],
+                    "validate": [{"eq": ["status_code", 200]}, {"len_eq": ["content.token", 16]}]
+                },
+                {
+                    "name": "create user",
+                    "request": {
+                        "url": "/api/users/1000",
+                        "method": "POST",
+                        "headers": {"token": "$token"},
+                        "json": {"name": "user1", "password": "123456"}
+                    },
+                    "validate": [{"eq": ["status_code", 201]}, {"eq": ["content.success", True]}]
+                }
+            ]
+        }
+        summary = httprunner.HttpRunner().run(testset).summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["testsRun"], 2)
+        meta_data = summary["records"][1]["meta_data"]
+        self.assertEqual(meta_data["url"], "{}/api/users/1000".format(self.base_url))
+        self.assertEqual(meta_data["status_code"], 201)
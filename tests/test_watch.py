@@ -0,0 +1,130 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from httprunner.testcase import TestcaseLoader
+from httprunner.watch import TestsetWatcher, get_debugtalk_files, watch
+
+
+def touch(file_path, delta=10):
+    mtime = os.path.getmtime(file_path)
+    os.utime(file_path, (mtime + delta, mtime + delta))
+
+
+class TestTestsetWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.sub_dir = os.path.join(self.temp_dir, "sub")
+        os.makedirs(self.sub_dir)
+
+        self.testset_api = os.path.join(self.temp_dir, "api_ref.yml")
+        self.testset_suite = os.path.join(self.sub_dir, "suite_ref.yml")
+        self.debugtalk = os.path.join(self.sub_dir, "debugtalk.py")
+        self.write_file(
+            self.testset_api,
+            u"- test:\n"
+            u"    name: get token\n"
+            u"    api: get_token($user_agent, $device_sn, $os_platform, $app_version)\n"
+        )
+        self.write_file(
+            self.testset_suite,
+            u"- test:\n"
+            u"    name: create and check\n"
+            u"    suite: create_and_check($uid, $token)\n"
+        )
+        self.write_file(self.debugtalk, u"")
+
+        TestcaseLoader.load_test_dependencies()
+        TestcaseLoader.load_testsets_by_path(self.temp_dir)
+        self.watcher = TestsetWatcher([self.temp_dir])
+
+    def tearDown(self):
+        for file_path in [self.testset_api, self.testset_suite]:
+            TestcaseLoader.invalidate_cache(file_path)
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, file_path, content):
+        with io.open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_get_debugtalk_files(self):
+        debugtalk_files = get_debugtalk_files([self.testset_suite, self.testset_api])
+        self.assertIn(self.debugtalk, debugtalk_files)
+        self.assertIn(
+            os.path.join(os.getcwd(), "tests", "debugtalk.py"),
+            get_debugtalk_files(["tests/data/demo_binds.yml"])
+        )
+
+    def test_no_change(self):
+        changed_files = self.watcher.get_changed_files()
+        self.assertFalse(any(changed_files.values()))
+
+    def test_testset_changed(self):
+        touch(self.testset_api)
+        changed_files = self.watcher.get_changed_files()
+        self.assertEqual(changed_files["testset"], set([self.testset_api]))
+        self.assertEqual(
+            self.watcher.get_affected_testsets(changed_files),
+            [self.testset_api]
+        )
+        self.assertNotIn(self.temp_dir, TestcaseLoader.testcases_cache_mapping)
+        self.assertNotIn(self.testset_api, TestcaseLoader.testcases_cache_mapping)
+        self.assertIn(self.testset_suite, TestcaseLoader.testcases_cache_mapping)
+
+    def test_testset_added(self):
+        testset_new = os.path.join(self.sub_dir, "new.yml")
+        self.write_file(testset_new, u"- test:\n    name: new\n")
+        changed_files = self.watcher.get_changed_files()
+        self.assertEqual(
+            self.watcher.get_affected_testsets(changed_files),
+            [testset_new]
+        )
+
+    def test_debugtalk_changed(self):
+        touch(self.debugtalk)
+        changed_files = self.watcher.get_changed_files()
+        self.assertEqual(
+            self.watcher.get_affected_testsets(changed_files),
+            [self.testset_suite]
+        )
+
+    def test_api_changed(self):
+        api_file = os.path.join(os.getcwd(), "tests", "api", "basic.yml")
+        stat = os.stat(api_file)
+        try:
+            touch(api_file)
+            changed_files = self.watcher.get_changed_files()
+            self.assertEqual(changed_files["def"], set([api_file]))
+            # get_token is referenced directly, create_user is referenced by suite
+            self.assertEqual(
+                self.watcher.get_affected_testsets(changed_files),
+                sorted([self.testset_api, self.testset_suite])
+            )
+        finally:
+            os.utime(api_file, (stat.st_atime, stat.st_mtime))
+            TestcaseLoader.load_test_dependencies()
+
+    def test_watch_rerun_exit(self):
+        run_paths = []
+
+        def run_testsets(testset_paths):
+            run_paths.append(testset_paths)
+            if len(run_paths) == 1:
+                touch(self.testset_api)
+            elif len(run_paths) == 2:
+                touch(self.testset_api, 20)
+                # HttpRunner.run exits when testsets are not found
+                raise SystemExit(1)
+            else:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            watch([self.temp_dir], run_testsets, interval=0.01)
+
+        self.assertEqual(
+            run_paths,
+            [[self.temp_dir], [self.testset_api], [self.testset_api]]
+        )